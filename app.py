@@ -13,8 +13,14 @@ from sender import send_images
 from configs.get_cfg import get_cfg, ConfigError
 
 from camera.source_factory import create_rgb_source, create_ir_source
-from detector.tflite import TFLiteWorker
+from detector.tflite import TFLiteWorker, PipelinedTFLiteWorker, NMS_IOU_THRESH, MAX_DETS
+from detector.nms import NmsEngine
+from detector.roi import IrRoiPlanner
 from core.buffer import DoubleBuffer
+from core.calibration import CalibrationService
+from core.fire_state import FireStateTracker
+from core.fire_tracker import FireTracker
+from core.fire_score import ConfidenceModel
 from core.state import (
     camera_state,
     LabelScaleState,
@@ -127,42 +133,6 @@ def parse_args():
                         help="실행 모드 선택 (cli | gui), 기본값은 APP_MODE 또는 cli")
     return parser.parse_args()
 
-def _normalize_coord_cfg(params):
-    """CONFIG의 COORD 키(대문자/소문자)를 런타임에서 쓰는 소문자 키로 정규화"""
-    cfg = dict(params or {})
-    def _get(key, default=None):
-        val = cfg.get(key)
-        if val is None:
-            val = cfg.get(key.upper(), default)
-        return val if val is not None else default
-    out = {
-        'offset_x': float(_get('offset_x', 0.0)),
-        'offset_y': float(_get('offset_y', 0.0)),
-        'scale': _get('scale', None),
-    }
-    if out['scale'] is not None:
-        try:
-            out['scale'] = float(out['scale'])
-        except Exception:
-            out['scale'] = None
-    return out
-
-
-class CoordState:
-    def __init__(self, params=None):
-        self._lock = threading.Lock()
-        self._params = dict(params or {'offset_x': 0.0, 'offset_y': 0.0, 'scale': None})
-        self._version = 0
-
-    def get(self):
-        with self._lock:
-            return dict(self._params), self._version
-
-    def update(self, **kwargs):
-        with self._lock:
-            self._params.update({k: v for k, v in kwargs.items() if v is not None})
-            self._version += 1
-
 
 class RuntimeController:
     """
@@ -177,10 +147,16 @@ class RuntimeController:
         self.sync_cfg = sync_cfg
         self.display_cfg = display_cfg
         self.target_res = target_res
-        self.coord_state = CoordState(_normalize_coord_cfg(coord_cfg))
+        self.calibration = CalibrationService.from_cfg(coord_cfg)
         self.label_state = LabelScaleState(DEFAULT_LABEL_SCALE)
         self.capture_cfg = capture_cfg or {}
         self.cfg = cfg or {}
+        state_cfg = getattr(self.cfg, 'STATE', None) or {}
+        self.fire_state = FireStateTracker.from_cfg(state_cfg.get('FIRE'), state_cfg.get('SCORE'))
+        ir_cam = getattr(self.cfg, 'CAMERA_IR', None)
+        self.score_model = ConfidenceModel.from_cfg(state_cfg.get('SCORE'),
+                                                    temp_min=getattr(ir_cam, 'FIRE_MIN_TEMP', None))
+        self.fire_tracker = FireTracker.from_cfg(state_cfg.get('TRACK'), score_model=self.score_model)
         self.sender_thread = None
         self.sender_stop = threading.Event()
         self.display_thread = None
@@ -221,8 +197,10 @@ class RuntimeController:
             "jpeg_quality": self.server.get('COMP_RATIO', 70),
             "sync_cfg": self.sync_cfg,
             "stop_event": self.sender_stop,
-            "coord_state": self.coord_state,
+            "calibration": self.calibration,
             "label_state": self.label_state,
+            "fire_state": self.fire_state,
+            "fire_tracker": self.fire_tracker,
         }
         return self._start_thread(
             "sender",
@@ -314,11 +292,11 @@ class RuntimeController:
         return dict(self.rgb_input_cfg or {}), dict(self.ir_input_cfg or {})
 
     def get_coord_cfg(self):
-        params, _ = self.coord_state.get()
+        params, _ = self.calibration.get()
         return params
 
     def set_coord_cfg(self, params):
-        self.coord_state.update(**params)
+        self.calibration.update(**params)
 
     def get_label_scale(self):
         return self.label_state.get() if self.label_state else DEFAULT_LABEL_SCALE
@@ -393,7 +371,11 @@ class RuntimeController:
         cpu_threads = cfg.get('CPU_THREADS', 1)
         conf_thr = float(cfg.get('CONF_THR', cfg.get('CONF_THRESHOLD', 0.15)))
         name = cfg.get('NAME', "DetRGB")
-        new_worker = TFLiteWorker(
+        roi_planner = IrRoiPlanner.from_cfg(cfg.get('ROI'), self.buffers.get('ir'), self.calibration,
+                                            ir_size=tuple((self.ir_cfg or {}).get('RES', (160, 120))))
+        worker_cls, worker_kwargs = _detector_class(cfg.get('PIPELINE'))
+        nms = NmsEngine.from_cfg(cfg.get('NMS'), NMS_IOU_THRESH, MAX_DETS)
+        new_worker = worker_cls(
             model_path=model_path,
             labels_path=labels_path,
             input_buf=self.buffers['rgb'],
@@ -405,7 +387,10 @@ class RuntimeController:
             target_fps=self.rgb_cfg.get('FPS', 30),
             target_res=self.target_res,
             conf_thr=conf_thr,
-            name=name
+            name=name,
+            roi_planner=roi_planner,
+            nms=nms,
+            **worker_kwargs,
         )
         new_worker.start()
         self.detector_worker = new_worker
@@ -473,7 +458,19 @@ def _start_sources(ir_cfg, ir_input_cfg, rgb_cfg, rgb_input_cfg, buffers):
     return rgb_source, ir_source
 
 
-def _start_detector(cfg, rgb_cfg, buffers, delegate, model, label):
+def _detector_class(pipeline_cfg):
+    """
+    STATE.PIPELINE 설정에 맞는 검출 워커 클래스와 추가 인자
+
+    cfg 예시: {ENABLED: true, QUEUE: 1} - ENABLED면 전처리/invoke/후처리 3단계 파이프라인 워커
+    """
+    pipeline_cfg = pipeline_cfg or {}
+    if pipeline_cfg.get('ENABLED', False):
+        return PipelinedTFLiteWorker, {'queue_size': int(pipeline_cfg.get('QUEUE', 1))}
+    return TFLiteWorker, {}
+
+
+def _start_detector(cfg, rgb_cfg, buffers, delegate, model, label, calibration=None, ir_size=(160, 120)):
     rgb_det_cfg = {
         'MODEL': model,
         'LABEL': label,
@@ -483,8 +480,18 @@ def _start_detector(cfg, rgb_cfg, buffers, delegate, model, label):
         'CPU_THREADS': 1,
         'CONF_THR': float(getattr(cfg, 'CONF_THR', getattr(cfg, 'CONF_THRESHOLD', 0.15))),
         'NAME': "DetRGB",
+        'ROI': dict((cfg.STATE or {}).get('ROI') or {}),
+        'PIPELINE': dict((cfg.STATE or {}).get('PIPELINE') or {}),
+        'NMS': dict((cfg.STATE or {}).get('NMS') or {}),
     }
-    worker = TFLiteWorker(
+    roi_planner = IrRoiPlanner.from_cfg(rgb_det_cfg['ROI'], buffers['ir'], calibration, ir_size=ir_size)
+    if roi_planner is not None:
+        logger.info("RGB-TFLite - IR-guided ROI enabled (size=%s, quiet_every=%d)",
+                    roi_planner.size or "model input", roi_planner.quiet_every)
+    worker_cls, worker_kwargs = _detector_class(rgb_det_cfg['PIPELINE'])
+    if worker_cls is PipelinedTFLiteWorker:
+        logger.info("RGB-TFLite - 3-stage pipeline enabled (queue=%d)", worker_kwargs['queue_size'])
+    worker = worker_cls(
         model_path=model,
         labels_path=label,
         input_buf=buffers['rgb'],
@@ -497,6 +504,9 @@ def _start_detector(cfg, rgb_cfg, buffers, delegate, model, label):
         target_res=tuple(getattr(cfg, 'TARGET_RES', (rgb_cfg.get('RES', [0, 0])[0], rgb_cfg.get('RES', [0, 0])[1]))),
         conf_thr=rgb_det_cfg['CONF_THR'],
         name=rgb_det_cfg['NAME'],
+        roi_planner=roi_planner,
+        nms=NmsEngine.from_cfg(rgb_det_cfg['NMS'], NMS_IOU_THRESH, MAX_DETS),
+        **worker_kwargs,
     )
     worker.start()
     return worker, rgb_det_cfg
@@ -549,12 +559,6 @@ def _init_pipeline(gui_mode=False):
         logger.exception("Camera source start failed: %s", e)
         raise
 
-    try:
-        rgb_det, rgb_det_cfg = _start_detector(cfg, rgb_cfg, buffers, delegate, model, label)
-    except Exception as e:
-        logger.exception("RGB-TFLite - Start failed: %s", e)
-        raise
-
     coord_cfg = cfg.COORD
     capture_cfg = cfg.CAPTURE
     controller = RuntimeController(
@@ -567,6 +571,16 @@ def _init_pipeline(gui_mode=False):
         capture_cfg,
         cfg=cfg
     )
+
+    try:
+        # 검출기 ROI 계획도 송신/GUI와 같은 캘리브레이션을 사용
+        rgb_det, rgb_det_cfg = _start_detector(cfg, rgb_cfg, buffers, delegate, model, label,
+                                               calibration=controller.calibration,
+                                               ir_size=tuple(ir_cfg.get('RES', (160, 120))))
+    except Exception as e:
+        logger.exception("RGB-TFLite - Start failed: %s", e)
+        raise
+
     controller.set_sources(rgb_source, ir_source, rgb_cfg, ir_cfg, rgb_input_cfg, ir_input_cfg)
     if rgb_det:
         controller.set_detector(rgb_det, rgb_det_cfg)
@@ -0,0 +1,146 @@
+"""
+IR 시간 배경 모델 (정적 고온 물체 억제)
+
+히터/엔진/조명처럼 항상 뜨거운 물체는 매 프레임 detect_fire를 통과해 IR_ONLY 결과를
+만든다. 픽셀별 EMA 평균/분산을 유지하고 hotspot이 배경보다 "상승 중"이거나
+"깜빡이는(분산이 큰)" 경우에만 통과시킨다.
+
+저장 형식 (160x120 기준 약 115KB):
+- mean: uint16, RAW16과 같은 0.01 Kelvin 단위
+- var: float16, 장면 온도 분산 (K^2, tau와 무관)
+- frozen: uint16, 픽셀이 연속으로 화점 영역에 묶여 갱신이 멈춘 프레임 수
+보정 온도는 RAW16의 선형식이므로 보정 온도 기준 임계값은 tau로 환산해 비교한다.
+"""
+
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class IRBackgroundModel:
+    """
+    픽셀별 EMA 배경 모델
+
+    update()는 프레임당 한 번의 벡터 연산으로 평균/분산을 갱신하고,
+    gate()는 hotspot 좌표에서만 배경과 비교한다. 캡처 스레드 전용.
+    """
+
+    def __init__(self, alpha=0.05, rise_thr=5.0, flicker_std=3.0, warmup=30, freeze_frames=300):
+        """
+        Args:
+            alpha: EMA 계수 (0~1, 클수록 배경이 빨리 따라감)
+            rise_thr: 배경 평균 대비 상승 임계값 (섭씨, 보정 온도)
+            flicker_std: 깜빡임 판정 표준편차 임계값 (섭씨, 보정 온도)
+            warmup: 배경 학습 프레임 수 (이 동안은 모든 hotspot 통과)
+            freeze_frames: 화점 영역 픽셀을 고정하는 최대 연속 프레임 수 (0이면 제한 없음)
+        """
+        self.alpha = min(1.0, max(0.0, float(alpha)))
+        self.rise_thr = float(rise_thr)
+        self.flicker_std = float(flicker_std)
+        self.warmup = int(warmup)
+        self.freeze_frames = max(0, min(65534, int(freeze_frames or 0)))
+
+        self.mean = None   # uint16 (0.01 K)
+        self.var = None    # float16 (K^2)
+        self.frozen = None  # uint16 연속 고정 프레임 수
+        self.frames = 0
+
+    @classmethod
+    def from_cfg(cls, cfg):
+        """
+        CAMERA.IR.BACKGROUND 설정으로 생성 (ENABLED가 아니면 None)
+
+        cfg 예시: {ENABLED: true, ALPHA: 0.05, RISE_THR: 5.0, FLICKER_STD: 3.0, WARMUP: 30,
+                  FREEZE_FRAMES: 300}
+        """
+        cfg = cfg or {}
+        if not cfg.get('ENABLED', False):
+            return None
+        return cls(
+            alpha=cfg.get('ALPHA', 0.05),
+            rise_thr=cfg.get('RISE_THR', 5.0),
+            flicker_std=cfg.get('FLICKER_STD', 3.0),
+            warmup=cfg.get('WARMUP', 30),
+            freeze_frames=cfg.get('FREEZE_FRAMES', 300),
+        )
+
+    @property
+    def ready(self):
+        """학습이 끝나 gate가 실제로 억제를 수행하는지 여부"""
+        return self.mean is not None and self.frames >= self.warmup
+
+    def reset(self):
+        """배경 초기화 (해상도/방향 변경 시)"""
+        self.mean = None
+        self.var = None
+        self.frozen = None
+        self.frames = 0
+
+    def update(self, raw16, freeze=None):
+        """
+        배경 평균/분산 갱신 (프레임당 한 번)
+
+        Args:
+            raw16: 방향 조정이 끝난 RAW16 데이터
+            freeze: 갱신하지 않을 픽셀 bool 마스크 (통과된 화점 영역 - 배경에 흡수 방지)
+
+        Note:
+            freeze_frames 프레임 넘게 연속으로 고정된 픽셀은 현재 값으로 배경을 다시 잡는다
+            (분산 0). 켜진 뒤 그대로 있는 히터 같은 정적 고온 물체는 그 이후 억제되고,
+            깜빡이는 실제 화염은 분산이 다시 커져 계속 통과한다.
+        """
+        if self.mean is None or self.mean.shape != raw16.shape:
+            self.mean = raw16.astype(np.uint16, copy=True)
+            self.var = np.zeros(raw16.shape, dtype=np.float16)
+            self.frozen = np.zeros(raw16.shape, dtype=np.uint16)
+            self.frames = 1
+            return
+
+        a = np.float32(self.alpha)
+        diff = raw16.astype(np.float32)
+        diff -= self.mean
+        # EMA 분산: var <- (1 - a) * (var + a * d^2), d는 K 단위
+        d_k2 = np.square(diff * np.float32(0.01))
+        var = (1 - a) * (self.var.astype(np.float32) + a * d_k2)
+        mean = self.mean + np.rint(a * diff)
+
+        if freeze is not None:
+            frozen = np.where(freeze, self.frozen + np.uint16(1), np.uint16(0))
+            hold = freeze
+            if self.freeze_frames:
+                expired = frozen > self.freeze_frames
+                hold = freeze & ~expired
+                mean = np.where(expired, raw16, mean)
+                var = np.where(expired, 0.0, var)
+                frozen[expired] = 0
+            mean = np.where(hold, self.mean, mean)
+            var = np.where(hold, self.var, var)
+            self.frozen = frozen.astype(np.uint16, copy=False)
+        else:
+            self.frozen.fill(0)
+        np.clip(mean, 0, 65535, out=mean)
+        self.mean = mean.astype(np.uint16)
+        self.var = var.astype(np.float16)
+        self.frames += 1
+
+    def gate(self, xs, ys, raw_values, tau):
+        """
+        hotspot별 통과 여부 (상승 또는 깜빡임)
+
+        Args:
+            xs, ys: hotspot 좌표 배열
+            raw_values: hotspot RAW16 값 배열
+            tau: 대기 투과율 (보정 온도 환산용)
+
+        Returns:
+            np.ndarray: bool 배열 (True = 통과)
+        """
+        xs = np.asarray(xs, dtype=np.intp)
+        ys = np.asarray(ys, dtype=np.intp)
+        if not self.ready or xs.size == 0:
+            return np.ones(xs.shape, dtype=bool)
+        scale = 1.0 / (100.0 * float(tau))  # RAW16 차이 → 보정 온도(섭씨) 차이
+        rise = (np.asarray(raw_values, dtype=np.float64) - self.mean[ys, xs]) * scale
+        std = np.sqrt(self.var[ys, xs].astype(np.float64)) / float(tau)
+        return (rise >= self.rise_thr) | (std >= self.flicker_std)
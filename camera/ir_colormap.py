@@ -0,0 +1,173 @@
+"""
+IR 컬러맵 엔진 (RAW16 → BGR)
+
+RAW16 값을 정규화된 중간 배열 없이 BGR LUT 한 번의 인덱싱으로 변환합니다.
+
+모드:
+- auto: 프레임마다 최소/최대로 정규화 (KEY_STEP=0이면 기존 cv2.normalize + applyColorMap과 동일)
+- fixed: 고정 온도 범위 (섭씨, 보정 전 장면 온도) → 65536 항목 LUT를 한 번만 생성
+- agc: 최소/최대를 EMA로 평활화한 자동 이득 (프레임 간 깜빡임 감소)
+
+auto/agc 범위는 KEY_STEP(RAW16 단위) 격자로 넓혀 LUT 캐시 키로 쓴다. 센서 노이즈로 최소/최대가
+조금씩 흔들려도 같은 LUT를 재사용한다.
+"""
+
+import cv2
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+PALETTES = {
+    'PLASMA': cv2.COLORMAP_PLASMA,
+    'INFERNO': cv2.COLORMAP_INFERNO,
+    'MAGMA': cv2.COLORMAP_MAGMA,
+    'JET': cv2.COLORMAP_JET,
+    'HOT': cv2.COLORMAP_HOT,
+    'TURBO': cv2.COLORMAP_TURBO,
+    'BONE': cv2.COLORMAP_BONE,
+}
+
+COLORMAP_MODES = ('auto', 'fixed', 'agc')
+DEFAULT_KEY_STEP = 64   # RAW16 단위 (0.64 K)
+
+
+def palette_bgr(name):
+    """팔레트 이름 → (256, 3) uint8 BGR 테이블"""
+    cmap = PALETTES.get(str(name).upper())
+    if cmap is None:
+        raise ValueError(f"Unsupported IR palette: {name}")
+    gray = np.arange(256, dtype=np.uint8).reshape(256, 1)
+    return cv2.applyColorMap(gray, cmap).reshape(256, 3)
+
+
+def gray_ramp(lo, hi):
+    """
+    RAW16 범위 [lo, hi]의 각 값 → 8bit 그레이 LUT
+
+    cv2.normalize(raw, None, 0, 65535, NORM_MINMAX) >> 8 과 같은 값을 만들기 위해
+    같은 범위의 램프를 같은 함수로 정규화한다.
+    """
+    ramp = np.arange(lo, hi + 1, dtype=np.uint16)
+    return (cv2.normalize(ramp, None, 0, 65535, cv2.NORM_MINMAX).ravel() >> 8).astype(np.uint8)
+
+
+def celsius_to_raw(temp_c):
+    """장면 온도(섭씨, 보정 전) → RAW16 값 (0.01 Kelvin, 0~65535로 제한)"""
+    return int(np.clip(round((float(temp_c) + 273.15) * 100), 0, 65535))
+
+
+class IRColormap:
+    """
+    RAW16 → BGR 컬러맵 변환기
+
+    LUT는 (범위, 팔레트)가 바뀔 때만 다시 만들고 프레임마다 한 번 인덱싱한다.
+    캡처 스레드 전용으로 사용한다 (AGC 상태를 가짐).
+    """
+
+    def __init__(self, mode='auto', palette='PLASMA', temp_range=(0.0, 150.0), agc_alpha=0.2,
+                 key_step=DEFAULT_KEY_STEP):
+        """
+        Args:
+            mode: 'auto' | 'fixed' | 'agc'
+            palette: PALETTES 키 (기본: PLASMA)
+            temp_range: fixed 모드 온도 범위 (섭씨, 보정 전) [min, max]
+            agc_alpha: agc 모드 EMA 계수 (0~1, 클수록 빠르게 따라감)
+            key_step: auto/agc 범위 양자화 간격 (RAW16 단위, 0/1이면 양자화 안 함)
+        """
+        mode = str(mode or 'auto').lower()
+        if mode not in COLORMAP_MODES:
+            raise ValueError(f"Unsupported IR colormap mode: {mode}")
+        self.mode = mode
+        self.palette = palette_bgr(palette)
+        self.agc_alpha = min(1.0, max(0.0, float(agc_alpha)))
+        self.key_step = max(1, int(key_step or 1))
+        self.raw_range = tuple(sorted(celsius_to_raw(t) for t in temp_range))
+        if self.raw_range[1] == self.raw_range[0]:
+            raise ValueError(f"IR colormap range is empty: {temp_range}")
+
+        self._agc = None        # (lo, hi) EMA 상태 (float)
+        self._lut_key = None    # 현재 LUT의 (lo, hi)
+        self._lut = None        # (hi - lo + 1, 3) 또는 (65536, 3) BGR LUT
+
+    @classmethod
+    def from_cfg(cls, cfg):
+        """
+        CAMERA.IR.COLORMAP 설정으로 생성 (없으면 기존과 같은 auto/PLASMA)
+
+        cfg 예시: {MODE: fixed, PALETTE: PLASMA, RANGE: [0, 150], AGC_ALPHA: 0.2, KEY_STEP: 64}
+        """
+        cfg = cfg or {}
+        try:
+            return cls(
+                mode=cfg.get('MODE', 'auto'),
+                palette=cfg.get('PALETTE', 'PLASMA'),
+                temp_range=cfg.get('RANGE') or (0.0, 150.0),
+                agc_alpha=cfg.get('AGC_ALPHA', 0.2),
+                key_step=cfg.get('KEY_STEP', DEFAULT_KEY_STEP),
+            )
+        except Exception as e:
+            logger.warning("[IRColormap] Invalid COLORMAP config (%s), using auto/PLASMA", e)
+            return cls()
+
+    def _range_for(self, lo, hi):
+        """모드별 정규화 범위 (정수 RAW16)"""
+        if self.mode == 'fixed':
+            return self.raw_range
+        if self.mode == 'agc':
+            if self._agc is None:
+                self._agc = (float(lo), float(hi))
+            else:
+                a = self.agc_alpha
+                s_lo, s_hi = self._agc
+                self._agc = (s_lo + a * (lo - s_lo), s_hi + a * (hi - s_hi))
+            s_lo, s_hi = int(round(self._agc[0])), int(round(self._agc[1]))
+            return self._quantize(s_lo, max(s_hi, s_lo + 1))
+        return self._quantize(lo, hi)
+
+    def _quantize(self, lo, hi):
+        """범위를 key_step 격자로 넓힘 (lo 내림, hi 올림) → 프레임 범위를 항상 포함"""
+        step = self.key_step
+        if step > 1:
+            lo = lo // step * step
+            hi = min(65535, -(-hi // step) * step)
+        return lo, hi
+
+    def _build_lut(self, lo, hi):
+        if self.mode == 'fixed':
+            # 전체 RAW16 영역 LUT: 범위 밖 값은 양 끝 색으로 고정
+            gray = np.empty(65536, dtype=np.uint8)
+            gray[:lo] = 0
+            gray[lo:hi + 1] = gray_ramp(lo, hi)
+            gray[hi + 1:] = 255
+        else:
+            gray = gray_ramp(lo, hi)
+        return np.take(self.palette, gray, axis=0)
+
+    def apply(self, raw16, frame_range=None):
+        """
+        RAW16 프레임을 BGR 이미지로 변환
+
+        Args:
+            raw16: uint16 2D 배열
+            frame_range: 프레임 (min, max) - ThermalFrameAnalysis.norm_range (없으면 계산)
+
+        Returns:
+            np.ndarray: (H, W, 3) uint8 BGR
+        """
+        if self.mode != 'fixed' and frame_range is None:
+            frame_range = (int(raw16.min()), int(raw16.max()))
+        lo, hi = self._range_for(*frame_range) if frame_range is not None else self.raw_range
+
+        if self._lut_key != (lo, hi):
+            self._lut = self._build_lut(lo, hi)
+            self._lut_key = (lo, hi)
+
+        if self.mode == 'fixed':
+            idx = raw16
+        elif self.mode == 'agc':
+            idx = np.clip(raw16, lo, hi) - np.uint16(lo)
+        else:
+            idx = raw16 - np.uint16(lo)
+        # np.take(axis=0)가 팬시 인덱싱보다 빠르고 연속 (H, W, 3) 배열을 반환
+        return np.take(self._lut, idx, axis=0)
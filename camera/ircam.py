@@ -19,14 +19,95 @@ import numpy as np
 import logging
 import threading
 
+from dataclasses import dataclass
 from datetime import datetime
+from numpy.lib.stride_tricks import sliding_window_view
+from core.buffer import Deferred
+from core.hotspot import empty_hotspots, make_hotspots
 from core.util import dyn_sleep
 from core.state import camera_state
 from camera.frame_source import FrameSource
+from camera.ir_colormap import IRColormap
+from camera.ir_background import IRBackgroundModel
 from .purethermal.thermalcamera import ThermalCamera
 
 
-def detect_fire(data, min_val, tau=0.95, thr=20, raw_thr=5, window_size=10, delta_thr=10):
+# 온도 변환 상수
+T_ATM_K = 295.15   # 대기 온도 (약 22도C)
+T_0C_K = 273.15    # 절대 영도 기준 (0도C = 273.15K)
+
+
+def _window_origins(length, window_size, include_edges=False, stride=None):
+    """
+    스캔 윈도우 시작 좌표 계산
+
+    기존 스캔은 range(0, length - window_size, window_size)로 마지막 블록과
+    나머지 영역을 건너뛴다. include_edges=True이면 모든 전체 블록을 포함하고,
+    나머지 영역은 경계에 맞춘(안쪽으로 겹치는) 윈도우 하나로 덮는다.
+    stride를 지정하면 window_size 대신 stride 간격으로 윈도우를 놓는다 (겹침 허용).
+    """
+    stride = int(stride or window_size)
+    if length < window_size:
+        return np.zeros((0,), dtype=np.intp)
+    if not include_edges:
+        return np.arange(0, length - window_size, stride, dtype=np.intp)
+    origins = np.arange(0, length - window_size + 1, stride, dtype=np.intp)
+    if origins[-1] != length - window_size:
+        origins = np.append(origins, length - window_size)
+    return origins
+
+
+def sliding_block_stats(data, window_size, ys, xs):
+    """
+    겹치는 윈도우별 최대값/합계 (윈도우 수·겹침 정도와 무관하게 O(H*W))
+
+    최대값은 (0, 0) anchor 팽창, 합계는 적분 영상 4점 조회로 구한 뒤
+    윈도우 시작 좌표에서만 샘플링한다.
+
+    Args:
+        data: RAW16 2D 배열
+        window_size: 윈도우 크기 (픽셀)
+        ys, xs: 윈도우 시작 좌표 배열 (_window_origins 결과)
+
+    Returns:
+        tuple: (max, sum) - 각각 (ny, nx) 배열 (max는 data dtype, sum은 float64)
+    """
+    kernel = np.ones((window_size, window_size), dtype=np.uint8)
+    win_max = cv2.dilate(data, kernel, anchor=(0, 0))
+    integral = cv2.integral(data, sdepth=cv2.CV_64F)
+    y0, x0 = ys[:, None], xs[None, :]
+    y1, x1 = y0 + window_size, x0 + window_size
+    win_sum = integral[y1, x1] - integral[y0, x1] - integral[y1, x0] + integral[y0, x0]
+    return win_max[y0, x0], win_sum
+
+
+def block_stats(arr, window_size, ys, xs, with_argmax=False):
+    """
+    윈도우별 통계를 한 번의 NumPy 연산으로 계산
+
+    (ys[i], xs[j])에서 시작하는 window_size x window_size 윈도우를 모아
+    (ny, nx, window_size * window_size) 연속 배열로 만든 뒤 축 하나로 축약한다.
+    윈도우마다 연속 메모리에서 계산하므로 윈도우별 np.max/np.mean/np.argmax와
+    비트 단위로 같은 결과를 낸다.
+
+    Args:
+        arr: 2D 배열
+        window_size: 윈도우 크기 (픽셀)
+        ys, xs: 윈도우 시작 좌표 배열 (_window_origins 결과)
+        with_argmax: True면 윈도우 내 최대값 위치(평탄화 인덱스)도 반환
+
+    Returns:
+        tuple: (max, mean, argmax or None) - 각각 (ny, nx) 배열
+    """
+    ny, nx = len(ys), len(xs)
+    windows = sliding_window_view(arr, (window_size, window_size))[ys[:, None], xs[None, :]]
+    flat = windows.reshape(ny, nx, window_size * window_size)
+    arg = flat.argmax(axis=2) if with_argmax else None
+    return flat.max(axis=2), flat.mean(axis=2), arg
+
+
+def detect_fire(data, min_val, tau=0.95, thr=20, raw_thr=5, window_size=10, delta_thr=10,
+                include_edges=False, analysis=None, with_regions=False, stride=None, scales=None):
     """
     온도 기반 화점 탐지 알고리즘
     
@@ -43,116 +124,588 @@ def detect_fire(data, min_val, tau=0.95, thr=20, raw_thr=5, window_size=10, delt
         raw_thr: 보정 전 온도에서 (최고 - 평균) 임계값 (섭씨)
         window_size: 스캔 윈도우 크기 (픽셀)
         delta_thr: hotspot 확장 시 온도 차이 허용 범위 (섭씨)
+        include_edges: True면 기존 스캔이 건너뛰던 오른쪽/아래쪽 가장자리도 검사
+        analysis: 같은 프레임의 ThermalFrameAnalysis (있으면 보정 온도 배열을 재사용)
+        with_regions: True면 화점 영역 리스트(grow_regions 결과)를 4번째 값으로 반환
+        stride: 윈도우 간격 (None 또는 window_size면 기존 격자 preset)
+        scales: 다중 스케일 윈도우 크기 목록 (예: [6, 10, 16])
+              stride/scales로 겹치는 윈도우를 쓰면 detect_fire_raw의 박스 필터 스캔으로 처리
     
     Returns:
-        tuple: (detected: bool, bboxes: list or None, hotspots: list)
+        tuple: (detected: bool, bboxes: list or None, hotspots: np.ndarray[, regions: list])
                - detected: 화점 탐지 여부
-               - bboxes: 탐지된 화점들의 바운딩 박스 [(x, y, w, h), ...]
-               - hotspots: 화점 좌표 및 온도 [(x, y, temp_corrected, temp_raw), ...]
+               - bboxes: 화점 영역(연결 요소)별 바운딩 박스 [(x, y, w, h), ...]
+               - hotspots: core.hotspot.HOTSPOT_DTYPE 레코드 배열
+                 (x, y, temp_corrected, temp_raw, area, region_id) - h[0]~h[3]은 기존 튜플과 동일
+               - regions: with_regions=True일 때 [{'bbox', 'area', 'centroid', 'peak', 'seeds'}, ...]
     
     알고리즘 흐름:
         1. 온도 변환: RAW16 → Kelvin → 섭씨
         2. 대기 투과율 보정 적용
-        3. 윈도우 기반 스캔으로 hotspot 후보 탐색
+        3. 윈도우 기반 스캔으로 hotspot 후보 탐색 (블록 통계 일괄 계산)
         4. Hotspot 주변 영역 확장 (비슷한 온도 픽셀 포함)
-        5. Contour 추출 및 BBox 생성
+        5. 연결 요소로 화점 영역(BBox/면적/중심/최고온도) 생성
     """
     try:
+        if scales or (stride is not None and stride != window_size):
+            # 겹치는/다중 스케일 윈도우: 같은 판정을 RAW16 도메인 박스 필터로 수행
+            thresholds = compile_fire_thresholds(min_val, tau=tau, thr=thr, raw_thr=raw_thr,
+                                                 delta_thr=delta_thr)
+            return detect_fire_raw(data, thresholds, window_size=window_size,
+                                   include_edges=include_edges, analysis=analysis,
+                                   with_regions=with_regions, stride=stride, scales=scales)
+
         data = np.asarray(data)
         h, w = data.shape  # 입력 데이터 해상도 (회전/리사이즈 반영)
 
-        # ===== 1단계: 온도 변환 =====
+        # ===== 1-2단계: 온도 변환 + 대기 투과율 보정 =====
         # RAW16 데이터: 0.01 Kelvin 단위 (예: 30000 = 300.00K)
-        T_scene_K = data / 100  # Kelvin으로 변환
-        
-        # 상수 정의
-        T_atm_K = 295.15   # 대기 온도 (약 22도C)
-        T_0C_K = 273.15    # 절대 영도 기준 (0도C = 273.15K)
-        
-        # ===== 2단계: 대기 투과율 보정 =====
         # 공식: T_corrected = (T_measured - T_atm) / tau + T_atm
         # 원리: 대기가 적외선을 흡수하므로, 측정된 온도는 실제보다 낮음
         #       tau가 낮을수록 (대기 흡수가 클수록) 보정값이 커짐
-        T_corrected_K = (T_scene_K - T_atm_K) / tau + T_atm_K
-        
-        # 섭씨로 변환하고 2D 배열로 reshape
-        temper_raw = (T_scene_K - T_0C_K)      # 보정 전 온도 (섭씨)
-        temper = (T_corrected_K - T_0C_K)      # 보정 후 온도 (섭씨)
+        if analysis is not None and analysis.raw16 is data and analysis.tau == tau:
+            # 프레임 최고 온도가 min_val 미만이면 어떤 블록도 조건을 만족할 수 없음
+            if analysis.peak_corrected < min_val:
+                return _fire_result([], [], with_regions)
+            temper, temper_raw = analysis.temperatures()
+        else:
+            temper, temper_raw = raw_to_celsius(data, tau)  # 보정 후 / 보정 전 온도 (섭씨)
 
         # ===== 3단계: 윈도우 기반 Hotspot 탐색 =====
-        hotspots = []  # 탐지된 hotspot 리스트: [(x, y, temp, raw_temp), ...]
-        mask = np.zeros((h, w), dtype=np.uint8)  # 화점 마스크
-
-        # 이미지를 window_size x window_size 블록으로 나눠서 스캔
-        for y in range(0, h - window_size, window_size):
-            for x in range(0, w - window_size, window_size):
-                # 현재 윈도우 추출
-                window_raw = temper_raw[y:y + window_size, x:x + window_size]
-                window = temper[y:y + window_size, x:x + window_size]
-                
-                # 윈도우 내 통계
-                max_temp = np.max(window)           # 보정 후 최고 온도
-                mean_temp = np.mean(window)         # 보정 후 평균 온도
-                max_temp_raw = np.max(window_raw)   # 보정 전 최고 온도
-                mean_temp_raw = np.mean(window_raw) # 보정 전 평균 온도
-                
-                # ===== Hotspot 판정 조건 (모두 충족해야 함) =====
-                # 1) 보정 전: 최고온도가 평균보다 raw_thr 이상 높음
-                # 2) 보정 후: 최고온도가 평균보다 thr 이상 높음
-                # 3) 보정 후: 최고온도가 min_val 이상
-                if (max_temp_raw >= mean_temp_raw + raw_thr and
-                    max_temp >= mean_temp + thr and
-                    max_temp >= min_val):
-                    # 윈도우 내에서 최고 온도 픽셀 위치 찾기
-                    max_idx = np.unravel_index(np.argmax(window), window.shape)
-                    cx, cy = x + max_idx[1], y + max_idx[0]  # 전체 이미지 좌표로 변환
-                    
-                    # Hotspot 정보 저장
-                    hotspots.append((cx, cy, max_temp, max_temp_raw))
-                    mask[cy, cx] = 255  # 마스크에 표시
-        
-        # Hotspot이 없으면 종료
-        if len(hotspots) == 0:
-            return False, None, []
-
-        # ===== 4단계: Hotspot 주변 영역 확장 =====
-        # 각 hotspot 주변에서 비슷한 온도를 가진 픽셀을 마스크에 추가
-        for (hx, hy, h_temp, _) in hotspots:
-            # Hotspot 주변 5픽셀 범위 ROI
-            y_min, y_max = max(0, hy-5), min(h, hy+5)
-            x_min, x_max = max(0, hx-5), min(w, hx+5)
-            roi = temper[y_min:y_max, x_min:x_max]
-            
-            # Hotspot 온도와 delta_thr 이내의 픽셀을 마스크에 추가
-            roi_mask = np.abs(roi - h_temp) <= delta_thr
-            mask[y_min:y_max, x_min:x_max] |= roi_mask.astype(np.uint8) * 255
+        # 이미지를 window_size x window_size 블록으로 나눠 블록 통계를 한 번에 계산
+        ys = _window_origins(h, window_size, include_edges)
+        xs = _window_origins(w, window_size, include_edges)
+        hotspots = empty_hotspots()  # 탐지된 hotspot 레코드 배열
 
-        # ===== 5단계: Contour 추출 및 BBox 생성 =====
-        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        bboxes = []
+        if ys.size and xs.size:
+            max_temp, mean_temp, arg_temp = block_stats(temper, window_size, ys, xs, with_argmax=True)
+            max_temp_raw, mean_temp_raw, _ = block_stats(temper_raw, window_size, ys, xs)
 
-        for contour in contours:
-            x, y, w, h = cv2.boundingRect(contour)
-            area = w * h
-        
-            # 각 contour가 실제 hotspot을 포함하는지 확인
-            for hx, hy, h_temp, h_temp_raw in hotspots:
-                if x <= hx <= x + w and y <= hy <= y + h:
-                    # 면적이 크면 온도 조건 추가 검증, 작으면 그냥 포함
-                    # h_temp = 보정 온도 기준으로 판정
-                    if area > 10 and h_temp >= min_val:
-                        bboxes.append((x, y, w, h))
-                    elif area <= 10:
-                        bboxes.append((x, y, w, h))
+            # ===== Hotspot 판정 조건 (모두 충족해야 함) =====
+            # 1) 보정 전: 최고온도가 평균보다 raw_thr 이상 높음
+            # 2) 보정 후: 최고온도가 평균보다 thr 이상 높음
+            # 3) 보정 후: 최고온도가 min_val 이상
+            hit = ((max_temp_raw >= mean_temp_raw + raw_thr) &
+                   (max_temp >= mean_temp + thr) &
+                   (max_temp >= min_val))
+            by, bx = np.nonzero(hit)  # 행 우선 순서 (기존 y→x 스캔 순서와 동일)
 
-        if bboxes:
-            return (True, bboxes, hotspots)
-        else:
-            return (False, None, [])
+            # 윈도우 내 최고 온도 픽셀 위치 → 전체 이미지 좌표로 변환
+            idx = arg_temp[by, bx]
+            cys = ys[by] + idx // window_size
+            cxs = xs[bx] + idx % window_size
+            if include_edges and cys.size:
+                # 가장자리 윈도우는 안쪽 블록과 겹칠 수 있으므로 같은 픽셀은 한 번만 사용
+                _, first = np.unique(cys * w + cxs, return_index=True)
+                keep = np.sort(first)
+                by, bx, cys, cxs = by[keep], bx[keep], cys[keep], cxs[keep]
+
+            hotspots = make_hotspots(cxs, cys, max_temp[by, bx], max_temp_raw[by, bx])
+
+        # Hotspot이 없으면 종료
+        if len(hotspots) == 0:
+            return _fire_result([], [], with_regions)
+
+        # ===== 4-5단계: Hotspot 주변 영역 확장 + 연결 요소 영역 =====
+        seeds = list(zip(hotspots['x'].tolist(), hotspots['y'].tolist(),
+                         hotspots['temp_corrected'].tolist()))
+        regions = grow_regions(temper, seeds, delta_thr)
+        return _fire_result(hotspots, regions, with_regions)
     
     except Exception:
         # 오류 발생 시 탐지 실패로 처리
-        return False, None, []
+        return _fire_result([], [], with_regions)
+
+
+def _assign_regions(hotspots, regions):
+    """hotspot 레코드에 소속 영역 인덱스/면적 기록 (제자리 갱신)"""
+    hotspots['region_id'] = -1
+    hotspots['area'] = 0
+    for i, region in enumerate(regions):
+        hotspots['region_id'][region['seeds']] = i
+        hotspots['area'][region['seeds']] = region['area']
+    return hotspots
+
+
+def _fire_result(hotspots, regions, with_regions=False):
+    """detect_fire 계열 반환값 구성 (영역이 없으면 미탐지)"""
+    if regions:
+        result = (True, [r['bbox'] for r in regions], _assign_regions(hotspots, regions))
+    else:
+        result = (False, None, empty_hotspots())
+    return result + (regions,) if with_regions else result
+
+
+def filter_hotspots(hotspots, regions, keep):
+    """
+    keep(bool 배열)로 hotspot을 거르고 영역의 seed 인덱스를 다시 매핑
+
+    Returns:
+        tuple: (hotspots, regions) - seed가 모두 제거된 영역은 버림
+    """
+    keep = np.asarray(keep, dtype=bool)
+    remap = np.cumsum(keep) - 1
+    kept_regions = []
+    for region in regions:
+        seeds = [int(remap[i]) for i in region['seeds'] if keep[i]]
+        if seeds:
+            kept_regions.append(dict(region, seeds=seeds))
+    return _assign_regions(hotspots[keep], kept_regions), kept_regions
+
+
+def grow_regions(values, seeds, delta, radius=5):
+    """
+    Hotspot 주변 영역 확장 + 연결 요소 기반 화점 영역 추출 (detect_fire 4-5단계)
+
+    각 hotspot의 (2*radius) x (2*radius) 주변에서 hotspot 값과 delta 이내인 픽셀을
+    포함시키고, cv2.connectedComponentsWithStats 한 번으로 화점 덩어리마다 영역 하나를
+    만든다. hotspot별 ROI 반복과 contour x hotspot 이중 루프를 대체하며, 같은 덩어리의
+    hotspot은 하나의 영역으로 합쳐진다 (중복 bbox 없음).
+
+    주변 hotspot 값은 max/min 팽창 맵 두 장으로 전달하므로, 한 픽셀의 ROI에 서로 다른
+    값을 가진 hotspot이 셋 이상 겹치면 그 사이 값에 대한 비교는 생략된다.
+
+    Args:
+        values: 비교 기준 2D 배열 (보정 온도 또는 RAW16)
+        seeds: [(x, y, value), ...] - hotspot 좌표와 기준값
+        delta: seed 값과의 허용 차이 (values와 같은 단위)
+        radius: hotspot 주변 확장 범위 (픽셀, 기존 ROI와 같은 [y-5, y+5) 창)
+
+    Returns:
+        list: [{'bbox': (x, y, w, h), 'area': int, 'centroid': (cx, cy),
+                'peak': float, 'seeds': [seed index, ...]}, ...]
+    """
+    if len(seeds) == 0:
+        return []
+    h, w = values.shape
+    v = values.astype(np.float64, copy=False)
+    sx = np.fromiter((s[0] for s in seeds), dtype=np.intp, count=len(seeds))
+    sy = np.fromiter((s[1] for s in seeds), dtype=np.intp, count=len(seeds))
+    sv = np.fromiter((s[2] for s in seeds), dtype=np.float64, count=len(seeds))
+
+    # ===== 4단계: Hotspot 주변 영역 확장 =====
+    # 주변 hotspot 값의 최대/최소를 팽창으로 한 번에 전파 (anchor로 기존 ROI 창과 맞춤)
+    seed_max = np.full((h, w), -np.inf)
+    seed_min = np.full((h, w), -np.inf)
+    np.maximum.at(seed_max, (sy, sx), sv)
+    np.maximum.at(seed_min, (sy, sx), -sv)
+    kernel = np.ones((2 * radius, 2 * radius), dtype=np.uint8)
+    anchor = (radius - 1, radius - 1)
+    seed_max = cv2.dilate(seed_max, kernel, anchor=anchor, borderType=cv2.BORDER_CONSTANT,
+                          borderValue=-np.inf)
+    seed_min = -cv2.dilate(seed_min, kernel, anchor=anchor, borderType=cv2.BORDER_CONSTANT,
+                           borderValue=-np.inf)
+    mask = (np.abs(v - seed_max) <= delta) | (np.abs(v - seed_min) <= delta)
+    mask[sy, sx] = True
+
+    # ===== 5단계: 연결 요소 → 화점 영역 =====
+    n, labels, stats, centroids = cv2.connectedComponentsWithStats(
+        mask.view(np.uint8), connectivity=8
+    )
+    seed_labels = labels[sy, sx]
+
+    # 영역별 최고값 (마스크 픽셀만 사용)
+    peaks = np.full(n, -np.inf)
+    np.maximum.at(peaks, labels[mask], v[mask])
+
+    regions = []
+    for label in np.unique(seed_labels):
+        x, y, bw, bh, area = (int(c) for c in stats[label])
+        regions.append({
+            'bbox': (x, y, bw, bh),
+            'area': area,
+            'centroid': (float(centroids[label][0]), float(centroids[label][1])),
+            'peak': float(peaks[label]),
+            'seeds': np.flatnonzero(seed_labels == label).tolist(),
+        })
+    return regions
+
+
+def raw_to_celsius(raw, tau):
+    """
+    RAW16 값(0.01 Kelvin)을 (보정 온도, 보정 전 온도) 섭씨로 변환
+
+    detect_fire와 같은 식을 사용하므로 같은 dtype 입력이면 결과도 비트 단위로 같다.
+    """
+    T_scene_K = raw / 100
+    T_corrected_K = (T_scene_K - T_ATM_K) / tau + T_ATM_K
+    return T_corrected_K - T_0C_K, T_scene_K - T_0C_K
+
+
+@dataclass(frozen=True)
+class FireThresholds:
+    """
+    화점 탐지 임계값을 RAW16(0.01 Kelvin) 정수 도메인으로 미리 변환한 값
+
+    보정 온도는 RAW16에 대한 단조 증가 선형식이므로
+        - (최고 - 평균) 조건은 RAW 차이에 대한 조건으로,
+        - 최소 온도 조건은 RAW 최소값 조건으로
+    바꿀 수 있다. 파라미터가 바뀔 때 한 번만 계산하면 프레임마다 전체 배열을
+    실수로 변환할 필요가 없다.
+    """
+    min_val: float       # 최소 온도 (섭씨, 보정 후)
+    tau: float           # 대기 투과율
+    min_raw: int         # 보정 온도 >= min_val 이 되는 최소 RAW16 값
+    diff_raw: float      # (최고 - 평균) RAW 임계값 = max(raw_thr, thr * tau) * 100
+    delta_raw: float     # 영역 확장 허용 RAW 차이 = delta_thr * tau * 100
+
+
+def compile_fire_thresholds(min_val, tau=0.95, thr=20, raw_thr=5, delta_thr=10):
+    """
+    섭씨 임계값(FIRE_MIN_TEMP/FIRE_THR/FIRE_RAW_THR/TAU)을 FireThresholds로 변환
+
+    Returns:
+        FireThresholds
+    """
+    tau = float(tau)
+    min_val = float(min_val)
+
+    # 보정 온도 >= min_val 을 만족하는 가장 작은 정수 RAW 값 (실수 경로와 같은 식으로 경계 확인)
+    def corrected(d):
+        return ((d / 100 - T_ATM_K) / tau + T_ATM_K) - T_0C_K
+
+    min_raw = int(np.ceil(((min_val - (T_ATM_K - T_0C_K)) * tau + T_ATM_K) * 100))
+    while min_raw > 0 and corrected(min_raw - 1) >= min_val:
+        min_raw -= 1
+    while corrected(min_raw) < min_val:
+        min_raw += 1
+
+    return FireThresholds(
+        min_val=min_val,
+        tau=tau,
+        min_raw=min_raw,
+        diff_raw=max(float(raw_thr), float(thr) * tau) * 100,
+        delta_raw=float(delta_thr) * tau * 100,
+    )
+
+
+def _scale_strides(window_size, stride, scales):
+    """
+    (윈도우 크기, stride) 목록 - 다중 스케일이면 stride를 윈도우 크기 비율로 맞춤
+
+    예: window_size=10, stride=5, scales=[6, 10, 16] → [(6, 3), (10, 5), (16, 8)]
+    """
+    stride = int(stride or window_size)
+    sizes = [int(s) for s in scales] if scales else [int(window_size)]
+    return [(ws, max(1, int(round(ws * stride / window_size)))) for ws in sizes]
+
+
+def _raw_candidates(data, thresholds, window_size, stride, include_edges):
+    """
+    한 스케일의 hotspot 후보 (cys, cxs, peak_raw) - detect_fire_raw 3단계
+
+    stride == window_size(격자)는 블록을 모아 한 번에 축약하고, 겹치는 윈도우는
+    sliding_block_stats로 계산한다. 어느 쪽이든 최대값 위치는 조건을 통과한
+    윈도우에서만 찾는다.
+    """
+    h, w = data.shape
+    ys = _window_origins(h, window_size, include_edges, stride)
+    xs = _window_origins(w, window_size, include_edges, stride)
+    if not (ys.size and xs.size):
+        return None
+
+    n = window_size * window_size
+    if stride == window_size:
+        # 블록 최대값(uint16)과 합계(int64)만 계산
+        windows = sliding_window_view(data, (window_size, window_size))[ys[:, None], xs[None, :]]
+        flat = windows.reshape(len(ys), len(xs), n)
+        block_max = flat.max(axis=2)
+        block_sum = flat.sum(axis=2, dtype=np.int64)
+    else:
+        flat = None
+        block_max, block_sum = sliding_block_stats(data, window_size, ys, xs)
+
+    # (최고 - 평균) >= diff_raw  <=>  n * 최고 - 합계 >= n * diff_raw
+    hit = ((n * block_max.astype(np.int64) - block_sum >= n * thresholds.diff_raw) &
+           (block_max >= thresholds.min_raw))
+    by, bx = np.nonzero(hit)
+    if by.size == 0:
+        return None
+
+    if flat is not None:
+        hit_windows = flat[by, bx]
+    else:
+        hit_windows = sliding_window_view(data, (window_size, window_size))[ys[by], xs[bx]]
+        hit_windows = hit_windows.reshape(by.size, n)
+    idx = hit_windows.argmax(axis=1)
+    cys = ys[by] + idx // window_size
+    cxs = xs[bx] + idx % window_size
+    return cys, cxs, block_max[by, bx]
+
+
+def detect_fire_raw(data, thresholds, window_size=10, include_edges=False, analysis=None,
+                    with_regions=False, stride=None, scales=None):
+    """
+    정수 도메인 화점 탐지 (detect_fire와 같은 판정, 같은 반환 형식)
+
+    블록 최대값/합계를 RAW16 그대로 계산하고 미리 변환한 임계값과 비교한다.
+    섭씨 변환은 hotspot으로 채택된 픽셀에만 수행한다.
+
+    Args:
+        data: RAW16 온도 데이터 (단위: 0.01 Kelvin, 2D 배열)
+        thresholds: compile_fire_thresholds() 결과
+        window_size: 스캔 윈도우 크기 (픽셀)
+        include_edges: True면 오른쪽/아래쪽 가장자리도 검사
+        analysis: 같은 프레임의 ThermalFrameAnalysis (있으면 최고값으로 조기 종료)
+        with_regions: True면 화점 영역 리스트를 4번째 값으로 반환 (peak는 보정 온도)
+        stride: 윈도우 간격 (None 또는 window_size면 기존 격자, 작으면 겹치는 윈도우)
+        scales: 다중 스케일 윈도우 크기 목록 (예: [6, 10, 16], stride는 비율 유지)
+
+    Returns:
+        tuple: (detected: bool, bboxes: list or None, hotspots: np.ndarray[, regions: list])
+    """
+    try:
+        if analysis is not None and analysis.max_raw < thresholds.min_raw:
+            return _fire_result([], [], with_regions)
+        data = np.asarray(data)
+        h, w = data.shape
+
+        # 격자 preset(stride == window_size, 단일 스케일)이 아니면 가장자리까지 검사
+        plan = _scale_strides(window_size, stride, scales)
+        sliding = len(plan) > 1 or plan[0][1] != plan[0][0]
+        include_edges = include_edges or sliding
+
+        found = [c for c in (_raw_candidates(data, thresholds, ws, st, include_edges)
+                             for ws, st in plan) if c is not None]
+        if not found:
+            return _fire_result([], [], with_regions)
+        cys = np.concatenate([c[0] for c in found])
+        cxs = np.concatenate([c[1] for c in found])
+        peak_raw = np.concatenate([c[2] for c in found])
+        if include_edges:
+            # 겹치는 윈도우/스케일에서 나온 같은 픽셀은 한 번만 사용 (처음 나온 순서 유지)
+            _, first = np.unique(cys * w + cxs, return_index=True)
+            keep = np.sort(first)
+            cys, cxs, peak_raw = cys[keep], cxs[keep], peak_raw[keep]
+
+        # hotspot 픽셀만 섭씨로 변환
+        temp_corrected, temp_raw = raw_to_celsius(peak_raw.astype(np.float64), thresholds.tau)
+        hotspots = make_hotspots(cxs, cys, temp_corrected, temp_raw)
+
+        seeds = list(zip(cxs, cys, peak_raw))
+        regions = grow_regions(data, seeds, thresholds.delta_raw)
+        for region in regions:
+            # 영역 최고값은 RAW16 → 보정 온도(섭씨)로 변환해 float 경로와 단위를 맞춤
+            region['peak'] = float(raw_to_celsius(region['peak'], thresholds.tau)[0])
+        return _fire_result(hotspots, regions, with_regions)
+
+    except Exception:
+        return _fire_result([], [], with_regions)
+
+
+class AdaptiveIRThresholds:
+    """
+    장면 통계 기반 적응형 화점 임계값 (FIRE_FUSION_ROADMAP Phase 7)
+
+    RAW16 값의 감쇠 히스토그램(빈 폭 16 = 0.16K, 4096 빈)을 프레임마다 bincount
+    한 번으로 갱신하고, 누적합에서 중앙값/상위 백분위수를 읽는다 (프레임 정렬 없음).
+
+        배경 온도 = P50 (보정 온도)
+        FIRE_MIN_TEMP = base + max(0, 배경 - BG_REF) * BG_GAIN
+        FIRE_THR      = max(base, SPREAD_GAIN * (P_high - P50))   (보정 온도 차)
+        FIRE_RAW_THR  = max(base, SPREAD_GAIN * (P_high - P50))   (보정 전 온도 차)
+
+    더운 야외 장면(배경 상승, 넓은 온도 분포)에서 임계값이 함께 올라가며 기본값
+    아래로는 내려가지 않는다. 값은 STEP 단위로 올림해 매 프레임 재컴파일을 피한다.
+
+    기본 FIRE_MIN_TEMP 이상인 픽셀과 직전 프레임 화점 영역은 히스토그램에 넣지 않는다.
+    큰 화재가 P_high를 끌어올려 자기 자신의 탐지 임계값을 올리지 않도록 하기 위함이다.
+    """
+
+    BIN_SHIFT = 4
+    N_BINS = 65536 >> BIN_SHIFT
+
+    def __init__(self, min_temp, thr, raw_thr, decay=0.95, bg_ref=35.0, bg_gain=0.5,
+                 spread_gain=2.0, high_pct=95.0, step=0.5):
+        """
+        Args:
+            min_temp, thr, raw_thr: 기본 임계값 (FIRE_MIN_TEMP/FIRE_THR/FIRE_RAW_THR)
+            decay: 히스토그램 감쇠 계수 (0~1, 클수록 오래 기억)
+            bg_ref: 최소 온도 보정을 시작하는 배경 온도 (섭씨)
+            bg_gain: 배경 온도 1도당 최소 온도 증가량
+            spread_gain: 온도 분포 폭 (P_high - P50) 대비 차이 임계값 배수
+            high_pct: 분포 폭 계산에 쓰는 상위 백분위수
+            step: 임계값 양자화 단위 (섭씨)
+        """
+        self.set_base(min_temp, thr, raw_thr)
+        self.decay = min(1.0, max(0.0, float(decay)))
+        self.bg_ref = float(bg_ref)
+        self.bg_gain = float(bg_gain)
+        self.spread_gain = float(spread_gain)
+        self.high_pct = float(high_pct)
+        self.step = max(1e-3, float(step))
+        self.hist = np.zeros(self.N_BINS, dtype=np.float64)
+        self.active = None  # 최근 update() 결과 dict
+        self._cut_key = None  # (base min_temp, tau) → 통계 제외 RAW16 하한 캐시
+        self._cut_raw = None
+
+    @classmethod
+    def from_cfg(cls, cfg, min_temp, thr, raw_thr):
+        """
+        CAMERA.IR.ADAPTIVE 설정으로 생성 (ENABLED가 아니면 None)
+
+        cfg 예시: {ENABLED: true, DECAY: 0.95, BG_REF: 35, BG_GAIN: 0.5, SPREAD_GAIN: 2.0}
+        """
+        cfg = cfg or {}
+        if not cfg.get('ENABLED', False):
+            return None
+        return cls(
+            min_temp, thr, raw_thr,
+            decay=cfg.get('DECAY', 0.95),
+            bg_ref=cfg.get('BG_REF', 35.0),
+            bg_gain=cfg.get('BG_GAIN', 0.5),
+            spread_gain=cfg.get('SPREAD_GAIN', 2.0),
+            high_pct=cfg.get('HIGH_PCT', 95.0),
+            step=cfg.get('STEP', 0.5),
+        )
+
+    def set_base(self, min_temp, thr, raw_thr):
+        """기본 임계값 변경 (update_fire_params에서 호출)"""
+        self.base = (float(min_temp), float(thr), float(raw_thr))
+
+    def percentiles(self, pcts):
+        """누적 히스토그램에서 백분위수 RAW16 값 (빈 중앙값)"""
+        cdf = np.cumsum(self.hist)
+        total = cdf[-1]
+        if total <= 0:
+            return None
+        idx = np.searchsorted(cdf, np.asarray(pcts, dtype=np.float64) / 100.0 * total)
+        return (np.minimum(idx, self.N_BINS - 1) + 0.5) * (1 << self.BIN_SHIFT)
+
+    def _quantize(self, value):
+        return float(np.ceil(value / self.step - 1e-9) * self.step)
+
+    def _fire_cut_raw(self, tau):
+        """기본 FIRE_MIN_TEMP에 해당하는 RAW16 값 (이 이상은 배경 통계에서 제외)"""
+        key = (self.base[0], float(tau))
+        if key != self._cut_key:
+            self._cut_raw = compile_fire_thresholds(self.base[0], tau=tau).min_raw
+            self._cut_key = key
+        return self._cut_raw
+
+    def update(self, raw16, tau, exclude=None):
+        """
+        히스토그램 갱신 후 현재 임계값 계산
+
+        Args:
+            raw16: uint16 2D 배열
+            tau: 대기 투과율
+            exclude: 통계에서 뺄 픽셀 bool 마스크 (직전 프레임 화점 영역, 없으면 None)
+
+        Returns:
+            dict: {'min_temp', 'thr', 'raw_thr', 'bg_temp', 'spread'} (섭씨)
+        """
+        background = raw16 < self._fire_cut_raw(tau)
+        if exclude is not None:
+            background &= ~exclude
+        counts = np.bincount(raw16[background] >> self.BIN_SHIFT, minlength=self.N_BINS)
+        self.hist *= self.decay
+        self.hist += counts
+
+        base_min, base_thr, base_raw = self.base
+        pcts = self.percentiles((50.0, self.high_pct))
+        if pcts is None:
+            # 배경 픽셀이 하나도 없음 (프레임 전체가 고온) → 기본값 유지
+            self.active = {'min_temp': base_min, 'thr': base_thr, 'raw_thr': base_raw,
+                           'bg_temp': None, 'spread': None}
+            return self.active
+        p50, p_high = pcts
+        bg_temp = float(raw_to_celsius(p50, tau)[0])
+        spread_raw = (p_high - p50) / 100.0          # 보정 전 온도 폭 (섭씨)
+        spread = spread_raw / float(tau)             # 보정 온도 폭 (섭씨)
+
+        self.active = {
+            'min_temp': self._quantize(base_min + max(0.0, bg_temp - self.bg_ref) * self.bg_gain),
+            'thr': self._quantize(max(base_thr, self.spread_gain * spread)),
+            'raw_thr': self._quantize(max(base_raw, self.spread_gain * spread_raw)),
+            'bg_temp': round(bg_temp, 2),
+            'spread': round(spread, 2),
+        }
+        return self.active
+
+
+class ThermalFrameAnalysis:
+    """
+    RAW16 프레임 1장에 대한 공용 분석 결과
+
+    최고/최저 온도, 정규화 범위, 보정 온도 배열을 프레임당 한 번만 계산해
+    컬러맵/최고온도/화점 탐지 단계가 함께 사용한다. 캡처 후에는 읽기 전용으로
+    취급하며 버퍼 튜플의 마지막 요소로 sender/GUI까지 전달된다.
+
+    Attributes:
+        raw16: 방향 조정이 끝난 RAW16 데이터 (0.01 Kelvin)
+        tau: 대기 투과율
+        max_raw / min_raw: 프레임 최고/최저 RAW16 값 (= 정규화 범위)
+        max_pos / min_pos: 최고/최저 지점 (x, y)
+    """
+
+    __slots__ = ("raw16", "tau", "max_raw", "min_raw", "max_pos", "min_pos",
+                 "_temperatures", "_max_temp_info")
+
+    def __init__(self, raw16, tau):
+        self.raw16 = raw16
+        self.tau = float(tau)
+
+        # 보정 온도는 RAW16에 대해 단조 증가하므로 최고/최저 위치는 RAW16에서 바로 찾음
+        h, w = raw16.shape
+        i_max = int(np.argmax(raw16))
+        i_min = int(np.argmin(raw16))
+        self.max_pos = (i_max % w, i_max // w)
+        self.min_pos = (i_min % w, i_min // w)
+        self.max_raw = int(raw16.flat[i_max])
+        self.min_raw = int(raw16.flat[i_min])
+
+        self._temperatures = None
+        self._max_temp_info = None
+
+    @property
+    def norm_range(self):
+        """정규화 범위 (min_raw, max_raw)"""
+        return self.min_raw, self.max_raw
+
+    @property
+    def peak_corrected(self):
+        """프레임 최고 보정 온도 (섭씨, detect_fire와 같은 float64 계산)"""
+        corrected, _ = raw_to_celsius(np.float64(self.max_raw), self.tau)
+        return float(corrected)
+
+    def temperatures(self):
+        """(보정 온도, 보정 전 온도) 섭씨 배열 - 처음 요청될 때 한 번만 계산"""
+        if self._temperatures is None:
+            self._temperatures = raw_to_celsius(self.raw16, self.tau)
+        return self._temperatures
+
+    @property
+    def max_temp_info(self):
+        """
+        최고/최저 온도 정보 dict (IRCamera._get_max_temp_info 형식)
+
+        두 픽셀만 float32로 변환하므로 전체 배열을 변환하던 기존 결과와 같다.
+        """
+        if self._max_temp_info is None:
+            (x, y), (x_min, y_min) = self.max_pos, self.min_pos
+            px = np.array([self.max_raw, self.min_raw], dtype=np.float32)
+            temp_corrected, temp_raw = raw_to_celsius(px, self.tau)
+            self._max_temp_info = {
+                'x': int(x),
+                'y': int(y),
+                'min_temp': round(float(temp_corrected[1]), 2),
+                'temp_raw': round(float(temp_raw[0]), 2),
+                'temp_corrected': round(float(temp_corrected[0]), 2),
+                'tau': round(self.tau, 3),
+            }
+        return self._max_temp_info
+
+
+def _region_mask(shape, regions):
+    """화점 영역 bbox → bool 마스크 (영역이 없으면 None)"""
+    if not regions:
+        return None
+    mask = np.zeros(shape, dtype=bool)
+    for region in regions:
+        x, y, w, h = region['bbox']
+        mask[y:y + h, x:x + w] = True
+    return mask
 
 
 def draw_bbox(frame, datas):
@@ -213,6 +766,14 @@ class IRCamera(FrameSource):
                 - FIRE_MIN_TEMP: 화점 최소 온도 (기본: 80도C)
                 - FIRE_THR: 보정 온도 임계값 (기본: 20)
                 - FIRE_RAW_THR: raw 온도 임계값 (기본: 5)
+                - FIRE_INT_DOMAIN: RAW16 정수 도메인 탐지 사용 (기본: False)
+                - WINDOW: 화점 스캔 윈도우 크기 (기본: 10)
+                - STRIDE: 윈도우 간격 (기본: WINDOW = 기존 격자, 작으면 겹치는 윈도우)
+                - WINDOW_SCALES: 다중 스케일 윈도우 크기 목록 (기본: None)
+                - COLORMAP: 컬러맵 설정 {MODE, PALETTE, RANGE, AGC_ALPHA} (기본: auto/PLASMA)
+                - LAZY_VIS: 시각화 프레임을 읽힐 때만 렌더링 (기본: False)
+                - BACKGROUND: 정적 고온 물체 억제 {ENABLED, ALPHA, RISE_THR, FLICKER_STD, WARMUP}
+                - ADAPTIVE: 장면 통계 기반 적응형 임계값 {ENABLED, DECAY, BG_REF, BG_GAIN, SPREAD_GAIN}
             d_buffer: 컬러맵 이미지 출력 버퍼 (DoubleBuffer)
             d16_buffer: RAW16 데이터 출력 버퍼 (DoubleBuffer)
         """
@@ -237,12 +798,35 @@ class IRCamera(FrameSource):
         self.tau = cfg.get('TAU', 0.95)  # 대기 투과율 (실내: 0.95)
         self.fire_thr = cfg.get('FIRE_THR', 20)  # 보정 온도 임계값
         self.fire_raw_thr = cfg.get('FIRE_RAW_THR', 5)  # raw 온도 임계값
+        self.fire_int_domain = bool(cfg.get('FIRE_INT_DOMAIN') or False)  # 정수 도메인 탐지
+        self.fire_window = int(cfg.get('WINDOW') or 10)  # 스캔 윈도우 크기
+        self.fire_stride = cfg.get('STRIDE') or None  # 윈도우 간격 (None = 격자)
+        self.fire_scales = cfg.get('WINDOW_SCALES') or None  # 다중 스케일 윈도우 크기
+        self.fire_thresholds = None  # RAW16 도메인으로 변환된 임계값 (파라미터 변경 시 갱신)
+        self._compile_fire_thresholds()
         self.cur_det = False  # 현재 프레임 탐지 결과
-        self.hotspots = []    # 현재 프레임의 hotspot 리스트
+        self.hotspots = empty_hotspots()  # 현재 프레임의 hotspot 레코드 배열
+        self.regions = []     # 현재 프레임의 화점 영역 (grow_regions 결과)
         
         # 최고 온도 정보 (매 프레임 업데이트)
         self.max_temp_info = None
 
+        # RAW16 → BGR 컬러맵 (auto: 프레임별 정규화, fixed: 절대 온도 범위, agc: 평활화)
+        self.colormap = IRColormap.from_cfg(cfg.get('COLORMAP'))
+        self.lazy_vis = bool(cfg.get('LAZY_VIS') or False)  # d_buffer 지연 렌더링
+        self._render_lock = threading.Lock()
+
+        # 시간 배경 모델 (정적 고온 물체 억제, 비활성화 시 None)
+        self.background = IRBackgroundModel.from_cfg(cfg.get('BACKGROUND'))
+        self._orient_key = None  # 방향이 바뀌면 배경 재학습
+
+        # 적응형 임계값 (비활성화 시 None, 설정값을 기본/하한으로 사용)
+        self.adaptive = AdaptiveIRThresholds.from_cfg(
+            cfg.get('ADAPTIVE'), self.fire_min_temp, self.fire_thr, self.fire_raw_thr
+        )
+        self._adaptive_key = None        # 현재 컴파일된 적응형 임계값 (min_temp, thr, raw_thr)
+        self._adaptive_thresholds = None
+
     def update_fire_params(self, fire_detection=None, min_temp=None, thr=None, raw_thr=None, tau=None):
         """런타임에 화점 탐지 파라미터를 업데이트"""
         if fire_detection is not None:
@@ -255,6 +839,19 @@ class IRCamera(FrameSource):
             self.fire_raw_thr = float(raw_thr)
         if tau is not None:
             self.tau = float(tau)
+        self._compile_fire_thresholds()
+        if getattr(self, 'adaptive', None) is not None:
+            self.adaptive.set_base(self.fire_min_temp, self.fire_thr, self.fire_raw_thr)
+
+    def _compile_fire_thresholds(self):
+        """현재 화점 파라미터를 RAW16 임계값으로 변환 (캡처 스레드는 완성된 객체만 참조)"""
+        try:
+            self.fire_thresholds = compile_fire_thresholds(
+                self.fire_min_temp, tau=self.tau, thr=self.fire_thr, raw_thr=self.fire_raw_thr
+            )
+        except Exception as e:
+            logger.warning("[IRCam] Fire threshold compile failed: %s", e)
+            self.fire_thresholds = None
 
 
     def _get_max_temp_info(self, raw16, tau=None):
@@ -278,142 +875,197 @@ class IRCamera(FrameSource):
             # config에서 tau 사용 (인자로 전달되지 않은 경우)
             if tau is None:
                 tau = self.tau
-            tau_val = float(tau)
-            
-            # 온도 변환 상수
-            T_atm_K = 295.15   # 대기 온도 (약 22도C)
-            T_0C_K = 273.15    # 0도C in Kelvin
-            
-            # RAW16 → Kelvin → 섭씨
-            T_scene_K = raw16.astype(np.float32) / 100.0
-            
-            # 대기 투과율 보정
-            T_corrected_K = (T_scene_K - T_atm_K) / tau + T_atm_K
-            
-            # 섭씨 변환
-            temp_raw = T_scene_K - T_0C_K
-            temp_corrected = T_corrected_K - T_0C_K
-            
-            # 최고/최저 온도 위치 찾기 (보정 후 온도 기준)
-            max_idx = np.unravel_index(np.argmax(temp_corrected), temp_corrected.shape)
-            min_idx = np.unravel_index(np.argmin(temp_corrected), temp_corrected.shape)
-            y, x = int(max_idx[0]), int(max_idx[1])
-            y_min, x_min = int(min_idx[0]), int(min_idx[1])
-            
-            return {
-                'x': x,
-                'y': y,
-                'min_temp': round(float(temp_corrected[y_min, x_min]), 2),
-                'temp_raw': round(float(temp_raw[y, x]), 2),
-                'temp_corrected': round(float(temp_corrected[y, x]), 2),
-                'tau': round(tau_val, 3),
-            }
+            return ThermalFrameAnalysis(raw16, tau).max_temp_info
         except Exception:
             return None
 
 
+    def _adaptive_params(self, raw16, tau, regions=None):
+        """
+        적응형 임계값 갱신
+
+        Args:
+            regions: 직전 프레임 화점 영역 (배경 통계에서 제외)
+
+        Returns:
+            tuple: (min_temp, thr, raw_thr, FireThresholds) - 값이 바뀔 때만 재컴파일
+        """
+        active = self.adaptive.update(raw16, tau, _region_mask(raw16.shape, regions))
+        key = (active['min_temp'], active['thr'], active['raw_thr'], float(tau))
+        if key != self._adaptive_key:
+            try:
+                self._adaptive_thresholds = compile_fire_thresholds(
+                    key[0], tau=tau, thr=key[1], raw_thr=key[2]
+                )
+            except Exception as e:
+                logger.warning("[IRCam] Adaptive threshold compile failed: %s", e)
+                self._adaptive_thresholds = None
+            self._adaptive_key = key
+            logger.debug("[IRCam] Adaptive thresholds: %s", active)
+        return key[0], key[1], key[2], self._adaptive_thresholds
+
+    def _update_background(self, raw16):
+        """현재 프레임으로 배경 모델 갱신 (방향 변경 시 재학습)"""
+        orient = (camera_state.rotate_ir, camera_state.flip_h_ir, camera_state.flip_v_ir)
+        if orient != self._orient_key:
+            self._orient_key = orient
+            self.background.reset()
+        self.background.update(raw16, _region_mask(raw16.shape, self.regions))
+
+    def _render(self, raw16, analysis, bboxes):
+        """
+        표시용 BGR 프레임 생성
+
+        Args:
+            raw16: 방향 조정이 끝난 RAW16 데이터
+            analysis: 같은 프레임의 ThermalFrameAnalysis
+            bboxes: 그릴 화점 박스 [(x, y, w, h), ...] 또는 None
+
+        Returns:
+            np.ndarray: 출력 해상도(RES)의 BGR 이미지
+        """
+        # 컬러맵 AGC 상태는 렌더링 스레드가 여럿이어도 한 번에 하나씩 갱신
+        with self._render_lock:
+            # RAW16 → BGR LUT 한 번으로 변환 (auto 모드는 분석 결과의 정규화 범위 재사용)
+            frame = self.colormap.apply(raw16, analysis.norm_range)
+        if bboxes:
+            frame = draw_bbox(frame, bboxes)
+        # config의 RES 설정에 맞춰 리사이즈
+        return cv2.resize(frame, (self.size[0], self.size[1]), interpolation=cv2.INTER_AREA)
+
+
     def capture(self):
         """
         단일 프레임 캡처 및 처리
         
         처리 순서:
             1. RAW16 데이터 캡처 (libuvc)
-            2. 정규화 및 컬러맵 적용 (PLASMA)
-            3. 방향 조정 (회전/반전) - 런타임 키보드 제어
+            2. 방향 조정 (회전/반전) - 런타임 키보드 제어
+            3. 프레임 공용 분석 (ThermalFrameAnalysis)
             4. 화점 탐지 (옵션)
-            5. 탐지 결과 시각화 (박스 그리기)
-            6. 출력 해상도로 리사이즈
+            5. 시각화: 컬러맵(IRColormap LUT) + 박스 + 리사이즈
+               (LAZY_VIS면 Deferred로 미뤄 소비자가 읽을 때 렌더링)
         
         Returns:
-            tuple: (raw16, frame, timestamp, max_temp_info, hotspots)
+            tuple: (raw16, frame, timestamp, max_temp_info, hotspots, analysis)
                 - raw16: 16bit 온도 데이터 (분석/저장용)
-                - frame: 8bit BGR 컬러맵 이미지 (화면 표시용)
+                - frame: 8bit BGR 컬러맵 이미지 (화면 표시용, LAZY_VIS면 Deferred)
                 - timestamp: 캡처 시각 문자열 (YYMMDDHHMMSSff)
                 - max_temp_info: 최고 온도 정보 dict
-                - hotspots: 화점 리스트 [(x, y, temp, raw_temp), ...]
+                - hotspots: 화점 레코드 배열 (core.hotspot.HOTSPOT_DTYPE)
+                - analysis: ThermalFrameAnalysis (최고/최저, 보정 온도 캐시)
             
-            캡처 실패 시: (None, None, None, None, [])
+            캡처 실패 시: (None, None, None, None, [], None)
         """
         # ===== 1. RAW16 데이터 캡처 =====
         raw16 = self.cam.capture()
         if raw16 is None:
-            return None, None, None, None, []
+            return None, None, None, None, [], None
 
         # 타임스탬프 생성 (밀리초 2자리까지)
         ts = datetime.now().strftime("%y%m%d%H%M%S%f")[:-4]
         
-        # ===== 2. 정규화 및 컬러맵 적용 =====
-        # RAW16 → 0~65535 범위로 정규화 (대비 향상)
-        norm = cv2.normalize(raw16, None, 0, 65535, cv2.NORM_MINMAX)
-        # 16bit → 8bit 변환 (상위 8비트 사용)
-        gray8 = (norm >> 8).astype(np.uint8)
-        # 그레이스케일 → 컬러맵 (PLASMA: 보라-노랑 계열, 열화상에 적합)
-        frame = cv2.applyColorMap(gray8, cv2.COLORMAP_PLASMA)
-        
-        # ===== 3. 방향 조정 (키보드로 실시간 제어) =====
+        # ===== 2. 방향 조정 (키보드로 실시간 제어) =====
         # camera_state는 싱글톤으로 app.py에서 키보드 입력으로 변경됨
+        # 컬러맵은 픽셀 단위 변환이므로 RAW16만 회전/반전한 뒤 한 번 적용
         
         # 회전 적용 (0, 90, 180, 270도)
         rotate = camera_state.rotate_ir
         if rotate == 90:
-            frame = cv2.rotate(frame, cv2.ROTATE_90_CLOCKWISE)
             raw16 = cv2.rotate(raw16, cv2.ROTATE_90_CLOCKWISE)
         elif rotate == 180:
-            frame = cv2.rotate(frame, cv2.ROTATE_180)
             raw16 = cv2.rotate(raw16, cv2.ROTATE_180)
         elif rotate == 270:
-            frame = cv2.rotate(frame, cv2.ROTATE_90_COUNTERCLOCKWISE)
             raw16 = cv2.rotate(raw16, cv2.ROTATE_90_COUNTERCLOCKWISE)
         
         # 좌우반전 (horizontal flip)
         if camera_state.flip_h_ir:
-            frame = cv2.flip(frame, 1)  # 1 = 좌우반전
-            raw16 = cv2.flip(raw16, 1)
+            raw16 = cv2.flip(raw16, 1)  # 1 = 좌우반전
         
         # 상하반전 (vertical flip)
         if camera_state.flip_v_ir:
-            frame = cv2.flip(frame, 0)  # 0 = 상하반전
-            raw16 = cv2.flip(raw16, 0)
+            raw16 = cv2.flip(raw16, 0)  # 0 = 상하반전
+
+        # ===== 3. 프레임 공용 분석 (최고/최저, 정규화 범위) =====
+        analysis = ThermalFrameAnalysis(raw16, self.tau)
         
-        # ===== 4. 최고 온도 지점 추출 =====
-        self.max_temp_info = self._get_max_temp_info(raw16)
+        # 최고 온도 지점 정보
+        self.max_temp_info = analysis.max_temp_info
         
-        # ===== 5. 화점 탐지 =====
+        # ===== 4. 화점 탐지 =====
         # 방향 조정이 완료된 raw16으로 탐지 수행
         # (좌표가 최종 출력 이미지와 일치하도록)
         datas = None
-        self.hotspots = []
+        prev_regions = self.regions
+        self.hotspots = empty_hotspots()
+        self.regions = []
         if self.fire_detection_enabled:
-            self.cur_det, datas, self.hotspots = detect_fire(
-                raw16, self.fire_min_temp, 
-                tau=self.tau, thr=self.fire_thr, raw_thr=self.fire_raw_thr
-            )
+            min_temp, thr, raw_thr = self.fire_min_temp, self.fire_thr, self.fire_raw_thr
+            thresholds = self.fire_thresholds
+            if self.adaptive is not None:
+                min_temp, thr, raw_thr, thresholds = self._adaptive_params(
+                    raw16, analysis.tau, prev_regions
+                )
+            if self.fire_int_domain and thresholds is not None:
+                self.cur_det, datas, self.hotspots, self.regions = detect_fire_raw(
+                    raw16, thresholds, window_size=self.fire_window, analysis=analysis,
+                    with_regions=True, stride=self.fire_stride, scales=self.fire_scales
+                )
+            else:
+                self.cur_det, datas, self.hotspots, self.regions = detect_fire(
+                    raw16, min_temp, 
+                    tau=analysis.tau, thr=thr, raw_thr=raw_thr,
+                    window_size=self.fire_window, analysis=analysis, with_regions=True,
+                    stride=self.fire_stride, scales=self.fire_scales
+                )
+            
+            # 현재 적용 중인 임계값을 최고온도 정보에 포함 (sender/GUI 표시용)
+            active = {'min_temp': min_temp, 'thr': thr, 'raw_thr': raw_thr,
+                      'adaptive': self.adaptive is not None}
+            if self.adaptive is not None:
+                active.update(bg_temp=self.adaptive.active['bg_temp'],
+                              spread=self.adaptive.active['spread'])
+            self.max_temp_info = dict(self.max_temp_info, thresholds=active)
+
+            # 배경 대비 상승/깜빡임이 없는 hotspot(정적 고온 물체) 억제
+            if self.background is not None and len(self.hotspots):
+                xs = self.hotspots['x'].astype(np.intp)
+                ys = self.hotspots['y'].astype(np.intp)
+                keep = self.background.gate(xs, ys, raw16[ys, xs], analysis.tau)
+                if not keep.all():
+                    self.hotspots, self.regions = filter_hotspots(self.hotspots, self.regions, keep)
+                    self.cur_det = bool(self.regions)
+                    datas = [r['bbox'] for r in self.regions] if self.regions else None
             
             # 디버깅용 로그: 임계값, 최대 온도, 탐지 여부
             max_temp = None
             if self.max_temp_info and 'temp_corrected' in self.max_temp_info:
                 max_temp = self.max_temp_info['temp_corrected']
-            exceeded = max_temp is not None and max_temp >= self.fire_min_temp
+            exceeded = max_temp is not None and max_temp >= min_temp
             bbox_count = len(datas) if datas else 0
             logger.debug(
                 "[IR DET] thr=%.1fC max=%s exceeded=%s fire_detected=%s bbox=%d",
-                self.fire_min_temp,
+                min_temp,
                 max_temp if max_temp is not None else "N/A",
                 "YES" if exceeded else "NO",
                 "YES" if self.cur_det else "NO",
                 bbox_count,
             )
         
-        # ===== 6. 탐지 결과 시각화 =====
-        if self.fire_detection_enabled and self.cur_det and datas is not None:
-            frame = draw_bbox(frame, datas)
+        # 배경 갱신 (통과된 화점 영역은 FREEZE_FRAMES 동안 배경에 흡수되지 않도록 고정)
+        if self.background is not None:
+            self._update_background(raw16)
         
-        # ===== 7. 출력 해상도로 리사이즈 =====
-        # config의 RES 설정에 맞춰 리사이즈
-        frame = cv2.resize(frame, (self.size[0], self.size[1]), interpolation=cv2.INTER_AREA)
+        # ===== 5. 시각화 (컬러맵 + 박스 + 리사이즈) =====
+        # LAZY_VIS면 d_buffer를 읽는 소비자가 있을 때만 렌더링
+        bboxes = datas if (self.fire_detection_enabled and self.cur_det) else None
+        if self.lazy_vis:
+            frame = Deferred(lambda: self._render(raw16, analysis, bboxes))
+        else:
+            frame = self._render(raw16, analysis, bboxes)
         
         # hotspots 정보 포함하여 반환
-        return raw16, frame, ts, self.max_temp_info, self.hotspots
+        return raw16, frame, ts, self.max_temp_info, self.hotspots, analysis
 
 
     def start(self):
@@ -429,7 +1081,7 @@ class IRCamera(FrameSource):
                 s_time = time.time()  # 루프 시작 시간
 
                 # 프레임 캡처
-                raw16, frame, ts, max_temp_info, hotspots = self.capture()
+                raw16, frame, ts, max_temp_info, hotspots, analysis = self.capture()
                 
                 # 캡처 실패 시 스킵
                 if frame is None:
@@ -441,9 +1093,9 @@ class IRCamera(FrameSource):
                     dyn_sleep(s_time, self.sleep)
                     continue
 
-                # 버퍼에 데이터 저장 (tuple: (data, timestamp, max_temp_info, hotspots))
-                self.d16_buffer.write((raw16, ts, max_temp_info, hotspots))  # RAW16 + 최고온도 + hotspots
-                self.d_buffer.write((frame, ts, max_temp_info, hotspots))    # 컬러맵 + 최고온도 + hotspots
+                # 버퍼에 데이터 저장 (tuple: (data, timestamp, max_temp_info, hotspots, analysis))
+                self.d16_buffer.write((raw16, ts, max_temp_info, hotspots, analysis))  # RAW16 + 최고온도 + hotspots
+                self.d_buffer.write((frame, ts, max_temp_info, hotspots, analysis))    # 컬러맵 + 최고온도 + hotspots
                 self.last_ts = ts
 
                 # 프레임 카운트 및 로그
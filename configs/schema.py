@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Dict, Any, Tuple, Optional
+from typing import Dict, Any, List, Tuple, Optional
 
 
 @dataclass
@@ -12,6 +12,14 @@ class CameraConfig:
     FIRE_MIN_TEMP: Optional[float] = None
     FIRE_THR: Optional[float] = None
     FIRE_RAW_THR: Optional[float] = None
+    FIRE_INT_DOMAIN: Optional[bool] = None
+    WINDOW: Optional[int] = None
+    STRIDE: Optional[int] = None
+    WINDOW_SCALES: Optional[List[int]] = None
+    COLORMAP: Optional[Dict[str, Any]] = None
+    LAZY_VIS: Optional[bool] = None
+    BACKGROUND: Optional[Dict[str, Any]] = None
+    ADAPTIVE: Optional[Dict[str, Any]] = None
     TAU: Optional[float] = None
     DEVICE_OVERRIDE: Optional[str] = None
     ROTATE: Optional[int] = 0
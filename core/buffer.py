@@ -1,5 +1,44 @@
 import queue
-from typing import Any, Optional
+import threading
+from typing import Any, Callable, Optional
+
+
+class Deferred:
+    """
+    처음 요청될 때 한 번만 계산되는 값.
+    - 생산자는 비싼 결과(예: 시각화 프레임) 대신 Deferred를 버퍼에 기록
+    - DoubleBuffer.read가 소비자에게 돌려주기 전에 계산하고 결과를 보관
+    """
+
+    __slots__ = ("_fn", "_value", "_lock")
+
+    _PENDING = object()
+
+    def __init__(self, fn: Callable[[], Any]):
+        self._fn = fn
+        self._value: Any = Deferred._PENDING
+        self._lock = threading.Lock()
+
+    @property
+    def resolved(self) -> bool:
+        return self._value is not Deferred._PENDING
+
+    def get(self) -> Any:
+        if self._value is Deferred._PENDING:
+            with self._lock:
+                if self._value is Deferred._PENDING:
+                    self._value = self._fn()
+                    self._fn = None  # 클로저가 잡은 프레임 데이터 해제
+        return self._value
+
+
+def resolve_item(item: Any) -> Any:
+    """Deferred 또는 Deferred를 포함한 tuple을 실제 값으로 변환"""
+    if isinstance(item, Deferred):
+        return item.get()
+    if isinstance(item, tuple) and any(isinstance(v, Deferred) for v in item):
+        return tuple(v.get() if isinstance(v, Deferred) else v for v in item)
+    return item
 
 
 class DoubleBuffer:
@@ -7,6 +46,7 @@ class DoubleBuffer:
     최신 프레임 한 개만 보관하는 얇은 버퍼.
     - 내부적으로 maxsize=1 큐를 사용해 덮어쓰기 경합을 줄임
     - 읽을 것이 없으면 마지막으로 본 값을 돌려줘 busy-wait를 완화
+    - Deferred가 포함된 항목은 읽는 시점에 한 번만 계산 (아무도 읽지 않으면 계산하지 않음)
     """
 
     def __init__(self, maxsize: int = 1):
@@ -36,7 +76,19 @@ class DoubleBuffer:
                 if timeout is not None
                 else self.queue.get_nowait()
             )
+            item = resolve_item(item)
             self._last = item
             return item
         except queue.Empty:
             return self._last
+
+    def peek(self) -> Optional[Any]:
+        """
+        최신 항목을 소비하지 않고 조회.
+        - read()를 쓰는 주 소비자(송신 등)의 프레임을 빼앗지 않는 보조 소비자용
+        - Deferred는 계산하지 않고 그대로 돌려줌 (필요한 필드만 읽을 것)
+        """
+        with self.queue.mutex:
+            if self.queue.queue:
+                return self.queue.queue[-1]
+        return self._last
@@ -0,0 +1,146 @@
+"""
+IR-RGB 캘리브레이션 공유 서비스
+
+COORD 파라미터(offset/scale/mode/matrix)와 버전을 한 곳에서 관리합니다.
+송신/GUI 같은 소비자는 CalibrationView로 매퍼를 캐시해 두고 버전이 바뀔 때만 새로 받으므로
+프레임마다 CoordMapper/FireFusion을 만들지 않고, 모두 같은 캘리브레이션을 사용합니다.
+"""
+
+import threading
+import logging
+
+from .coord_mapper import CoordMapper
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_COORD = {'offset_x': 0.0, 'offset_y': 0.0, 'scale': None, 'mode': 'scale', 'matrix': None}
+
+
+def normalize_coord_cfg(params):
+    """CONFIG의 COORD 키(대문자/소문자)를 런타임에서 쓰는 소문자 키로 정규화"""
+    cfg = dict(params or {})
+    def _get(key, default=None):
+        val = cfg.get(key)
+        if val is None:
+            val = cfg.get(key.upper(), default)
+        return val if val is not None else default
+    out = {
+        'offset_x': float(_get('offset_x', 0.0)),
+        'offset_y': float(_get('offset_y', 0.0)),
+        'scale': _get('scale', None),
+        'mode': str(_get('mode', 'scale')).lower(),
+        'matrix': _get('matrix', None),
+    }
+    if out['scale'] is not None:
+        try:
+            out['scale'] = float(out['scale'])
+        except Exception:
+            out['scale'] = None
+    if out['mode'] != 'scale' and out['matrix'] is None:
+        logger.warning("COORD.MODE=%s without MATRIX, falling back to scale mode", out['mode'])
+        out['mode'] = 'scale'
+    return out
+
+
+class CalibrationService:
+    """
+    버전이 붙은 캘리브레이션 파라미터 + 버전별 CoordMapper 캐시
+
+    update()마다 버전이 올라가고, mapper()는 (IR 크기, RGB 크기)별로 현재 버전의 매퍼를
+    한 번만 만든다. 반환된 매퍼는 여러 스레드가 공유하므로 읽기 전용으로 사용한다.
+    """
+
+    def __init__(self, params=None):
+        self._lock = threading.Lock()
+        self._params = dict(DEFAULT_COORD)
+        self._params.update(params or {})
+        self._version = 0
+        self._mappers = {}   # (ir_size, rgb_size) -> (version, CoordMapper)
+
+    @classmethod
+    def from_cfg(cls, cfg):
+        """COORD 설정(대문자 키)으로 생성"""
+        return cls(normalize_coord_cfg(cfg))
+
+    @property
+    def version(self):
+        return self._version
+
+    def get(self):
+        """(파라미터 복사본, 버전)"""
+        with self._lock:
+            return dict(self._params), self._version
+
+    def update(self, **kwargs):
+        """파라미터 갱신 (None 값은 무시) → 버전 증가"""
+        with self._lock:
+            self._params.update({k: v for k, v in kwargs.items() if v is not None})
+            self._version += 1
+            self._mappers.clear()
+            return self._version
+
+    def mapper(self, ir_size=(160, 120), rgb_size=(960, 540)):
+        """
+        현재 버전의 CoordMapper (같은 크기/버전이면 같은 객체)
+
+        Args:
+            ir_size, rgb_size: (width, height)
+
+        Returns:
+            CoordMapper
+        """
+        key = (tuple(ir_size), tuple(rgb_size))
+        with self._lock:
+            cached = self._mappers.get(key)
+            if cached and cached[0] == self._version:
+                return cached[1]
+            params, version = dict(self._params), self._version
+        try:
+            mapper = CoordMapper(key[0], key[1], params['offset_x'], params['offset_y'], params['scale'],
+                                 mode=params.get('mode', 'scale'), matrix=params.get('matrix'))
+        except ValueError as e:
+            logger.warning("[Calibration] Invalid COORD params (%s), using scale mode", e)
+            mapper = CoordMapper(key[0], key[1], params['offset_x'], params['offset_y'], params['scale'])
+        with self._lock:
+            if version == self._version:
+                self._mappers[key] = (version, mapper)
+        return mapper
+
+    def view(self, ir_size=(160, 120), rgb_size=(960, 540)):
+        """소비자 전용 캐시 핸들"""
+        return CalibrationView(self, ir_size, rgb_size)
+
+
+class CalibrationView:
+    """
+    소비자(송신 스레드, GUI 등)가 들고 있는 매퍼 캐시
+
+    mapper 접근은 버전 정수 비교 한 번이며, 버전이 바뀐 경우에만 서비스에서 새 매퍼를 받는다.
+    """
+
+    def __init__(self, service, ir_size=(160, 120), rgb_size=(960, 540)):
+        self.service = service
+        self.ir_size = tuple(ir_size)
+        self.rgb_size = tuple(rgb_size)
+        self._version = None
+        self._mapper = None
+
+    @property
+    def changed(self):
+        """마지막으로 mapper를 받은 뒤 캘리브레이션이 바뀌었는지 여부"""
+        return self._version != self.service.version
+
+    @property
+    def mapper(self):
+        if self._mapper is None or self.changed:
+            self._version = self.service.version
+            self._mapper = self.service.mapper(self.ir_size, self.rgb_size)
+        return self._mapper
+
+    def resize(self, ir_size, rgb_size):
+        """프레임 크기가 바뀌면 다음 접근 때 매퍼를 다시 받는다"""
+        ir_size, rgb_size = tuple(ir_size), tuple(rgb_size)
+        if (ir_size, rgb_size) != (self.ir_size, self.rgb_size):
+            self.ir_size, self.rgb_size = ir_size, rgb_size
+            self._mapper = None
+        return self
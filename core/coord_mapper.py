@@ -2,18 +2,36 @@
 IR-RGB 좌표 변환 모듈
 
 IR 카메라 (160x120)와 RGB 카메라 (960x540) 간의 좌표 변환을 수행합니다.
+
+모드 (COORD.MODE):
+- scale: 비율 유지 스케일링 + 중심 정렬 (기본, 기존 방식)
+- affine: 2x3 affine 행렬 (COORD.MATRIX)
+- homography: 3x3 homography 행렬 (COORD.MATRIX)
+
+모든 모드는 내부적으로 3x3 행렬 하나로 표현하고, IR 정수 픽셀 → RGB 좌표 LUT와
+오버레이용 cv2.remap 맵을 매퍼 생성 후 처음 쓸 때 한 번만 만든다.
+캘리브레이션이 바뀌면 매퍼를 새로 만든다 (core.calibration.CalibrationService가 버전별로 재사용).
 """
 
+import threading
+
+import cv2
+import numpy as np
+
+COORD_MODES = ('scale', 'affine', 'homography')
+
 
 class CoordMapper:
     """
     IR-RGB 좌표 매핑 클래스
     
-    비율 유지 스케일링 + 중심 정렬 방식을 사용합니다.
+    scale 모드는 비율 유지 스케일링 + 중심 정렬 방식을 사용하고,
+    affine/homography 모드는 설정 행렬을 사용합니다. 캘리브레이션 오프셋은
+    모든 모드에서 RGB 좌표에 마지막으로 더해집니다.
     """
     
     def __init__(self, ir_size=(160, 120), rgb_size=(960, 540), 
-                 offset_x=0, offset_y=0, scale=None):
+                 offset_x=0, offset_y=0, scale=None, mode='scale', matrix=None):
         """
         좌표 매퍼 초기화
         
@@ -22,11 +40,26 @@ class CoordMapper:
             rgb_size: RGB 이미지 크기 (width, height)
             offset_x: X축 오프셋 (캘리브레이션용)
             offset_y: Y축 오프셋 (캘리브레이션용)
-            scale: 스케일 팩터 (None이면 자동 계산)
+            scale: 스케일 팩터 (None이면 자동 계산, scale 모드 전용)
+            mode: 'scale' | 'affine' | 'homography'
+            matrix: affine(2x3) 또는 homography(3x3) 행렬 (IR 픽셀 → RGB 픽셀)
         """
         self.ir_w, self.ir_h = ir_size
         self.rgb_w, self.rgb_h = rgb_size
         
+        mode = str(mode or 'scale').lower()
+        if mode not in COORD_MODES:
+            raise ValueError(f"Unsupported coord mode: {mode}")
+        if mode != 'scale' and matrix is None:
+            raise ValueError(f"Coord mode '{mode}' requires MATRIX")
+        self.mode = mode
+        self.matrix = None
+        if mode != 'scale':
+            m = np.asarray(matrix, dtype=np.float64)
+            if mode == 'affine' and m.size == 6:
+                m = np.vstack([m.reshape(2, 3), [0.0, 0.0, 1.0]])
+            self.matrix = m.reshape(3, 3) / m.reshape(3, 3)[2, 2]
+        
         # 스케일 계산 (비율 유지, 작은 쪽 기준)
         if scale is None:
             self.scale = min(self.rgb_w / self.ir_w, self.rgb_h / self.ir_h)
@@ -40,6 +73,62 @@ class CoordMapper:
         # 캘리브레이션 오프셋
         self.offset_x = offset_x
         self.offset_y = offset_y
+        
+        self._lock = threading.Lock()
+        self._invalidate()
+    
+    def _invalidate(self):
+        """파라미터 변경 시 행렬/LUT/remap 캐시 폐기"""
+        self._H = None
+        self._H_inv = None
+        self._lut = None
+        self._remap = None
+        self._resize = None
+    
+    @property
+    def H(self):
+        """IR → RGB 3x3 행렬 (오프셋 포함)"""
+        if self._H is None:
+            if self.mode == 'scale':
+                H = np.array([[self.scale, 0.0, self.base_offset_x],
+                              [0.0, self.scale, self.base_offset_y],
+                              [0.0, 0.0, 1.0]])
+            else:
+                H = self.matrix.copy()
+            H[0] += self.offset_x * H[2]
+            H[1] += self.offset_y * H[2]
+            self._H = H
+        return self._H
+    
+    @property
+    def H_inv(self):
+        """RGB → IR 3x3 행렬"""
+        if self._H_inv is None:
+            self._H_inv = np.linalg.inv(self.H)
+        return self._H_inv
+    
+    @staticmethod
+    def _project(H, xs, ys):
+        xs = np.asarray(xs, dtype=np.float64)
+        ys = np.asarray(ys, dtype=np.float64)
+        w = H[2, 0] * xs + H[2, 1] * ys + H[2, 2]
+        return ((H[0, 0] * xs + H[0, 1] * ys + H[0, 2]) / w,
+                (H[1, 0] * xs + H[1, 1] * ys + H[1, 2]) / w)
+    
+    @property
+    def lut(self):
+        """
+        IR 정수 픽셀 → RGB 좌표 LUT
+
+        Returns:
+            np.ndarray: (ir_h, ir_w, 2) float64 - lut[y, x] = (rgb_x, rgb_y)
+        """
+        if self._lut is None:
+            with self._lock:
+                if self._lut is None:
+                    ys, xs = np.mgrid[0:self.ir_h, 0:self.ir_w]
+                    self._lut = np.stack(self._project(self.H, xs, ys), axis=-1)
+        return self._lut
     
     def ir_to_rgb(self, ir_x, ir_y):
         """
@@ -52,9 +141,34 @@ class CoordMapper:
         Returns:
             tuple: (rgb_x, rgb_y)
         """
-        rgb_x = ir_x * self.scale + self.base_offset_x + self.offset_x
-        rgb_y = ir_y * self.scale + self.base_offset_y + self.offset_y
-        return rgb_x, rgb_y
+        if (float(ir_x).is_integer() and float(ir_y).is_integer()
+                and 0 <= ir_x < self.ir_w and 0 <= ir_y < self.ir_h):
+            rgb_x, rgb_y = self.lut[int(ir_y), int(ir_x)]
+            return float(rgb_x), float(rgb_y)
+        rgb_x, rgb_y = self._project(self.H, ir_x, ir_y)
+        return float(rgb_x), float(rgb_y)
+    
+    def ir_to_rgb_array(self, ir_xs, ir_ys):
+        """
+        IR 좌표 배열을 RGB 좌표 배열로 변환
+
+        정수 좌표 배열(hotspot 레코드)이 IR 영상 안에 있으면 LUT 조회만 하고,
+        그 외에는 행렬 투영을 한 번 수행한다.
+
+        Args:
+            ir_xs, ir_ys: IR 좌표 배열 (같은 길이)
+
+        Returns:
+            tuple: (rgb_xs, rgb_ys) float64 배열 - ir_to_rgb()와 같은 값
+        """
+        ir_xs = np.asarray(ir_xs)
+        ir_ys = np.asarray(ir_ys)
+        if (ir_xs.dtype.kind in 'iu' and ir_ys.dtype.kind in 'iu' and ir_xs.size
+                and ir_xs.min() >= 0 and ir_ys.min() >= 0
+                and ir_xs.max() < self.ir_w and ir_ys.max() < self.ir_h):
+            pts = self.lut[ir_ys, ir_xs]
+            return pts[..., 0], pts[..., 1]
+        return self._project(self.H, ir_xs, ir_ys)
     
     def rgb_to_ir(self, rgb_x, rgb_y):
         """
@@ -67,9 +181,8 @@ class CoordMapper:
         Returns:
             tuple: (ir_x, ir_y)
         """
-        ir_x = (rgb_x - self.base_offset_x - self.offset_x) / self.scale
-        ir_y = (rgb_y - self.base_offset_y - self.offset_y) / self.scale
-        return ir_x, ir_y
+        ir_x, ir_y = self._project(self.H_inv, rgb_x, rgb_y)
+        return float(ir_x), float(ir_y)
     
     def ir_bbox_to_rgb(self, ir_bbox):
         """
@@ -79,13 +192,96 @@ class CoordMapper:
             ir_bbox: (x, y, w, h) IR 좌표계
             
         Returns:
-            tuple: (x, y, w, h) RGB 좌표계
+            tuple: (x, y, w, h) RGB 좌표계 (affine/homography는 네 꼭짓점의 외접 bbox)
         """
         x, y, w, h = ir_bbox
-        rgb_x, rgb_y = self.ir_to_rgb(x, y)
-        rgb_w = w * self.scale
-        rgb_h = h * self.scale
-        return (rgb_x, rgb_y, rgb_w, rgb_h)
+        if self.mode == 'scale':
+            rgb_x, rgb_y = self.ir_to_rgb(x, y)
+            return (rgb_x, rgb_y, w * self.scale, h * self.scale)
+        xs, ys = self.ir_to_rgb_array(np.array([x, x + w, x, x + w]), np.array([y, y, y + h, y + h]))
+        x0, y0 = float(xs.min()), float(ys.min())
+        return (x0, y0, float(xs.max()) - x0, float(ys.max()) - y0)
+    
+    @property
+    def axis_aligned(self):
+        """회전/원근 성분이 없는 (축 정렬 스케일 + 이동) 변환인지 여부"""
+        H = self.H
+        return H[0, 1] == 0 and H[1, 0] == 0 and H[2, 0] == 0 and H[2, 1] == 0 and H[0, 0] > 0 and H[1, 1] > 0
+    
+    def remap_maps(self):
+        """
+        RGB 프레임 위에 IR 영상을 겹치기 위한 cv2.remap 맵 (한 번만 생성)
+
+        Returns:
+            tuple | None: (roi, map1, map2, mask)
+                roi: RGB 프레임에서 IR이 덮는 영역 (x0, y0, x1, y1)
+                map1, map2: roi 크기의 고정소수점 remap 맵 (cv2.convertMaps)
+                mask: roi 안에서 IR 영상 내부 픽셀 uint8 마스크 (roi 전체가 내부면 None)
+                IR 영상이 RGB 프레임 밖에 있으면 None
+        """
+        if self._remap is None:
+            with self._lock:
+                if self._remap is None:
+                    self._remap = self._build_remap()
+        return self._remap or None
+    
+    def _build_remap(self):
+        # IR 영상 네 꼭짓점의 RGB 외접 영역만 맵을 만든다
+        cx, cy = self._project(self.H, np.array([0, self.ir_w, 0, self.ir_w]),
+                               np.array([0, 0, self.ir_h, self.ir_h]))
+        x0 = max(0, int(np.floor(cx.min())))
+        y0 = max(0, int(np.floor(cy.min())))
+        x1 = min(self.rgb_w, int(np.ceil(cx.max())))
+        y1 = min(self.rgb_h, int(np.ceil(cy.max())))
+        if x0 >= x1 or y0 >= y1:
+            return ()
+        # RGB 픽셀 (u, v)가 덮는 IR 좌표 (cv2.resize와 같은 픽셀 중심 규칙)
+        vs, us = np.mgrid[y0:y1, x0:x1].astype(np.float64)
+        map_x, map_y = self._project(self.H_inv, us + 0.5, vs + 0.5)
+        map_x -= 0.5
+        map_y -= 0.5
+        inside = ((map_x >= -0.5) & (map_x < self.ir_w - 0.5) &
+                  (map_y >= -0.5) & (map_y < self.ir_h - 0.5))
+        mask = None if inside.all() else inside.astype(np.uint8)
+        map1, map2 = cv2.convertMaps(map_x.astype(np.float32), map_y.astype(np.float32), cv2.CV_16SC2)
+        return ((x0, y0, x1, y1), map1, map2, mask)
+    
+    def _resize_plan(self):
+        # 축 정렬 변환: cv2.resize 한 번 + 잘라내기 (기존 오버레이와 같은 픽셀 배치)
+        H = self.H
+        target_w = max(1, int(self.ir_w * H[0, 0]))
+        target_h = max(1, int(self.ir_h * H[1, 1]))
+        x, y = int(H[0, 2]), int(H[1, 2])
+        x0, y0 = max(0, x), max(0, y)
+        x1, y1 = min(self.rgb_w, x + target_w), min(self.rgb_h, y + target_h)
+        if x0 >= x1 or y0 >= y1:
+            return ()
+        return ((x0, y0, x1, y1), (target_w, target_h), (x0 - x, y0 - y))
+    
+    def warp_ir(self, ir_frame):
+        """
+        IR 영상을 RGB 좌표계로 변환 (RGB 프레임에서 IR이 덮는 roi 크기)
+
+        축 정렬 변환은 cv2.resize, 그 외에는 캐시된 remap 맵을 사용한다.
+
+        Returns:
+            tuple | None: (roi, warped, mask) - mask는 uint8 또는 None(roi 전체 유효),
+                          IR이 RGB 프레임 밖이면 None
+        """
+        if self.axis_aligned:
+            if self._resize is None:
+                self._resize = self._resize_plan()
+            if not self._resize:
+                return None
+            (x0, y0, x1, y1), size, (ix, iy) = self._resize
+            resized = cv2.resize(ir_frame, size, interpolation=cv2.INTER_LINEAR)
+            return (x0, y0, x1, y1), resized[iy:iy + (y1 - y0), ix:ix + (x1 - x0)], None
+        maps = self.remap_maps()
+        if maps is None:
+            return None
+        roi, map1, map2, mask = maps
+        warped = cv2.remap(ir_frame, map1, map2, cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+        return roi, warped, mask
     
     def adjust_offset(self, dx, dy):
         """
@@ -97,10 +293,11 @@ class CoordMapper:
         """
         self.offset_x += dx
         self.offset_y += dy
+        self._invalidate()
     
     def adjust_scale(self, ds):
         """
-        스케일 조정 (실시간 캘리브레이션용)
+        스케일 조정 (실시간 캘리브레이션용, scale 모드 전용)
         
         Args:
             ds: 스케일 변화량
@@ -109,21 +306,33 @@ class CoordMapper:
         # 오프셋 재계산
         self.base_offset_x = (self.rgb_w - self.ir_w * self.scale) / 2
         self.base_offset_y = (self.rgb_h - self.ir_h * self.scale) / 2
+        self._invalidate()
     
     def get_params(self):
         """
         현재 파라미터 반환 (저장용)
         
         Returns:
-            dict: {offset_x, offset_y, scale}
+            dict: {offset_x, offset_y, scale, mode, matrix}
         """
         return {
             'offset_x': self.offset_x,
             'offset_y': self.offset_y,
-            'scale': self.scale
+            'scale': self.scale,
+            'mode': self.mode,
+            'matrix': self.matrix.tolist() if self.matrix is not None else None,
         }
     
+    def copy(self):
+        """같은 파라미터의 새 매퍼 (캐시는 공유하지 않음)"""
+        return CoordMapper((self.ir_w, self.ir_h), (self.rgb_w, self.rgb_h),
+                           self.offset_x, self.offset_y, self.scale,
+                           mode=self.mode, matrix=self.matrix)
+    
     def __repr__(self):
+        if self.mode != 'scale':
+            return (f"CoordMapper(mode={self.mode}, "
+                    f"offset=({self.offset_x:.1f}, {self.offset_y:.1f}))")
         return (f"CoordMapper(scale={self.scale:.2f}, "
                 f"offset=({self.offset_x:.1f}, {self.offset_y:.1f}))")
 
@@ -143,6 +352,24 @@ def point_in_bbox(x, y, bbox):
     return bx <= x <= bx + bw and by <= y <= by + bh
 
 
+def points_in_bboxes(xs, ys, bboxes):
+    """
+    점 N개 x bbox M개 포함 여부 행렬 (point_in_bbox와 같은 경계 포함 규칙)
+
+    Args:
+        xs, ys: 점 좌표 배열 (N,)
+        bboxes: (M, 4) 배열 또는 [(bx, by, bw, bh), ...]
+
+    Returns:
+        np.ndarray: (N, M) bool 배열 - [i, j]는 점 i가 bbox j 안에 있는지
+    """
+    xs = np.asarray(xs, dtype=np.float64)[:, None]
+    ys = np.asarray(ys, dtype=np.float64)[:, None]
+    b = np.asarray(bboxes, dtype=np.float64).reshape(-1, 4)
+    bx, by, bw, bh = b[:, 0], b[:, 1], b[:, 2], b[:, 3]
+    return (bx <= xs) & (xs <= bx + bw) & (by <= ys) & (ys <= by + bh)
+
+
 def bbox_iou(bbox1, bbox2):
     """
     두 bbox의 IoU (Intersection over Union) 계산
@@ -174,3 +401,23 @@ def bbox_iou(bbox1, bbox2):
     
     return intersection / union if union > 0 else 0.0
 
+
+
+def bbox_iou_matrix(bboxes1, bboxes2):
+    """
+    bbox N개 x bbox M개 IoU 행렬 (bbox_iou와 같은 값)
+
+    Args:
+        bboxes1: (N, 4) 배열 또는 [(x, y, w, h), ...]
+        bboxes2: (M, 4) 배열 또는 [(x, y, w, h), ...]
+
+    Returns:
+        np.ndarray: (N, M) float64 배열
+    """
+    a = np.asarray(bboxes1, dtype=np.float64).reshape(-1, 4)[:, None, :]
+    b = np.asarray(bboxes2, dtype=np.float64).reshape(-1, 4)[None, :, :]
+    iw = np.minimum(a[..., 0] + a[..., 2], b[..., 0] + b[..., 2]) - np.maximum(a[..., 0], b[..., 0])
+    ih = np.minimum(a[..., 1] + a[..., 3], b[..., 1] + b[..., 3]) - np.maximum(a[..., 1], b[..., 1])
+    inter = np.clip(iw, 0, None) * np.clip(ih, 0, None)
+    union = a[..., 2] * a[..., 3] + b[..., 2] * b[..., 3] - inter
+    return np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
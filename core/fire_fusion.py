@@ -11,28 +11,25 @@ Phase 1: IR 게이트키퍼 방식
 """
 
 import logging
-from .coord_mapper import CoordMapper, point_in_bbox
-
-
-# 신뢰도 상수
+import numpy as np
+from .coord_mapper import CoordMapper, points_in_bboxes
+from .hotspot import to_hotspots
+from .fire_score import ConfidenceModel
+from .overlay import get_renderer
+# 판정 결과/색상 상수는 core.fusion_result에 정의 (기존 import 경로 유지)
+from .fusion_result import (
+    FIRE_CONFIRMED, FIRE_IR_ONLY, FIRE_FILTERED, NO_FIRE,
+    COLOR_CONFIRMED, COLOR_IR_ONLY, COLOR_FILTERED, COLOR_NO_FIRE,
+    STATUS_CODES, FusionResult, Annotation,
+)
+
+
+# 신뢰도 상수 (ConfidenceModel 도입 전 고정값, 외부 호환용)
 CONFIDENCE_HIGH = 0.95      # IR + EO 매칭
 CONFIDENCE_MEDIUM = 0.70    # IR만 감지
 CONFIDENCE_LOW = 0.30       # EO만 감지 (게이트키핑됨)
 CONFIDENCE_NONE = 0.0       # 미감지
 
-# 판정 결과 상수
-FIRE_CONFIRMED = 'CONFIRMED'      # IR + EO 확정 화재
-FIRE_IR_ONLY = 'IR_ONLY'          # IR만 감지 (의심)
-FIRE_FILTERED = 'FILTERED'        # EO만 감지 (게이트키핑됨)
-NO_FIRE = 'NO_FIRE'               # 화재 아님
-
-# bbox 색상 (BGR)
-COLOR_CONFIRMED = (0, 0, 255)     # 빨강: 확정 화재
-COLOR_IR_ONLY = (0, 165, 255)     # 주황: IR만 감지
-COLOR_FILTERED = (0, 255, 255)    # 노랑: EO만 감지 (필터링됨)
-COLOR_NO_FIRE = (128, 128, 128)   # 회색: 미감지
-
-
 logger = logging.getLogger(__name__)
 
 
@@ -44,10 +41,13 @@ class FireFusion:
     - IR hotspot이 없으면 무조건 NOT FIRE
     - IR hotspot이 EO bbox 안에 있으면 CONFIRMED
     - IR hotspot만 있으면 IR_ONLY
+    
+    hotspot별 confidence는 ConfidenceModel 프레임 점수 (EO 신뢰도, 온도 여유, 면적)
     """
     
     def __init__(self, ir_size=(160, 120), rgb_size=(960, 540),
-                 offset_x=0, offset_y=0, scale=None):
+                 offset_x=0, offset_y=0, scale=None, mode='scale', matrix=None, coord_mapper=None,
+                 score_model=None):
         """
         융합 모듈 초기화
         
@@ -56,8 +56,16 @@ class FireFusion:
             rgb_size: RGB 이미지 크기
             offset_x, offset_y: 캘리브레이션 오프셋
             scale: 스케일 팩터
+            mode: 좌표 변환 모드 ('scale' | 'affine' | 'homography')
+            matrix: affine/homography 행렬 (IR → RGB)
+            coord_mapper: 공유 CoordMapper (CalibrationService.mapper) - 주면 위 좌표 인자는 무시
+            score_model: 신뢰도 모델 (core.fire_score.ConfidenceModel, 없으면 기본값)
         """
-        self.coord_mapper = CoordMapper(ir_size, rgb_size, offset_x, offset_y, scale)
+        if coord_mapper is None:
+            coord_mapper = CoordMapper(ir_size, rgb_size, offset_x, offset_y, scale,
+                                       mode=mode, matrix=matrix)
+        self.coord_mapper = coord_mapper
+        self.score_model = score_model or ConfidenceModel()
         
         # 마지막 융합 결과
         self.last_result = None
@@ -67,194 +75,114 @@ class FireFusion:
         IR hotspot과 EO fire bbox를 융합하여 최종 화재 판정
         
         Args:
-            ir_hotspots: IR 화점 리스트 [(x, y, temp_corrected, temp_raw), ...]
+            ir_hotspots: IR 화점 레코드 배열 (core.hotspot) 또는 [(x, y, temp_corrected, temp_raw), ...]
             eo_fire_bboxes: EO 화염 bbox 리스트 [(x, y, w, h, confidence), ...]
             
         Returns:
-            dict: {
-                'fire_detected': bool,
-                'confidence': float,
-                'status': str,
-                'details': list of detection details,
-                'eo_annotations': list of (bbox, color, label) for drawing
-            }
+            FusionResult: dict처럼 'fire_detected', 'confidence', 'status', 'confirmed_count',
+                'ir_only_count', 'details', 'eo_annotations' 키로 접근 가능
+                (details/라벨/JSON은 처음 접근할 때 생성)
         """
-        details = []
-        eo_annotations = []  # EO 프레임에 그릴 bbox 정보
+        ir_hotspots = to_hotspots(ir_hotspots)
+        
+        eo_boxes, eo_confs = _eo_arrays(eo_fire_bboxes)
+        n_eo = len(eo_boxes)
+        box_status = np.full(n_eo, STATUS_CODES[FIRE_FILTERED], dtype=np.uint8)
         
         # ===== 게이트키퍼: IR hotspot 체크 =====
-        if not ir_hotspots or len(ir_hotspots) == 0:
-            # IR 감지 없음 → EO 결과 무시
-            for eo_bbox in (eo_fire_bboxes or []):
-                # EO bbox를 필터링된 것으로 표시 (노란색)
-                bbox = eo_bbox[:4] if len(eo_bbox) >= 4 else eo_bbox
-                eo_conf = eo_bbox[4] if len(eo_bbox) > 4 else 0.0
-                eo_annotations.append({
-                    'bbox': bbox,
-                    'color': COLOR_FILTERED,
-                    'label': f'FILTERED ({eo_conf:.0%})',
-                    'status': FIRE_FILTERED
-                })
-            
-            self.last_result = {
-                'fire_detected': False,
-                'confidence': CONFIDENCE_NONE,
-                'status': NO_FIRE,
-                'reason': 'NO_IR_HOTSPOT',
-                'details': details,
-                'eo_annotations': eo_annotations
-            }
+        if len(ir_hotspots) == 0:
+            # IR 감지 없음 → EO 결과 무시 (EO bbox는 필터링된 것으로 표시, 노란색)
+            self.last_result = FusionResult(NO_FIRE, CONFIDENCE_NONE, reason='NO_IR_HOTSPOT',
+                                            boxes=eo_boxes, box_status=box_status, box_conf=eo_confs)
             return self.last_result
         
         # ===== IR hotspot 있음: EO와 매칭 확인 =====
-        confirmed_fires = []
-        ir_only_fires = []
-        matched_eo_indices = set()
-        
-        for hotspot in ir_hotspots:
-            ir_x, ir_y = hotspot[0], hotspot[1]
-            temp = hotspot[2] if len(hotspot) > 2 else 0
-            
-            # IR 좌표를 RGB 좌표로 변환
-            rgb_x, rgb_y = self.coord_mapper.ir_to_rgb(ir_x, ir_y)
-            
-            # EO bbox와 매칭 확인
-            matched = False
-            for i, eo_bbox in enumerate(eo_fire_bboxes or []):
-                bbox = eo_bbox[:4] if len(eo_bbox) >= 4 else eo_bbox
-                eo_conf = eo_bbox[4] if len(eo_bbox) > 4 else 0.0
-                
-                if point_in_bbox(rgb_x, rgb_y, bbox):
-                    # IR + EO 매칭 → 확정 화재
-                    confirmed_fires.append({
-                        'ir_pos': (ir_x, ir_y),
-                        'rgb_pos': (rgb_x, rgb_y),
-                        'temp': temp,
-                        'eo_bbox': bbox,
-                        'eo_conf': eo_conf,
-                        'confidence': CONFIDENCE_HIGH,
-                        'status': FIRE_CONFIRMED
-                    })
-                    matched_eo_indices.add(i)
-                    matched = True
-                    break
-            
-            if not matched:
-                # IR만 감지
-                ir_only_fires.append({
-                    'ir_pos': (ir_x, ir_y),
-                    'rgb_pos': (rgb_x, rgb_y),
-                    'temp': temp,
-                    'confidence': CONFIDENCE_MEDIUM,
-                    'status': FIRE_IR_ONLY
-                })
-        
-        # ===== Phase1 fallback: 좌표 매핑이 없어도 IR이 임계 초과하면 EO bbox 전부 확정 처리 =====
-        fallback_confirmed = False
-        if ir_hotspots and not confirmed_fires and (eo_fire_bboxes or []):
-            fallback_confirmed = True
+        # 모든 hotspot을 한 번의 affine 변환으로 RGB 좌표로 변환
+        ir_xy = np.stack([ir_hotspots['x'], ir_hotspots['y']], axis=1)
+        ir_temps = ir_hotspots['temp_corrected'].astype(np.float64)
+        ir_areas = ir_hotspots['area']
+        rgb_xs, rgb_ys = self.coord_mapper.ir_to_rgb_array(ir_hotspots['x'], ir_hotspots['y'])
+        rgb_xy = np.stack([rgb_xs, rgb_ys], axis=1)
+        
+        # hotspot x EO bbox 포함 행렬 → hotspot마다 처음 포함하는 bbox 하나에 배정
+        member = points_in_bboxes(rgb_xs, rgb_ys, eo_boxes)
+        has_match = member.any(axis=1)
+        first_box = member.argmax(axis=1) if n_eo else np.zeros(len(ir_hotspots), dtype=np.intp)
+        assign = np.zeros_like(member)
+        hit_idx = np.flatnonzero(has_match)
+        assign[hit_idx, first_box[hit_idx]] = True
+        matched_boxes = assign.any(axis=0)
+        
+        # bbox별 최고 온도 (배정된 hotspot 중 최대, 없으면 nan)
+        box_temps = np.where(assign, ir_temps[:, None], -np.inf).max(axis=0, initial=-np.inf)
+        box_temps[~matched_boxes] = np.nan
+        
+        # 판정 행: IR + EO 매칭(확정) → IR만 감지 순
+        ir_only_idx = np.flatnonzero(~has_match)
+        if hit_idx.size:
+            conf_rows, conf_boxes = hit_idx, first_box[hit_idx]
+        elif n_eo:
+            # ===== Phase1 fallback: 좌표 매핑이 없어도 IR이 임계 초과하면 EO bbox 전부 확정 처리 =====
             # 가장 뜨거운 hotspot 사용
-            ref_hotspot = max(ir_hotspots, key=lambda h: h[2] if len(h) > 2 else 0)
-            ref_temp = ref_hotspot[2] if len(ref_hotspot) > 2 else 0
-            rgb_ref = self.coord_mapper.ir_to_rgb(ref_hotspot[0], ref_hotspot[1])
-            for i, eo_bbox in enumerate(eo_fire_bboxes):
-                bbox = eo_bbox[:4] if len(eo_bbox) >= 4 else eo_bbox
-                eo_conf = eo_bbox[4] if len(eo_bbox) > 4 else 0.0
-                confirmed_fires.append({
-                    'ir_pos': (ref_hotspot[0], ref_hotspot[1]),
-                    'rgb_pos': rgb_ref,
-                    'temp': ref_temp,
-                    'eo_bbox': bbox,
-                    'eo_conf': eo_conf,
-                    'confidence': CONFIDENCE_HIGH,
-                    'status': FIRE_CONFIRMED
-                })
-                matched_eo_indices.add(i)
+            ref = int(np.argmax(ir_temps))
+            conf_rows, conf_boxes = np.full(n_eo, ref), np.arange(n_eo)
+            matched_boxes[:] = True
+            box_temps[:] = ir_temps[ref]
+        else:
+            conf_rows, conf_boxes = hit_idx, hit_idx
         
-        # EO annotations 생성
-        for i, eo_bbox in enumerate(eo_fire_bboxes or []):
-            bbox = eo_bbox[:4] if len(eo_bbox) >= 4 else eo_bbox
-            eo_conf = eo_bbox[4] if len(eo_bbox) > 4 else 0.0
-            
-            if i in matched_eo_indices:
-                # 확정 화재 (빨간색)
-                # 매칭된 온도 찾기
-                matched_temp = None
-                for cf in confirmed_fires:
-                    if cf['eo_bbox'] == bbox:
-                        matched_temp = cf['temp']
-                        break
-                temp_str = f'{matched_temp:.0f}C' if matched_temp is not None else '-'
-                eo_annotations.append({
-                    'bbox': bbox,
-                    'color': COLOR_CONFIRMED,
-                    'label': f'FIRE ({temp_str}, {eo_conf:.0%})',
-                    'status': FIRE_CONFIRMED
-                })
-            else:
-                # 필터링됨 (노란색)
-                eo_annotations.append({
-                    'bbox': bbox,
-                    'color': COLOR_FILTERED,
-                    'label': f'FILTERED ({eo_conf:.0%})',
-                    'status': FIRE_FILTERED
-                })
+        rows = np.concatenate([conf_rows, ir_only_idx])
+        n_conf = len(conf_rows)
+        det_status = np.full(len(rows), STATUS_CODES[FIRE_IR_ONLY], dtype=np.uint8)
+        det_status[:n_conf] = STATUS_CODES[FIRE_CONFIRMED]
+        det_box = np.full(len(rows), -1, dtype=np.intp)
+        det_box[:n_conf] = conf_boxes
         
-        # IR만 감지된 위치에 대한 annotation (캘리브레이션 전까지 비활성화)
-        # TODO: Phase 2에서 키보드 캘리브레이션 후 활성화
-        # for ir_fire in ir_only_fires:
-        #     rgb_x, rgb_y = ir_fire['rgb_pos']
-        #     temp = ir_fire['temp']
-        #     marker_size = 30
-        #     eo_annotations.append({
-        #         'bbox': (rgb_x - marker_size/2, rgb_y - marker_size/2, marker_size, marker_size),
-        #         'color': COLOR_IR_ONLY,
-        #         'label': f'IR {temp:.0f}C',
-        #         'status': FIRE_IR_ONLY
-        #     })
+        # 연속 신뢰도 (IR만 감지된 hotspot은 EO 신뢰도 0)
+        row_eo = np.zeros(len(rows))
+        row_eo[:n_conf] = eo_confs[conf_boxes]
+        det_conf = self.score_model.frame_scores(row_eo, ir_temps[rows], ir_areas[rows])
         
-        # 최종 결과 결정
-        details = confirmed_fires + ir_only_fires
+        # EO annotations: 확정(빨간색) / 필터링(노란색)
+        # (IR만 감지된 위치의 마커 annotation은 캘리브레이션 전까지 비활성화 - Phase 2 TODO)
+        box_status[matched_boxes] = STATUS_CODES[FIRE_CONFIRMED]
         
-        if confirmed_fires:
-            max_conf = max(f['confidence'] for f in confirmed_fires)
+        # 최종 결과 결정
+        if n_conf:
             status = FIRE_CONFIRMED
-        elif ir_only_fires:
-            max_conf = max(f['confidence'] for f in ir_only_fires)
+        elif len(ir_only_idx):
             status = FIRE_IR_ONLY
         else:
-            max_conf = CONFIDENCE_NONE
             status = NO_FIRE
+        max_conf = float(det_conf.max()) if len(rows) else CONFIDENCE_NONE
         
-        self.last_result = {
-            'fire_detected': len(details) > 0,
-            'confidence': max_conf,
-            'status': status,
-            'confirmed_count': len(confirmed_fires),
-            'ir_only_count': len(ir_only_fires),
-            'details': details,
-            'eo_annotations': eo_annotations
-        }
+        self.last_result = FusionResult(
+            status, max_conf,
+            boxes=eo_boxes, box_status=box_status, box_conf=eo_confs, box_temp=box_temps,
+            ir_xy=ir_xy[rows], rgb_xy=rgb_xy[rows], temps=ir_temps[rows], areas=ir_areas[rows],
+            det_box=det_box, det_status=det_status, det_conf=det_conf,
+        )
         
-        filtered_count = max(0, len(eo_fire_bboxes or []) - len(matched_eo_indices))
         logger.debug(
             "[FUSION] fire_detected=%s status=%s confirmed=%d ir_only=%d filtered=%d confidence=%.2f",
-            "YES" if self.last_result['fire_detected'] else "NO",
+            "YES" if self.last_result.fire_detected else "NO",
             status,
-            len(confirmed_fires),
-            len(ir_only_fires),
-            filtered_count,
+            n_conf,
+            len(ir_only_idx),
+            int(n_eo - matched_boxes.sum()),
             max_conf,
         )
         
         return self.last_result
     
     def adjust_offset(self, dx, dy):
-        """좌표 오프셋 조정"""
+        """좌표 오프셋 조정 (공유 매퍼를 바꾸지 않도록 복사본을 조정)"""
+        self.coord_mapper = self.coord_mapper.copy()
         self.coord_mapper.adjust_offset(dx, dy)
     
     def adjust_scale(self, ds):
-        """스케일 조정"""
+        """스케일 조정 (공유 매퍼를 바꾸지 않도록 복사본을 조정)"""
+        self.coord_mapper = self.coord_mapper.copy()
         self.coord_mapper.adjust_scale(ds)
     
     def get_calibration(self):
@@ -262,49 +190,42 @@ class FireFusion:
         return self.coord_mapper.get_params()
 
 
-def draw_fire_annotations(frame, annotations, font_scale=0.8, thickness_scale=1.0):
+def _eo_arrays(eo_fire_bboxes):
+    """EO bbox 리스트 [(x, y, w, h[, conf]), ...] → (bbox (N, 4), conf (N,)) 배열"""
+    if eo_fire_bboxes is None or len(eo_fire_bboxes) == 0:
+        return np.zeros((0, 4)), np.zeros(0)
+    try:
+        arr = np.asarray(eo_fire_bboxes, dtype=np.float64)
+    except ValueError:
+        arr = None   # 길이가 섞인 리스트
+    if arr is not None and arr.ndim == 2 and arr.shape[1] >= 4:
+        conf = arr[:, 4].copy() if arr.shape[1] > 4 else np.zeros(len(arr))
+        return arr[:, :4].copy(), conf
+    boxes = np.array([eo[:4] for eo in eo_fire_bboxes], dtype=np.float64).reshape(-1, 4)
+    conf = np.array([eo[4] if len(eo) > 4 else 0.0 for eo in eo_fire_bboxes], dtype=np.float64)
+    return boxes, conf
+
+
+def draw_fire_annotations(frame, annotations, font_scale=0.8, thickness_scale=1.0, scale=1.0):
     """
-    화재 감지 결과를 프레임에 그리기
+    화재 감지 결과를 프레임에 그리기 (core.overlay 공용 렌더러 사용)
     
     Args:
-        frame: BGR 이미지 (numpy array)
+        frame: BGR 이미지 (numpy array, 제자리 수정)
         annotations: eo_annotations 리스트
-        font_scale: cv2.putText에 사용할 폰트 스케일
+        font_scale: 라벨 폰트 스케일
         thickness_scale: 박스/텍스트 두께 스케일 (1.0이 기본)
+        scale: bbox 좌표 배율 (원본 좌표 → 축소된 표시 프레임)
         
     Returns:
         frame: annotation이 그려진 이미지
     """
-    import cv2
-    
     if frame is None:
         return frame
-    
-    font_scale = max(0.2, float(font_scale or 0.8))
-    thickness_scale = max(0.5, float(thickness_scale or 1.0))
-    base_box_thickness = max(1, int(round(2 * thickness_scale)))
-    text_thickness = max(1, int(round(1.5 * thickness_scale)))
-    text_outline_thickness = text_thickness + 2
-    
-    for ann in annotations:
-        bbox = ann['bbox']
-        color = ann['color']
-        label = ann['label']
-        status = ann['status']
-        
-        x, y, w, h = [int(v) for v in bbox]
-        
-        # bbox 그리기
-        thickness = base_box_thickness + 1 if status == FIRE_CONFIRMED else base_box_thickness
-        cv2.rectangle(frame, (x, y), (x + w, y + h), color, thickness)
-        
-        # 라벨 그리기
-        font = cv2.FONT_HERSHEY_SIMPLEX
-        text_y = max(0, int(y - 6 * thickness_scale))
-        cv2.putText(frame, label, (x, text_y), font, font_scale, (0, 0, 0), text_outline_thickness, cv2.LINE_AA)
-        cv2.putText(frame, label, (x, text_y), font, font_scale, (255, 255, 255), text_thickness, cv2.LINE_AA)
-    
-    return frame
+    return get_renderer().draw_annotations(
+        frame, annotations, font_scale=font_scale, thickness_scale=thickness_scale,
+        scale=scale, emphasis={FIRE_CONFIRMED},
+    )
 
 
 def apply_vis_mode(annotations, mode="test"):
@@ -324,7 +245,7 @@ def apply_vis_mode(annotations, mode="test"):
         if status == FIRE_FILTERED:
             logger.debug("[VIS_MODE temp] skip filtered ann: %s", ann)
             continue  # temp 모드에서는 필터링된 EO만 박스를 숨김
-        new_ann = dict(ann)
+        new_ann = ann.copy()  # dict / Annotation 모두 지원
         if status == FIRE_CONFIRMED:
             new_ann["color"] = COLOR_FILTERED
             logger.debug("[VIS_MODE temp] confirmed -> yellow: %s", new_ann)
@@ -0,0 +1,150 @@
+"""
+연속 화재 신뢰도 모델 (로드맵 Phase 4-5)
+
+고정 상수(HIGH/MEDIUM/LOW) 대신 네 가지 요소를 가중합한 0~1 점수를 계산합니다.
+
+| 요소 | 기본 가중치 | 정규화 |
+|------|------|------|
+| EO confidence | 0.3 | 검출기 점수 그대로 (IR만 감지면 0) |
+| IR 온도 여유 | 0.3 | (온도 - TEMP_MIN) / TEMP_SPAN, 0~1로 자름 |
+| 화점 면적 | 0.2 | 면적 / AREA_FULL, 0~1로 자름 |
+| 지속성 | 0.2 | 연속 관측 프레임 / PERSIST_FRAMES |
+
+- 프레임 점수: 지속성을 뺀 세 요소의 가중 평균 (FireFusion의 hotspot별 confidence)
+- 트랙 점수: 세 요소의 지수 이동 평균 + 지속성 (트랙마다 프레임당 O(1) 갱신, 미관측 프레임은 0 관측으로 감쇠)
+
+STATE.SCORE 설정:
+- W_EO, W_TEMP, W_AREA, W_PERSIST: 가중치 (합이 1이 아니면 정규화)
+- TEMP_MIN: 온도 여유 기준 (없으면 CAMERA.IR.FIRE_MIN_TEMP)
+- TEMP_SPAN, AREA_FULL, PERSIST_FRAMES: 요소별 포화 기준
+- ALPHA: 트랙 이동 평균 반영 비율
+- FULLRES_MIN: 저장 모드에서 RGB 원본 프레임을 함께 보낼 최소 점수 (0이면 항상)
+- ALARM_MIN: FireStateTracker가 양성으로 셀 최소 트랙 점수 (0이면 점수와 무관, core.fire_state 참고)
+"""
+
+import numpy as np
+
+# 요소 인덱스 (components 열 순서)
+EO, TEMP, AREA = 0, 1, 2
+
+
+class ConfidenceModel:
+    """
+    화재 신뢰도 모델
+
+    요소 계산은 hotspot 배열 단위로 벡터화되어 있고, 트랙 점수는 TrackScore가 누적한다.
+    """
+
+    def __init__(self, w_eo=0.3, w_temp=0.3, w_area=0.2, w_persist=0.2,
+                 temp_min=80.0, temp_span=100.0, area_full=20.0, persist_frames=30,
+                 alpha=0.3, fullres_min=0.0):
+        """
+        Args:
+            w_eo, w_temp, w_area, w_persist: 요소별 가중치
+            temp_min: 온도 여유 기준 온도 (섭씨)
+            temp_span: 온도 점수가 1이 되는 여유 (섭씨)
+            area_full: 면적 점수가 1이 되는 화점 면적 (IR 픽셀)
+            persist_frames: 지속성 점수가 1이 되는 연속 관측 프레임 수
+            alpha: 트랙 요소 이동 평균 반영 비율
+            fullres_min: RGB 원본 프레임 전송 최소 점수
+        """
+        w = np.array([w_eo, w_temp, w_area, w_persist], dtype=np.float64).clip(min=0.0)
+        total = w.sum()
+        if total <= 0:
+            raise ValueError("ConfidenceModel weights must not all be zero")
+        w /= total
+        self.weights = w[:3]                 # 요소 가중치
+        self.w_persist = float(w[3])
+        # 프레임 점수는 지속성을 뺀 세 요소만으로 0~1이 되도록 재정규화
+        self.frame_weights = w[:3] / max(w[:3].sum(), 1e-12)
+        self.temp_min = float(temp_min)
+        self.temp_span = max(1e-6, float(temp_span))
+        self.area_full = max(1e-6, float(area_full))
+        self.persist_frames = max(1, int(persist_frames))
+        self.alpha = min(1.0, max(0.0, float(alpha)))
+        self.fullres_min = float(fullres_min)
+
+    @classmethod
+    def from_cfg(cls, cfg, temp_min=None):
+        """
+        STATE.SCORE 설정으로 생성
+
+        Args:
+            cfg: STATE.SCORE dict (없으면 기본값)
+            temp_min: TEMP_MIN이 설정에 없을 때 쓸 기준 온도 (CAMERA.IR.FIRE_MIN_TEMP)
+        """
+        cfg = cfg or {}
+        return cls(
+            w_eo=cfg.get('W_EO', 0.3),
+            w_temp=cfg.get('W_TEMP', 0.3),
+            w_area=cfg.get('W_AREA', 0.2),
+            w_persist=cfg.get('W_PERSIST', 0.2),
+            temp_min=cfg.get('TEMP_MIN', temp_min if temp_min is not None else 80.0),
+            temp_span=cfg.get('TEMP_SPAN', 100.0),
+            area_full=cfg.get('AREA_FULL', 20.0),
+            persist_frames=cfg.get('PERSIST_FRAMES', 30),
+            alpha=cfg.get('ALPHA', 0.3),
+            fullres_min=cfg.get('FULLRES_MIN', 0.0),
+        )
+
+    def components(self, eo_conf, temps, areas):
+        """
+        요소 점수 행렬
+
+        Args:
+            eo_conf, temps, areas: 같은 길이 배열 (IR만 감지된 hotspot은 eo_conf 0)
+
+        Returns:
+            np.ndarray: (M, 3) [eo, temp, area] 각 0~1
+        """
+        eo_conf = np.asarray(eo_conf, dtype=np.float64)
+        out = np.empty((eo_conf.shape[0], 3))
+        out[:, EO] = eo_conf
+        out[:, TEMP] = (np.asarray(temps, dtype=np.float64) - self.temp_min) / self.temp_span
+        out[:, AREA] = np.asarray(areas, dtype=np.float64) / self.area_full
+        np.clip(out, 0.0, 1.0, out=out)
+        return out
+
+    def frame_scores(self, eo_conf, temps, areas):
+        """hotspot별 프레임 점수 (M,) - 지속성 제외 세 요소 가중 평균"""
+        return self.components(eo_conf, temps, areas) @ self.frame_weights
+
+    def persistence(self, streak):
+        """연속 관측 프레임 수 → 지속성 점수 (0~1)"""
+        return min(1.0, streak / self.persist_frames)
+
+
+class TrackScore:
+    """
+    트랙 하나의 누적 신뢰도 (요소 이동 평균 + 연속 관측 수)
+
+    observe()/miss()는 프레임당 O(1)이며 값은 항상 0~1이다.
+    """
+
+    __slots__ = ('mean', 'streak', 'frames', 'peak', 'value')
+
+    def __init__(self, model, comp):
+        self.mean = np.array(comp, dtype=np.float64)   # 요소 이동 평균 (3,)
+        self.streak = 1       # 연속 관측 프레임 수
+        self.frames = 1       # 누적 관측 프레임 수
+        self.peak = 0.0
+        self.value = 0.0
+        self._refresh(model)
+
+    def observe(self, model, comp):
+        """관측 한 번 반영"""
+        self.mean += model.alpha * (comp - self.mean)
+        self.streak += 1
+        self.frames += 1
+        return self._refresh(model)
+
+    def miss(self, model):
+        """미관측 프레임: 요소는 0 관측으로 감쇠, 연속 관측 수는 초기화"""
+        self.mean *= 1.0 - model.alpha
+        self.streak = 0
+        return self._refresh(model)
+
+    def _refresh(self, model):
+        self.value = float(self.mean @ model.weights + model.w_persist * model.persistence(self.streak))
+        self.peak = max(self.peak, self.value)
+        return self.value
@@ -0,0 +1,209 @@
+"""
+화재 상태 머신 (프레임별 융합 결과 → ALARM/CLEAR 전이)
+
+FireFusion은 프레임 단위로 판정하므로 한 프레임의 오검출/미검출에도 결과가 흔들린다.
+FireStateTracker는 최근 WINDOW 프레임의 양성 여부를 고정 크기 링 버퍼에 쌓고
+양성 비율과 지속 시간으로 디바운스된 상태 전이만 내보낸다.
+
+STATE.FIRE 설정:
+- WINDOW: 링 버퍼 길이 (프레임)
+- THRESHOLD: 화재 판정 양성 비율 (%)
+- CONFIDENCE: 양성으로 셀 최소 판정 신뢰도 (CONFIRMED 0.95 / IR_ONLY 0.70 단계 값)
+- ACTIVE_DUR: 비율이 THRESHOLD 이상으로 유지되어야 ALARM이 되는 시간 (초)
+- INACTIVE_DUR: 비율이 THRESHOLD 미만으로 유지되어야 CLEAR가 되는 시간 (초)
+- MIN_DUR: ALARM 최소 유지 시간 (초)
+
+STATE.SCORE.ALARM_MIN: 양성으로 셀 최소 트랙 누적 점수 (결과의 score, 기본 0 → 점수 도입 전과
+같은 ALARM 타이밍). 점수는 첫 프레임에 0.1~0.3 정도라 CONFIDENCE와 같은 값으로 비교하지 않는다.
+"""
+
+import time
+import threading
+import logging
+import numpy as np
+
+from .fire_fusion import CONFIDENCE_HIGH, CONFIDENCE_MEDIUM
+from .fusion_result import FIRE_CONFIRMED, FIRE_IR_ONLY
+
+STATE_IDLE = 'IDLE'
+STATE_ALARM = 'ALARM'
+
+EVENT_ALARM = 'ALARM'
+EVENT_CLEAR = 'CLEAR'
+
+logger = logging.getLogger(__name__)
+
+# 판정 단계별 신뢰도 (CONFIDENCE 비교 기준)
+STATUS_CONFIDENCE = {FIRE_CONFIRMED: CONFIDENCE_HIGH, FIRE_IR_ONLY: CONFIDENCE_MEDIUM}
+
+
+class FireStateTracker:
+    """
+    링 버퍼 기반 화재 상태 추적기
+
+    update()는 프레임당 O(1): 링 버퍼 한 칸을 교체하며 양성 개수를 증감한다.
+    송신 스레드가 update()를 호출하고, GUI 등 다른 스레드는 snapshot()으로 읽는다.
+    """
+
+    def __init__(self, window=50, threshold=60.0, confidence=0.2,
+                 min_dur=10.0, active_dur=2.0, inactive_dur=10.0, score_min=0.0):
+        """
+        Args:
+            window: 링 버퍼 길이 (프레임)
+            threshold: 양성 비율 임계값 (%)
+            confidence: 양성으로 셀 최소 판정 신뢰도
+            min_dur: ALARM 최소 유지 시간 (초)
+            active_dur: ALARM 진입 디바운스 시간 (초)
+            inactive_dur: CLEAR 디바운스 시간 (초)
+            score_min: 양성으로 셀 최소 트랙 누적 점수 (STATE.SCORE.ALARM_MIN)
+        """
+        self.window = max(1, int(window))
+        self.threshold = min(100.0, max(0.0, float(threshold)))
+        self.confidence = float(confidence)
+        self.min_dur = float(min_dur)
+        self.active_dur = float(active_dur)
+        self.inactive_dur = float(inactive_dur)
+        self.score_min = float(score_min)
+        # 비율 비교를 정수 개수 비교로 바꿔 둔다 (최소 1프레임)
+        self.min_positive = max(1, int(np.ceil(self.window * self.threshold / 100.0)))
+
+        self._lock = threading.Lock()
+        self.reset()
+
+    @classmethod
+    def from_cfg(cls, cfg, score_cfg=None):
+        """
+        STATE.FIRE (+ STATE.SCORE.ALARM_MIN) 설정으로 생성
+
+        cfg 예시: {WINDOW: 50, THRESHOLD: 60, CONFIDENCE: 0.2, MIN_DUR: 10.0,
+                   ACTIVE_DUR: 2.0, INACTIVE_DUR: 10.0}
+        score_cfg 예시: {ALARM_MIN: 0.0, ...}
+        """
+        cfg = cfg or {}
+        score_cfg = score_cfg or {}
+        return cls(
+            window=cfg.get('WINDOW', 50),
+            threshold=cfg.get('THRESHOLD', 60.0),
+            confidence=cfg.get('CONFIDENCE', 0.2),
+            min_dur=cfg.get('MIN_DUR', 10.0),
+            active_dur=cfg.get('ACTIVE_DUR', 2.0),
+            inactive_dur=cfg.get('INACTIVE_DUR', 10.0),
+            score_min=score_cfg.get('ALARM_MIN', 0.0),
+        )
+
+    def reset(self):
+        """링 버퍼와 상태 초기화"""
+        with self._lock:
+            self._ring = np.zeros(self.window, dtype=bool)
+            self._pos = 0
+            self._count = 0         # 링 버퍼 안 양성 프레임 수
+            self.frames = 0
+            self.state = STATE_IDLE
+            self.since = None       # 현재 상태 진입 시각
+            self._above_since = None  # 비율이 임계값 이상이 된 시각
+            self._below_since = None  # 비율이 임계값 미만이 된 시각
+            self.last_event = None
+
+    def is_positive(self, result):
+        """
+        융합 결과 한 프레임이 양성인지 여부
+
+        판정 단계 신뢰도 >= CONFIDENCE 이고, 트랙 누적 점수(score가 있을 때) >= ALARM_MIN
+        """
+        if not result or not result.get('fire_detected'):
+            return False
+        level = STATUS_CONFIDENCE.get(result.get('status'))
+        if level is None:
+            level = result.get('confidence', 0.0)
+        if float(level) < self.confidence:
+            return False
+        score = result.get('score')
+        return score is None or float(score) >= self.score_min
+
+    @property
+    def ratio(self):
+        """링 버퍼 안 양성 비율 (0~1, 분모는 항상 WINDOW)"""
+        return self._count / self.window
+
+    def update(self, result, now=None):
+        """
+        프레임 하나의 융합 결과 반영
+
+        Args:
+            result: FireFusion.fuse() 결과 dict (None이면 음성)
+            now: 현재 시각 (초, 없으면 time.time())
+
+        Returns:
+            dict | None: 상태 전이 이벤트 {'event', 'state', 'ts', 'ratio', 'duration', 'status', 'confidence', 'score'}
+                         전이가 없으면 None
+        """
+        now = time.time() if now is None else float(now)
+        positive = self.is_positive(result)
+        with self._lock:
+            # ===== 1. 링 버퍼 갱신 (O(1)) =====
+            old = self._ring[self._pos]
+            self._ring[self._pos] = positive
+            self._pos = (self._pos + 1) % self.window
+            self._count += int(positive) - int(old)
+            self.frames += 1
+            if self.since is None:
+                self.since = now
+
+            # ===== 2. 임계값 상회/하회 지속 시간 추적 =====
+            above = self._count >= self.min_positive
+            if above:
+                self._below_since = None
+                if self._above_since is None:
+                    self._above_since = now
+            else:
+                self._above_since = None
+                if self._below_since is None:
+                    self._below_since = now
+
+            # ===== 3. 디바운스된 상태 전이 =====
+            event = None
+            if self.state == STATE_IDLE:
+                if above and now - self._above_since >= self.active_dur:
+                    event = self._transition(STATE_ALARM, EVENT_ALARM, now, result)
+            elif (not above
+                  and now - self._below_since >= self.inactive_dur
+                  and now - self.since >= self.min_dur):
+                event = self._transition(STATE_IDLE, EVENT_CLEAR, now, result)
+            return event
+
+    def _transition(self, state, name, now, result):
+        duration = now - self.since
+        self.state = state
+        self.since = now
+        event = {
+            'event': name,
+            'state': state,
+            'ts': now,
+            'ratio': round(self.ratio, 3),
+            'duration': round(duration, 3),  # 이전 상태 유지 시간 (초)
+            'status': (result or {}).get('status'),
+            'confidence': float((result or {}).get('confidence', 0.0)),
+            'score': float((result or {}).get('score') or 0.0),
+        }
+        self.last_event = event
+        logger.info("[FireState] %s (ratio=%.2f, prev state held %.1fs)", name, event['ratio'], duration)
+        return event
+
+    def snapshot(self, now=None):
+        """
+        현재 상태 요약 (다른 스레드에서 읽기용)
+
+        Returns:
+            dict: {'state', 'ratio', 'positives', 'window', 'since', 'duration', 'last_event'}
+        """
+        now = time.time() if now is None else float(now)
+        with self._lock:
+            return {
+                'state': self.state,
+                'ratio': round(self.ratio, 3),
+                'positives': self._count,
+                'window': self.window,
+                'since': self.since,
+                'duration': round(now - self.since, 3) if self.since is not None else 0.0,
+                'last_event': dict(self.last_event) if self.last_event else None,
+            }
@@ -0,0 +1,332 @@
+"""
+다중 화점 추적 모듈 (로드맵 Phase 6)
+
+FireFusion.fuse() 결과를 프레임 간에 이어 화점마다 고유 ID를 부여합니다.
+
+- 관측: 확정 화재는 EO bbox 하나당 1개, IR만 감지된 화점은 RGB 좌표 주변 마커 bbox
+- 예측: bbox 중심의 등속 모델 (cx, cy, vx, vy)
+- 연관: 예측 bbox와 관측 bbox의 IoU 행렬 + 중심 거리 게이트, 비용 순 탐욕 배정
+- 트랙마다 IR/RGB 위치, 온도/신뢰도 이력을 유지하고 프레임별 변경분(delta)을 만든다
+- 트랙마다 연속 신뢰도(core.fire_score.TrackScore)를 누적하고, 프레임 대표 점수(score)를 낸다
+"""
+
+import time
+import logging
+from collections import deque
+
+import numpy as np
+
+from .coord_mapper import bbox_iou_matrix
+from .fire_fusion import FIRE_CONFIRMED, FIRE_IR_ONLY
+from .fusion_result import STATUS_CODES
+from .fire_score import ConfidenceModel, TrackScore
+
+logger = logging.getLogger(__name__)
+
+
+def observations_from_fusion(result, marker_size=30.0):
+    """
+    융합 결과 → 추적 관측 리스트
+
+    확정 화재는 같은 EO bbox에 배정된 hotspot들을 하나로 묶고(가장 뜨거운 hotspot 기준),
+    IR만 감지된 hotspot은 온도 순으로 마커 bbox가 겹치지 않는 것만 남긴다.
+    FusionResult의 hotspot 배열(det_box/det_status/temps/...)에서 바로 만들며
+    지연 생성 뷰(details)는 건드리지 않는다.
+
+    Args:
+        result: FireFusion.fuse() 결과 (FusionResult)
+        marker_size: IR 전용 관측의 RGB 마커 bbox 한 변 길이 (픽셀)
+
+    Returns:
+        list: [{'bbox', 'ir_pos', 'temp', 'area', 'eo_conf', 'confidence', 'status'}, ...] (bbox는 RGB 좌표)
+    """
+    if not result or not len(result.det_status):
+        return []
+    codes, temps, det_box = result.det_status, result.temps, result.det_box
+
+    # ===== 확정: EO bbox별 가장 뜨거운 hotspot (동점이면 앞선 hotspot) =====
+    conf_idx = np.flatnonzero((codes == STATUS_CODES[FIRE_CONFIRMED]) & (det_box >= 0))
+    box_of = det_box[conf_idx]
+    order = np.lexsort((conf_idx, -temps[conf_idx], box_of))
+    sorted_box = box_of[order]
+    head = np.ones(len(order), dtype=bool)
+    head[1:] = sorted_box[1:] != sorted_box[:-1]
+    best = conf_idx[order[head]]                      # bbox 인덱스 순
+    _, first_seen = np.unique(box_of, return_index=True)
+    best = best[np.argsort(first_seen, kind='stable')]  # bbox가 처음 나온 순서
+
+    # ===== IR 전용: 온도 순으로 마커가 겹치는 hotspot 억제 =====
+    ir_idx = np.flatnonzero(codes == STATUS_CODES[FIRE_IR_ONLY])
+    ir_idx = ir_idx[np.argsort(-temps[ir_idx], kind='stable')]
+    rgb = result.rgb_xy[ir_idx]
+    near = np.all(np.abs(rgb[:, None, :] - rgb[None, :, :]) < marker_size, axis=2)
+    keep = np.zeros(len(ir_idx), dtype=bool)
+    suppressed = np.zeros(len(ir_idx), dtype=bool)
+    for k in range(len(ir_idx)):
+        if not suppressed[k]:
+            keep[k] = True
+            suppressed |= near[k]
+    ir_idx = ir_idx[keep]
+
+    ir_xy, areas, det_conf = result.ir_xy, result.areas, result.det_conf
+    obs = []
+    for i, j in zip(best.tolist(), det_box[best].tolist()):
+        obs.append({
+            'bbox': tuple(result.boxes[j].tolist()),
+            'ir_pos': tuple(ir_xy[i].tolist()),
+            'temp': float(temps[i]),
+            'area': float(areas[i]),
+            'eo_conf': float(result.box_conf[j]),
+            'confidence': float(det_conf[i]),
+            'status': FIRE_CONFIRMED,
+        })
+
+    half = marker_size / 2.0
+    for i in ir_idx.tolist():
+        rx, ry = result.rgb_xy[i].tolist()
+        obs.append({
+            'bbox': (rx - half, ry - half, float(marker_size), float(marker_size)),
+            'ir_pos': tuple(ir_xy[i].tolist()),
+            'temp': float(temps[i]),
+            'area': float(areas[i]),
+            'eo_conf': 0.0,
+            'confidence': float(det_conf[i]),
+            'status': FIRE_IR_ONLY,
+        })
+    return obs
+
+
+class FireTrack:
+    """화점 트랙 하나 (RGB bbox 등속 모델 + 이력)"""
+
+    __slots__ = ('id', 'cx', 'cy', 'w', 'h', 'vx', 'vy', 'ir_pos', 'status',
+                 'hits', 'misses', 'first_seen', 'last_seen', 'temps', 'confs', 'score')
+
+    def __init__(self, track_id, obs, now, history=30, score=None):
+        x, y, w, h = obs['bbox']
+        self.id = track_id
+        self.cx, self.cy = x + w / 2.0, y + h / 2.0
+        self.w, self.h = float(w), float(h)
+        self.vx = self.vy = 0.0           # 픽셀/초
+        self.ir_pos = obs['ir_pos']
+        self.status = obs['status']
+        self.hits = 1
+        self.misses = 0
+        self.first_seen = self.last_seen = now
+        self.temps = deque([obs['temp']], maxlen=history)
+        self.confs = deque([obs['confidence']], maxlen=history)
+        self.score = score   # TrackScore (누적 신뢰도)
+
+    @property
+    def bbox(self):
+        return (self.cx - self.w / 2.0, self.cy - self.h / 2.0, self.w, self.h)
+
+    def predict(self, now):
+        """등속 모델로 now 시점 bbox 예측 (상태는 바꾸지 않음)"""
+        dt = now - self.last_seen
+        return (self.cx + self.vx * dt - self.w / 2.0, self.cy + self.vy * dt - self.h / 2.0, self.w, self.h)
+
+    def correct(self, obs, now, alpha):
+        """관측으로 위치/속도 갱신 (alpha: 새 관측 반영 비율)"""
+        x, y, w, h = obs['bbox']
+        cx, cy = x + w / 2.0, y + h / 2.0
+        dt = now - self.last_seen
+        if dt > 0:
+            self.vx += alpha * ((cx - self.cx) / dt - self.vx)
+            self.vy += alpha * ((cy - self.cy) / dt - self.vy)
+        self.cx, self.cy = cx, cy
+        self.w += alpha * (w - self.w)
+        self.h += alpha * (h - self.h)
+        self.ir_pos = obs['ir_pos']
+        self.status = obs['status']
+        self.hits += 1
+        self.misses = 0
+        self.last_seen = now
+        self.temps.append(obs['temp'])
+        self.confs.append(obs['confidence'])
+
+    def to_dict(self):
+        """JSON 직렬화용 요약"""
+        return {
+            'id': self.id,
+            'bbox': [round(v, 1) for v in self.bbox],
+            'ir_pos': [int(v) for v in self.ir_pos],
+            'velocity': [round(self.vx, 1), round(self.vy, 1)],
+            'status': self.status,
+            'temp': round(float(self.temps[-1]), 1),
+            'temp_max': round(float(max(self.temps)), 1),
+            'confidence': round(float(self.confs[-1]), 3),
+            'score': round(self.score.value, 3) if self.score else None,
+            'hits': self.hits,
+            'age': round(self.last_seen - self.first_seen, 2),
+        }
+
+
+class FireTracker:
+    """
+    IoU/중심 거리 기반 다중 화점 추적기
+
+    update()마다 {'new', 'updated', 'lost'} 변경분을 돌려주므로 송신 측은 변한 트랙만 보낼 수 있다.
+    송신 스레드 전용.
+    """
+
+    def __init__(self, iou_thr=0.1, dist_gate=1.0, max_misses=10, min_hits=3,
+                 history=30, alpha=0.5, marker_size=30.0, move_thr=4.0, score_thr=0.1,
+                 score_model=None):
+        """
+        Args:
+            iou_thr: 연관 최소 IoU
+            dist_gate: IoU가 부족할 때 허용할 중심 거리 (트랙 bbox 대각선 대비 비율)
+            max_misses: 연속 미관측 프레임 수가 이를 넘으면 트랙 삭제
+            min_hits: 확정 트랙으로 내보내기 위한 최소 관측 수
+            history: 트랙별 온도/신뢰도 이력 길이
+            alpha: 관측 반영 비율 (속도/크기 평활화)
+            marker_size: IR 전용 관측 마커 크기 (RGB 픽셀)
+            move_thr: 'updated'로 보고할 최소 중심 이동량 (RGB 픽셀)
+            score_thr: 'updated'로 보고할 최소 신뢰도 변화량
+            score_model: 트랙 신뢰도 모델 (ConfidenceModel, 없으면 기본값)
+        """
+        self.iou_thr = float(iou_thr)
+        self.dist_gate = float(dist_gate)
+        self.max_misses = int(max_misses)
+        self.min_hits = max(1, int(min_hits))
+        self.history = int(history)
+        self.alpha = min(1.0, max(0.0, float(alpha)))
+        self.marker_size = float(marker_size)
+        self.move_thr = float(move_thr)
+        self.score_thr = float(score_thr)
+        self.score_model = score_model or ConfidenceModel()
+
+        self.score = 0.0      # 이번 프레임에 관측된 트랙 중 최고 신뢰도
+        self.tracks = []
+        self._next_id = 1
+        self._reported = {}   # track id -> 마지막으로 보고한 (cx, cy, status, score)
+
+    @classmethod
+    def from_cfg(cls, cfg, score_model=None):
+        """
+        STATE.TRACK 설정으로 생성
+
+        cfg 예시: {IOU_THR: 0.1, DIST_GATE: 1.0, MAX_MISSES: 10, MIN_HITS: 3, HISTORY: 30}
+        score_model: STATE.SCORE로 만든 ConfidenceModel (없으면 기본값)
+        """
+        cfg = cfg or {}
+        return cls(
+            iou_thr=cfg.get('IOU_THR', 0.1),
+            dist_gate=cfg.get('DIST_GATE', 1.0),
+            max_misses=cfg.get('MAX_MISSES', 10),
+            min_hits=cfg.get('MIN_HITS', 3),
+            history=cfg.get('HISTORY', 30),
+            alpha=cfg.get('ALPHA', 0.5),
+            marker_size=cfg.get('MARKER_SIZE', 30.0),
+            move_thr=cfg.get('MOVE_THR', 4.0),
+            score_thr=cfg.get('SCORE_THR', 0.1),
+            score_model=score_model,
+        )
+
+    def reset(self):
+        self.tracks = []
+        self._reported = {}
+        self.score = 0.0
+
+    def _associate(self, predicted, obs_boxes):
+        """예측 bbox x 관측 bbox 비용 행렬 → 탐욕 배정 [(track_idx, obs_idx), ...]"""
+        if not predicted or not obs_boxes:
+            return []
+        pred = np.asarray(predicted, dtype=np.float64)
+        obs = np.asarray(obs_boxes, dtype=np.float64)
+        iou = bbox_iou_matrix(pred, obs)
+
+        # 중심 거리 (트랙 대각선으로 정규화)
+        pc = pred[:, :2] + pred[:, 2:] / 2.0
+        oc = obs[:, :2] + obs[:, 2:] / 2.0
+        diag = np.maximum(np.hypot(pred[:, 2], pred[:, 3]), 1.0)[:, None]
+        dist = np.hypot(pc[:, None, 0] - oc[None, :, 0], pc[:, None, 1] - oc[None, :, 1]) / diag
+
+        # IoU가 충분하면 1 - IoU, 아니면 거리 게이트 안에서 1 + dist, 그 외 배정 불가
+        cost = np.where(iou >= self.iou_thr, 1.0 - iou,
+                        np.where(dist <= self.dist_gate, 1.0 + dist, np.inf))
+        pairs = []
+        order = np.argsort(cost, axis=None, kind='stable')
+        used_t, used_o = set(), set()
+        for flat in order:
+            c = cost.flat[flat]
+            if not np.isfinite(c):
+                break
+            t, o = divmod(int(flat), cost.shape[1])
+            if t in used_t or o in used_o:
+                continue
+            used_t.add(t)
+            used_o.add(o)
+            pairs.append((t, o))
+        return pairs
+
+    def update(self, result, now=None):
+        """
+        프레임 하나의 융합 결과로 트랙 갱신
+
+        Args:
+            result: FireFusion.fuse() 결과 FusionResult (None이면 관측 없음)
+            now: 현재 시각 (초, 없으면 time.time())
+
+        Returns:
+            dict: {'new': [track dict], 'updated': [track dict], 'lost': [track id]}
+                  확정 트랙(min_hits 이상)만 보고한다
+        """
+        now = time.time() if now is None else float(now)
+        obs = observations_from_fusion(result, self.marker_size)
+        model = self.score_model
+        comps = model.components([o['eo_conf'] for o in obs], [o['temp'] for o in obs],
+                                 [o['area'] for o in obs])
+
+        # ===== 1. 예측 + 연관 =====
+        predicted = [t.predict(now) for t in self.tracks]
+        pairs = self._associate(predicted, [o['bbox'] for o in obs])
+        matched_t = {t for t, _ in pairs}
+        matched_o = {o for _, o in pairs}
+
+        # ===== 2. 갱신 / 미관측 / 생성 (신뢰도는 트랙마다 O(1) 누적) =====
+        for t, o in pairs:
+            self.tracks[t].correct(obs[o], now, self.alpha)
+            self.tracks[t].score.observe(model, comps[o])
+        for i, track in enumerate(self.tracks):
+            if i not in matched_t:
+                track.misses += 1
+                track.score.miss(model)
+        for i, o in enumerate(obs):
+            if i not in matched_o:
+                self.tracks.append(FireTrack(self._next_id, o, now, self.history,
+                                             score=TrackScore(model, comps[i])))
+                self._next_id += 1
+
+        # ===== 3. 삭제 + 변경분 =====
+        lost = [t.id for t in self.tracks if t.misses > self.max_misses and t.id in self._reported]
+        self.tracks = [t for t in self.tracks if t.misses <= self.max_misses]
+        for tid in lost:
+            self._reported.pop(tid, None)
+
+        self.score = max((t.score.value for t in self.tracks if not t.misses), default=0.0)
+
+        new, updated = [], []
+        for track in self.tracks:
+            if track.hits < self.min_hits or track.misses:
+                continue
+            prev = self._reported.get(track.id)
+            if prev is None:
+                new.append(track.to_dict())
+            elif (prev[2] != track.status
+                  or np.hypot(track.cx - prev[0], track.cy - prev[1]) >= self.move_thr
+                  or abs(track.score.value - prev[3]) >= self.score_thr):
+                updated.append(track.to_dict())
+            else:
+                continue
+            self._reported[track.id] = (track.cx, track.cy, track.status, track.score.value)
+
+        if new or lost:
+            logger.debug("[FireTracker] new=%s lost=%s active=%d",
+                         [t['id'] for t in new], lost, len(self.tracks))
+        return {'new': new, 'updated': updated, 'lost': lost}
+
+    def active_tracks(self):
+        """현재 확정 트랙 요약 리스트"""
+        return [t.to_dict() for t in self.tracks if t.hits >= self.min_hits]
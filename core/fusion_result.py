@@ -0,0 +1,320 @@
+"""
+융합 결과 데이터 모델
+
+FireFusion.fuse() 결과를 숫자 배열로 보관하는 슬롯 객체입니다.
+
+- bbox/신뢰도/온도/상태는 배열로 유지하고, 라벨 문자열과 hotspot별 details 리스트는
+  처음 접근할 때 만들어 결과 객체 안에 보관 (프레임마다 문자열 포맷/딕셔너리 복사 없음)
+- JSON용 dict(to_json_dict)와 바이너리(to_bytes) 인코딩도 요청이 있을 때 한 번만 생성
+- 기존 dict 결과와 같은 키 접근(result['status'], result.get('details'), ...)을 지원
+"""
+
+import struct
+
+import numpy as np
+
+# 판정 결과 상수
+FIRE_CONFIRMED = 'CONFIRMED'      # IR + EO 확정 화재
+FIRE_IR_ONLY = 'IR_ONLY'          # IR만 감지 (의심)
+FIRE_FILTERED = 'FILTERED'        # EO만 감지 (게이트키핑됨)
+NO_FIRE = 'NO_FIRE'               # 화재 아님
+
+# bbox 색상 (BGR)
+COLOR_CONFIRMED = (0, 0, 255)     # 빨강: 확정 화재
+COLOR_IR_ONLY = (0, 165, 255)     # 주황: IR만 감지
+COLOR_FILTERED = (0, 255, 255)    # 노랑: EO만 감지 (필터링됨)
+COLOR_NO_FIRE = (128, 128, 128)   # 회색: 미감지
+
+# 상태 코드 (배열 저장용, 인덱스 = 코드)
+STATUS_NAMES = (NO_FIRE, FIRE_CONFIRMED, FIRE_IR_ONLY, FIRE_FILTERED)
+STATUS_CODES = {name: code for code, name in enumerate(STATUS_NAMES)}
+STATUS_COLORS = (COLOR_NO_FIRE, COLOR_CONFIRMED, COLOR_IR_ONLY, COLOR_FILTERED)
+
+# 바이너리 인코딩: 헤더 + annotation 배열
+_HEADER = struct.Struct('<4sBBfHHH')   # magic, version, status, confidence, confirmed, ir_only, N
+_MAGIC = b'FUSR'
+_VERSION = 1
+
+
+def format_label(status, conf, temp):
+    """annotation 라벨 문자열 (상태별 형식)"""
+    if status == FIRE_CONFIRMED:
+        return f'FIRE ({temp:.0f}C, {conf:.0%})'
+    if status == FIRE_IR_ONLY:
+        return f'IR {temp:.0f}C'
+    return f'FILTERED ({conf:.0%})'
+
+
+class Annotation:
+    """
+    EO 프레임에 그릴 bbox 하나
+
+    dict처럼 'bbox', 'color', 'label', 'status' 키로 읽고 쓸 수 있으며
+    label은 처음 읽을 때 포맷한다.
+    """
+
+    __slots__ = ('bbox', 'status', 'conf', 'temp', 'color', '_label')
+
+    KEYS = ('bbox', 'color', 'label', 'status')
+
+    def __init__(self, bbox, status, conf=0.0, temp=float('nan'), color=None, label=None):
+        self.bbox = bbox
+        self.status = status
+        self.conf = conf
+        self.temp = temp
+        self.color = color if color is not None else STATUS_COLORS[STATUS_CODES.get(status, 0)]
+        self._label = label
+
+    @property
+    def label(self):
+        if self._label is None:
+            self._label = format_label(self.status, self.conf, self.temp)
+        return self._label
+
+    # ===== dict 호환 =====
+    def __getitem__(self, key):
+        if key not in self.KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        if key == 'label':
+            self._label = value
+        elif key in self.KEYS:
+            setattr(self, key, value)
+        else:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in self.KEYS
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self.KEYS else default
+
+    def keys(self):
+        return self.KEYS
+
+    def copy(self):
+        return Annotation(self.bbox, self.status, self.conf, self.temp, self.color, self._label)
+
+    def to_dict(self):
+        """JSON 직렬화용 dict (bbox/color는 리스트)"""
+        bbox = self.bbox
+        return {
+            'bbox': bbox[:4].tolist() if isinstance(bbox, np.ndarray) else [float(v) for v in bbox[:4]],
+            'color': list(self.color),
+            'label': self.label,
+            'status': self.status,
+        }
+
+    def __repr__(self):
+        return f"Annotation({self.status}, bbox={[round(float(v), 1) for v in self.bbox[:4]]})"
+
+
+class FusionResult:
+    """
+    한 프레임의 융합 결과
+
+    EO bbox 단위 배열:
+        boxes (N, 4) float64 [x, y, w, h], box_status (N,) uint8 상태 코드,
+        box_conf (N,) EO 신뢰도, box_temp (N,) 배정된 최고 온도 (없으면 nan)
+    hotspot 판정 단위 배열 (확정 → IR 전용 순):
+        ir_xy (M, 2) IR 좌표, rgb_xy (M, 2) RGB 좌표, temps (M,),
+        areas (M,) 화점 영역 면적, det_box (M,) 배정된 bbox 인덱스 (-1: 없음),
+        det_status (M,) 상태 코드, det_conf (M,) 프레임 신뢰도 (core.fire_score)
+    """
+
+    __slots__ = ('fire_detected', 'confidence', 'status', 'reason', 'confirmed_count', 'ir_only_count',
+                 'boxes', 'box_status', 'box_conf', 'box_temp',
+                 'ir_xy', 'rgb_xy', 'temps', 'areas', 'det_box', 'det_status', 'det_conf',
+                 '_score', '_annotations', '_details', '_json', '_bytes')
+
+    KEYS = ('fire_detected', 'confidence', 'score', 'status', 'reason', 'confirmed_count', 'ir_only_count',
+            'details', 'eo_annotations')
+
+    def __init__(self, status=NO_FIRE, confidence=0.0, reason=None,
+                 boxes=None, box_status=None, box_conf=None, box_temp=None,
+                 ir_xy=None, rgb_xy=None, temps=None, areas=None, det_box=None, det_status=None, det_conf=None):
+        self.boxes = np.zeros((0, 4)) if boxes is None else np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        n = len(self.boxes)
+        self.box_status = _arr(box_status, n, np.uint8)
+        self.box_conf = _arr(box_conf, n, np.float64)
+        self.box_temp = _arr(box_temp, n, np.float64, np.nan)
+
+        self.ir_xy = np.zeros((0, 2), np.int64) if ir_xy is None else np.asarray(ir_xy).reshape(-1, 2)
+        m = len(self.ir_xy)
+        self.rgb_xy = np.zeros((m, 2)) if rgb_xy is None else np.asarray(rgb_xy, dtype=np.float64).reshape(-1, 2)
+        self.temps = _arr(temps, m, np.float64)
+        self.areas = _arr(areas, m, np.float64)
+        self.det_box = _arr(det_box, m, np.intp, -1)
+        self.det_status = _arr(det_status, m, np.uint8)
+        self.det_conf = _arr(det_conf, m, np.float64)
+
+        self.status = status
+        self.confidence = float(confidence)
+        self.reason = reason
+        self.confirmed_count = int(np.count_nonzero(self.det_status == STATUS_CODES[FIRE_CONFIRMED]))
+        self.ir_only_count = int(np.count_nonzero(self.det_status == STATUS_CODES[FIRE_IR_ONLY]))
+        self.fire_detected = m > 0
+
+        self._score = None
+        self._annotations = None
+        self._details = None
+        self._json = None
+        self._bytes = None
+
+    @property
+    def score(self):
+        """하위 판단(알람/저장/전송)용 단일 점수 - 트랙 점수가 주어지지 않으면 프레임 confidence"""
+        return self.confidence if self._score is None else self._score
+
+    @score.setter
+    def score(self, value):
+        self._score = float(value)
+        self._json = None
+
+    # ===== 지연 생성 뷰 =====
+    @property
+    def annotations(self):
+        """Annotation 리스트 (처음 접근 시 생성)"""
+        if self._annotations is None:
+            self._annotations = [
+                Annotation(box, STATUS_NAMES[code], conf, temp)
+                for box, code, conf, temp in zip(self.boxes, self.box_status.tolist(),
+                                                 self.box_conf.tolist(), self.box_temp.tolist())
+            ]
+        return self._annotations
+
+    @annotations.setter
+    def annotations(self, anns):
+        """표시용 annotation 교체 (apply_vis_mode 결과 등) → 직렬화 캐시 무효화"""
+        self._annotations = list(anns or [])
+        self._json = None
+        self._bytes = None
+
+    @property
+    def details(self):
+        """hotspot별 판정 dict 리스트 (처음 접근 시 생성)"""
+        if self._details is None:
+            boxes = [tuple(b) for b in self.boxes.tolist()]
+            confs = self.box_conf.tolist()
+            details = []
+            for (ix, iy), (rx, ry), temp, area, j, code, conf in zip(
+                    self.ir_xy.tolist(), self.rgb_xy.tolist(), self.temps.tolist(), self.areas.tolist(),
+                    self.det_box.tolist(), self.det_status.tolist(), self.det_conf.tolist()):
+                d = {'ir_pos': (ix, iy), 'rgb_pos': (rx, ry), 'temp': temp, 'area': area}
+                if j >= 0:
+                    d['eo_bbox'] = boxes[j]
+                    d['eo_conf'] = confs[j]
+                d['confidence'] = conf
+                d['status'] = STATUS_NAMES[code]
+                details.append(d)
+            self._details = details
+        return self._details
+
+    # ===== dict 호환 =====
+    def __getitem__(self, key):
+        if key == 'eo_annotations':
+            return self.annotations
+        if key not in self.KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        if key != 'eo_annotations':
+            raise KeyError(f"FusionResult only allows replacing 'eo_annotations' (got {key!r})")
+        self.annotations = value
+
+    def __contains__(self, key):
+        return key in self.KEYS
+
+    def __bool__(self):
+        return True
+
+    def get(self, key, default=None):
+        return self[key] if key in self.KEYS else default
+
+    def keys(self):
+        return self.KEYS
+
+    # ===== 직렬화 (요청 시 1회) =====
+    def to_json_dict(self):
+        """송신 패킷용 JSON 호환 dict (결과 객체마다 한 번만 생성)"""
+        if self._json is None:
+            self._json = {
+                'fire_detected': self.fire_detected,
+                'confidence': self.confidence,
+                'score': self.score,
+                'status': self.status,
+                'confirmed_count': self.confirmed_count,
+                'ir_only_count': self.ir_only_count,
+                'eo_annotations': self._json_annotations(),
+            }
+        return self._json
+
+    def _json_annotations(self):
+        if self._annotations is None:
+            # 교체된 적 없는 annotation은 Annotation 객체 없이 배열에서 바로 생성
+            return [
+                {'bbox': box, 'color': list(STATUS_COLORS[code]),
+                 'label': format_label(STATUS_NAMES[code], conf, temp), 'status': STATUS_NAMES[code]}
+                for box, code, conf, temp in zip(self.boxes.tolist(), self.box_status.tolist(),
+                                                 self.box_conf.tolist(), self.box_temp.tolist())
+            ]
+        return [a.to_dict() if isinstance(a, Annotation) else _json_ann(a) for a in self._annotations]
+
+    def to_bytes(self):
+        """
+        고정 헤더 + annotation 배열(float32 bbox/conf/temp, uint8 status) 바이너리
+
+        라벨/색상은 상태에서 다시 만들 수 있으므로 포함하지 않는다.
+        """
+        if self._bytes is None:
+            n = len(self.boxes)
+            header = _HEADER.pack(_MAGIC, _VERSION, STATUS_CODES.get(self.status, 0), self.confidence,
+                                  self.confirmed_count, self.ir_only_count, n)
+            self._bytes = b''.join((
+                header,
+                self.boxes.astype('<f4').tobytes(),
+                self.box_conf.astype('<f4').tobytes(),
+                self.box_temp.astype('<f4').tobytes(),
+                self.box_status.tobytes(),
+            ))
+        return self._bytes
+
+    @classmethod
+    def from_bytes(cls, data):
+        """to_bytes() 역변환 (hotspot 판정 배열은 포함되지 않으므로 개수만 복원)"""
+        magic, version, status, confidence, confirmed, ir_only, n = _HEADER.unpack_from(data)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError("Not a FusionResult v1 payload")
+        off = _HEADER.size
+        boxes = np.frombuffer(data, '<f4', n * 4, off).reshape(n, 4)
+        off += n * 16
+        conf = np.frombuffer(data, '<f4', n, off)
+        temp = np.frombuffer(data, '<f4', n, off + n * 4)
+        codes = np.frombuffer(data, np.uint8, n, off + n * 8)
+        out = cls(STATUS_NAMES[status], confidence, boxes=boxes, box_status=codes, box_conf=conf, box_temp=temp)
+        out.confirmed_count, out.ir_only_count = confirmed, ir_only
+        out.fire_detected = confirmed + ir_only > 0
+        return out
+
+    def __repr__(self):
+        return (f"FusionResult({self.status}, conf={self.confidence:.2f}, "
+                f"confirmed={self.confirmed_count}, ir_only={self.ir_only_count}, boxes={len(self.boxes)})")
+
+
+def _arr(values, n, dtype, fill=0):
+    if values is None:
+        return np.full(n, fill, dtype=dtype)
+    return np.asarray(values, dtype=dtype).reshape(n)
+
+
+def _json_ann(ann):
+    """dict annotation → JSON 호환 dict (색상/bbox 튜플을 리스트로)"""
+    out = dict(ann)
+    if out.get('color') is not None:
+        out['color'] = [int(c) for c in out['color']]
+    if out.get('bbox') is not None:
+        out['bbox'] = [float(v) for v in out['bbox'][:4]]
+    return out
@@ -0,0 +1,74 @@
+"""
+IR hotspot 레코드 배열
+
+detect_fire 결과 hotspot을 구조화 NumPy 배열 한 개로 전달합니다.
+(x, y, temp_corrected, temp_raw, area, region_id) 필드를 가지며, 레코드는
+h[0], h[1], h[2] 처럼 인덱스로도 읽을 수 있어 기존 튜플 소비자와 호환됩니다.
+튜플 리스트가 꼭 필요한 곳은 as_tuples()를 사용합니다.
+"""
+
+import numpy as np
+
+
+HOTSPOT_DTYPE = np.dtype([
+    ('x', np.int16),                 # IR 좌표 (픽셀)
+    ('y', np.int16),
+    ('temp_corrected', np.float64),  # 보정 후 온도 (섭씨)
+    ('temp_raw', np.float64),        # 보정 전 온도 (섭씨)
+    ('area', np.int32),              # 소속 화점 영역 면적 (픽셀, 없으면 0)
+    ('region_id', np.int16),         # 소속 화점 영역 인덱스 (없으면 -1)
+])
+
+
+def empty_hotspots():
+    """hotspot이 없는 빈 배열"""
+    return np.zeros(0, dtype=HOTSPOT_DTYPE)
+
+
+def make_hotspots(xs, ys, temp_corrected, temp_raw, area=None, region_id=None):
+    """
+    좌표/온도 배열로 hotspot 레코드 배열 생성
+
+    Args:
+        xs, ys: IR 좌표 배열
+        temp_corrected, temp_raw: 온도 배열 (섭씨)
+        area, region_id: 영역 정보 (없으면 0 / -1)
+
+    Returns:
+        np.ndarray: HOTSPOT_DTYPE 배열
+    """
+    xs = np.asarray(xs)
+    out = np.zeros(xs.shape[0], dtype=HOTSPOT_DTYPE)
+    out['x'] = xs
+    out['y'] = ys
+    out['temp_corrected'] = temp_corrected
+    out['temp_raw'] = temp_raw
+    out['area'] = 0 if area is None else area
+    out['region_id'] = -1 if region_id is None else region_id
+    return out
+
+
+def to_hotspots(hotspots):
+    """
+    hotspot 입력을 레코드 배열로 변환 (레코드 배열은 그대로 반환)
+
+    Args:
+        hotspots: 레코드 배열, [(x, y[, temp_corrected[, temp_raw]]), ...] 또는 None
+
+    Returns:
+        np.ndarray: HOTSPOT_DTYPE 배열
+    """
+    if isinstance(hotspots, np.ndarray) and hotspots.dtype == HOTSPOT_DTYPE:
+        return hotspots
+    if hotspots is None or len(hotspots) == 0:
+        return empty_hotspots()
+    rows = [tuple(h) for h in hotspots]
+    get = lambda i: [r[i] if len(r) > i else 0.0 for r in rows]
+    return make_hotspots(get(0), get(1), get(2), get(3))
+
+
+def as_tuples(hotspots):
+    """레코드 배열 → [(x, y, temp_corrected, temp_raw), ...] (파이썬 숫자)"""
+    h = to_hotspots(hotspots)
+    return list(zip(h['x'].tolist(), h['y'].tolist(),
+                    h['temp_corrected'].tolist(), h['temp_raw'].tolist()))
@@ -0,0 +1,221 @@
+"""
+오버레이 렌더러 (bbox + 라벨)
+
+라벨마다 cv2.putText를 두 번(외곽선 + 본문) 부르던 그리기를 한 곳으로 모읍니다.
+
+- 라벨 비트맵 캐시: (텍스트, 스케일, 색, 두께)별로 한 번만 렌더링해 LRU에 보관하고,
+  이후에는 라벨 크기 영역만 정수 알파 블렌딩
+- bbox: 같은 (색, 두께) 박스를 cv2.polylines 한 번으로 그림
+- 축소 표시: scale 인자로 축소된 표시용 프레임에 좌표만 변환해 그림 (전체 해상도 복사 불필요)
+"""
+
+from collections import OrderedDict
+import threading
+
+import cv2
+import numpy as np
+
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+
+
+class LabelGlyph:
+    """
+    미리 렌더링한 라벨 한 개
+
+    결과 = (배경 * keep + paint) / 255 형태의 정수 합성 계수를 보관한다.
+    (keep, paint 모두 uint16, 합이 255 * 255를 넘지 않음)
+    """
+
+    __slots__ = ('keep', 'paint', 'pad', 'ascent', 'width', 'height')
+
+    def __init__(self, text, font_scale, color, thickness, outline, background=None):
+        (tw, th), baseline = cv2.getTextSize(text, FONT, font_scale, max(thickness, outline or 0))
+        pad = max(thickness, outline or 0) + 2
+        h, w = th + baseline + 2 * pad, tw + 2 * pad
+        org = (pad, pad + th)
+
+        a_out = np.zeros((h, w), np.uint8)
+        if outline:
+            cv2.putText(a_out, text, org, FONT, font_scale, 255, outline, cv2.LINE_AA)
+        a_fg = np.zeros((h, w), np.uint8)
+        cv2.putText(a_fg, text, org, FONT, font_scale, 255, thickness, cv2.LINE_AA)
+
+        af = a_fg.astype(np.uint32)
+        keep = (255 - a_out.astype(np.uint32)) * (255 - af) // 255   # 배경이 남는 비율 (x255)
+        fg = np.asarray(color, dtype=np.uint32).reshape(1, 1, 3)
+        paint = af[..., None] * fg                                    # 본문 색 (외곽선은 검정)
+        if background is not None:
+            # 불투명 배경 박스: 배경이 남지 않고 keep 비율만큼 배경색
+            bg = np.asarray(background, dtype=np.uint32).reshape(1, 1, 3)
+            paint = paint + keep[..., None] * bg
+            keep = np.zeros_like(keep)
+
+        self.keep = keep.astype(np.uint16)[..., None]
+        self.paint = paint.astype(np.uint16)
+        self.pad = pad
+        self.ascent = th
+        self.width, self.height = w, h
+
+    def blit(self, frame, x, y):
+        """
+        라벨을 frame에 합성 (x, y는 cv2.putText와 같은 기준선 왼쪽 좌표)
+
+        프레임 밖으로 나가는 부분은 잘라낸다.
+        """
+        fh, fw = frame.shape[:2]
+        x0, y0 = int(x) - self.pad, int(y) - self.ascent - self.pad
+        gx0, gy0 = max(0, -x0), max(0, -y0)
+        gx1, gy1 = min(self.width, fw - x0), min(self.height, fh - y0)
+        if gx0 >= gx1 or gy0 >= gy1:
+            return frame
+        roi = frame[y0 + gy0:y0 + gy1, x0 + gx0:x0 + gx1]
+        keep = self.keep[gy0:gy1, gx0:gx1]
+        paint = self.paint[gy0:gy1, gx0:gx1]
+        out = roi.astype(np.uint16)
+        out *= keep
+        out += paint
+        out += 127
+        out //= 255
+        roi[...] = out
+        return frame
+
+
+class OverlayRenderer:
+    """
+    bbox/라벨 오버레이 렌더러
+
+    여러 스레드(송신, GUI)가 같은 인스턴스를 써도 되도록 라벨 캐시는 잠금으로 보호한다.
+    """
+
+    def __init__(self, cache_size=512):
+        """
+        Args:
+            cache_size: 라벨 비트맵 LRU 크기
+        """
+        self.cache_size = int(cache_size)
+        self._glyphs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def glyph(self, text, font_scale=0.8, color=(255, 255, 255), thickness=1, outline=3, background=None):
+        """(텍스트, 스타일)별 LabelGlyph (없으면 렌더링 후 캐시)"""
+        key = (text, round(float(font_scale), 3), tuple(int(c) for c in color), int(thickness),
+               int(outline or 0), tuple(int(c) for c in background) if background is not None else None)
+        with self._lock:
+            g = self._glyphs.get(key)
+            if g is not None:
+                self._glyphs.move_to_end(key)
+                return g
+        g = LabelGlyph(text, key[1], key[2], key[3], key[4], background)
+        with self._lock:
+            self._glyphs[key] = g
+            while len(self._glyphs) > self.cache_size:
+                self._glyphs.popitem(last=False)
+        return g
+
+    def draw_label(self, frame, text, org, font_scale=0.8, color=(255, 255, 255),
+                   thickness=1, outline=3, background=None):
+        """
+        라벨 한 개 그리기 (외곽선 + 본문 putText 두 번과 같은 모양)
+
+        Args:
+            frame: BGR 이미지 (제자리 수정)
+            text: 라벨 문자열
+            org: 기준선 왼쪽 좌표 (cv2.putText와 동일)
+            outline: 검정 외곽선 두께 (0이면 없음)
+            background: 불투명 배경 박스 색 (None이면 없음)
+        """
+        if not text:
+            return frame
+        return self.glyph(text, font_scale, color, thickness, outline, background).blit(frame, *org)
+
+    @staticmethod
+    def draw_boxes(frame, boxes, colors, thicknesses, scale=1.0):
+        """
+        bbox 여러 개를 (색, 두께) 묶음마다 cv2.polylines 한 번으로 그리기
+
+        Args:
+            frame: BGR 이미지 (제자리 수정)
+            boxes: (N, 4) [(x, y, w, h), ...]
+            colors: 박스별 BGR 색 리스트 (또는 공통 색 하나)
+            thicknesses: 박스별 두께 리스트 (또는 공통 두께 하나)
+            scale: 좌표 배율 (축소 표시 프레임에 그릴 때)
+        """
+        b = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        if b.size == 0:
+            return frame
+        n = len(b)
+        if np.ndim(colors) == 1:
+            colors = [colors] * n
+        if np.ndim(thicknesses) == 0:
+            thicknesses = [thicknesses] * n
+        b = b * scale
+        x0, y0 = b[:, 0], b[:, 1]
+        x1, y1 = x0 + b[:, 2], y0 + b[:, 3]
+        quads = np.stack([np.stack([x0, y0], 1), np.stack([x1, y0], 1),
+                          np.stack([x1, y1], 1), np.stack([x0, y1], 1)], axis=1)
+        quads = np.trunc(quads).astype(np.int32)
+
+        groups = {}
+        for i, (c, t) in enumerate(zip(colors, thicknesses)):
+            groups.setdefault((tuple(int(v) for v in c), int(t)), []).append(i)
+        for (color, thickness), idx in groups.items():
+            cv2.polylines(frame, list(quads[idx]), True, color, thickness)
+        return frame
+
+    def draw_annotations(self, frame, annotations, font_scale=0.8, thickness_scale=1.0,
+                         scale=1.0, emphasis=None):
+        """
+        융합 annotation(bbox/color/label/status) 그리기
+
+        Args:
+            frame: BGR 이미지 (제자리 수정)
+            annotations: [{'bbox', 'color', 'label', 'status'}, ...]
+            font_scale: 라벨 폰트 스케일 (표시 프레임 기준, scale과 무관)
+            thickness_scale: 박스/텍스트 두께 배율
+            scale: bbox 좌표 배율 (원본 좌표 → 축소 표시 프레임)
+            emphasis: 박스를 한 단계 두껍게 그릴 status 집합
+
+        Returns:
+            frame
+        """
+        if frame is None or not annotations:
+            return frame
+        font_scale = max(0.2, float(font_scale or 0.8))
+        thickness_scale = max(0.5, float(thickness_scale or 1.0))
+        box_thickness = max(1, int(round(2 * thickness_scale)))
+        text_thickness = max(1, int(round(1.5 * thickness_scale)))
+        emphasis = emphasis or ()
+
+        boxes, colors, thicknesses = [], [], []
+        for ann in annotations:
+            bbox = ann.get('bbox')
+            if bbox is None or len(bbox) < 4:
+                continue
+            boxes.append(bbox[:4])
+            colors.append(ann.get('color', (0, 0, 255)))
+            thicknesses.append(box_thickness + 1 if ann.get('status') in emphasis else box_thickness)
+        self.draw_boxes(frame, boxes, colors, thicknesses, scale)
+
+        text_dy = 6 * thickness_scale
+        for ann, bbox in zip((a for a in annotations if a.get('bbox') is not None and len(a['bbox']) >= 4), boxes):
+            label = ann.get('label')
+            if not label:
+                continue
+            x, y = int(bbox[0] * scale), int(bbox[1] * scale)
+            self.draw_label(frame, label, (x, max(0, int(y - text_dy))), font_scale,
+                            (255, 255, 255), text_thickness, text_thickness + 2)
+        return frame
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def get_renderer():
+    """프로세스 공용 OverlayRenderer (라벨 캐시 공유)"""
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                _default = OverlayRenderer()
+    return _default
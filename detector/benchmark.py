@@ -0,0 +1,470 @@
+"""
+YOLOv8 TFLite 모델 비교 벤치마크 (model/8n_* 중 MODEL 자동 선택)
+
+model/ 아래 변형(입력 320~800, v1~v3)을 차례로 불러 다음을 측정합니다.
+
+- invoke: 전처리된 입력으로 interpreter.invoke()만 반복한 지연 (중앙값)
+- infer: TFLiteWorker._infer_once 전체 (전처리 + invoke + 디코드/NMS) 지연 (중앙값) → FPS
+- RSS: 모델을 로드/실행한 프로세스의 최대 RSS (모델마다 새 프로세스에서 측정)
+- 정확도: 라벨이 있는 샘플에 대한 AP50과 런타임 임계값(--conf)에서의 precision/recall
+
+라벨:
+- 이미지 (--images, 기본 sample/*.jpg): 같은 이름의 YOLO 라벨 txt (이미지 옆 또는 labels/ 폴더,
+  "cls cx cy w h" 정규화 좌표)
+- 캡처 세션 (--session): capture.py --save-det 의 det.jsonl 검출 결과를 기준 라벨로 사용
+- 라벨이 하나도 없으면 기준 모델(--reference, 기본: 입력이 가장 큰 모델)의 검출을 의사 라벨로 씀
+  (이때 AP는 정확도가 아니라 기준 모델과의 일치도)
+
+결과는 (infer 지연, AP50) 기준 파레토 표로 출력하고, --fps를 주면 그 FPS를 만족하는 모델 중
+AP50이 가장 높은 것을 고릅니다. --write면 설정 파일의 MODEL 경로를 그 모델로 바꿉니다.
+
+사용 예:
+    python -m detector.benchmark
+    python -m detector.benchmark --session ./capture_session --classes 1 --stride 5
+    python -m detector.benchmark --fps 10 --write --config configs/config.yaml
+"""
+
+import os
+import re
+import glob
+import time
+import logging
+import argparse
+import resource
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import cv2
+import numpy as np
+import yaml
+
+from configs.config import YAML_PATH
+
+logger = logging.getLogger(__name__)
+
+MODEL_FILE = "best_full_integer_quant.tflite"
+
+
+# ===== 데이터셋 =====
+def find_models(root="model"):
+    """root/*/ 아래 tflite 모델 경로 (이름순)"""
+    paths = sorted(glob.glob(os.path.join(root, "*", MODEL_FILE)))
+    return paths or sorted(glob.glob(os.path.join(root, "*", "*.tflite")))
+
+
+def model_name(path):
+    """모델 표시 이름 (상위 폴더 이름, 예: 8n_640_v2)"""
+    return os.path.basename(os.path.dirname(os.path.abspath(path)))
+
+
+def _label_path(img_path):
+    stem = os.path.splitext(os.path.basename(img_path))[0] + ".txt"
+    d = os.path.dirname(img_path)
+    candidates = [os.path.join(d, stem), os.path.join(d, "labels", stem)]
+    if os.path.basename(d) == "images":
+        candidates.append(os.path.join(os.path.dirname(d), "labels", stem))
+    return next((p for p in candidates if os.path.exists(p)), None)
+
+
+def load_yolo_labels(path, width, height):
+    """YOLO 라벨 txt → (K, 5) [x, y, w, h, cls] (원본 픽셀)"""
+    rows = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) < 5:
+                continue
+            cls, cx, cy, w, h = int(float(parts[0])), *map(float, parts[1:5])
+            rows.append(((cx - w / 2) * width, (cy - h / 2) * height, w * width, h * height, cls))
+    return np.array(rows, dtype=np.float64).reshape(-1, 5)
+
+
+def load_image_set(pattern):
+    """
+    이미지 + YOLO 라벨
+
+    Returns:
+        tuple: (frames, gts) - gts[i]는 (K, 5) 배열, 라벨 파일이 없으면 None
+    """
+    frames, gts = [], []
+    for p in sorted(glob.glob(pattern)):
+        img = cv2.imread(p)
+        if img is None:
+            continue
+        lp = _label_path(p)
+        frames.append(img)
+        gts.append(load_yolo_labels(lp, img.shape[1], img.shape[0]) if lp else None)
+    return frames, gts
+
+
+def load_session(root, stride=1, min_conf=0.0, max_frames=0):
+    """
+    캡처 세션 RGB 프레임 + det.jsonl 기준 라벨
+
+    Returns:
+        tuple: (frames, gts) - det.jsonl에 없는 프레임은 None
+    """
+    from utils.capture_loader import CaptureLoader
+
+    loader = CaptureLoader(root)
+    try:
+        dets = loader.load_detections()
+        frames, gts = [], []
+        for i, item in enumerate(loader):
+            if i % max(1, stride):
+                continue
+            d = dets.get(item["index"])
+            if d is not None:
+                d = np.array([(x, y, w, h, c) for x, y, w, h, conf, c in d if conf >= min_conf],
+                             dtype=np.float64).reshape(-1, 5)
+            frames.append(item["rgb"])
+            gts.append(d)
+            if max_frames and len(frames) >= max_frames:
+                break
+        return frames, gts
+    finally:
+        loader.release()
+
+
+def load_dataset(opts):
+    if opts.get("session"):
+        return load_session(opts["session"], opts.get("stride", 1), opts.get("label_min_conf", 0.0),
+                            opts.get("max_frames", 0))
+    return load_image_set(opts.get("images", "sample/*.jpg"))
+
+
+# ===== 정확도 =====
+def iou_xywh(a, b):
+    """(N, 4), (M, 4) xywh → (N, M) IoU"""
+    a = np.asarray(a, dtype=np.float64).reshape(-1, 4)
+    b = np.asarray(b, dtype=np.float64).reshape(-1, 4)
+    ax1, ay1, bx1, by1 = a[:, 0] + a[:, 2], a[:, 1] + a[:, 3], b[:, 0] + b[:, 2], b[:, 1] + b[:, 3]
+    w = (np.minimum(ax1[:, None], bx1[None]) - np.maximum(a[:, None, 0], b[None, :, 0])).clip(min=0)
+    h = (np.minimum(ay1[:, None], by1[None]) - np.maximum(a[:, None, 1], b[None, :, 1])).clip(min=0)
+    inter = w * h
+    union = (a[:, 2] * a[:, 3])[:, None] + (b[:, 2] * b[:, 3])[None] - inter
+    return inter / np.maximum(union, 1e-9)
+
+
+def evaluate(preds, gts, iou_thr=0.5, conf_thr=0.15, classes=None):
+    """
+    AP50 (클래스별 VOC all-point AP 평균) + conf_thr에서의 precision/recall
+
+    Args:
+        preds: 프레임별 (N, 6) [x, y, w, h, conf, cls]
+        gts: 프레임별 (K, 5) [x, y, w, h, cls] (None인 프레임은 제외)
+        classes: 평가할 클래스 id (None이면 라벨에 있는 전체)
+
+    Returns:
+        dict: {'ap50', 'precision', 'recall', 'n_gt'}
+    """
+    pairs = [(np.asarray(p, dtype=np.float64).reshape(-1, 6), g) for p, g in zip(preds, gts) if g is not None]
+    if classes is None:
+        classes = sorted({int(c) for _, g in pairs for c in g[:, 4]})
+    aps, tp_at, fp_at, n_gt_all = [], 0, 0, 0
+    for c in classes:
+        scores, hits, n_gt = [], [], 0
+        for p, g in pairs:
+            p, g = p[p[:, 5] == c], g[g[:, 4] == c]
+            n_gt += len(g)
+            if len(p) == 0:
+                continue
+            p = p[np.argsort(-p[:, 4])]
+            matched = np.zeros(len(g), dtype=bool)
+            ious = iou_xywh(p[:, :4], g[:, :4]) if len(g) else np.zeros((len(p), 0))
+            for i in range(len(p)):
+                j = int(np.argmax(ious[i])) if ious.shape[1] else -1
+                hit = j >= 0 and ious[i, j] >= iou_thr and not matched[j]
+                if hit:
+                    matched[j] = True
+                scores.append(p[i, 4])
+                hits.append(hit)
+        n_gt_all += n_gt
+        if n_gt == 0:
+            continue
+        order = np.argsort(-np.asarray(scores)) if scores else np.array([], dtype=int)
+        hits_sorted = np.asarray(hits, dtype=bool)[order]
+        tp = np.cumsum(hits_sorted)
+        fp = np.cumsum(~hits_sorted)
+        recall = tp / n_gt
+        precision = tp / np.maximum(tp + fp, 1)
+        # VOC all-point 보간
+        mrec = np.concatenate([[0.0], recall, [1.0]])
+        mpre = np.concatenate([[1.0], precision, [0.0]])
+        mpre = np.flip(np.maximum.accumulate(np.flip(mpre)))
+        aps.append(float(np.sum(np.diff(mrec) * mpre[1:])))
+        above = np.asarray(scores)[order] >= conf_thr if scores else np.array([], dtype=bool)
+        tp_at += int(hits_sorted[above].sum())
+        fp_at += int((~hits_sorted[above]).sum())
+    return {
+        'ap50': float(np.mean(aps)) if aps else 0.0,
+        'precision': tp_at / max(tp_at + fp_at, 1),
+        'recall': tp_at / max(n_gt_all, 1),
+        'n_gt': n_gt_all,
+    }
+
+
+# ===== 모델 측정 =====
+def _peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0   # Linux: KB
+
+
+def measure_model(path, opts, gts=None):
+    """
+    모델 하나 측정 (벤치마크 프로세스 안에서 실행)
+
+    Args:
+        path: tflite 경로
+        opts: run_benchmark 옵션 dict
+        gts: 프레임별 라벨 (None이면 데이터셋 라벨)
+
+    Returns:
+        dict: 측정 결과 (+ 'preds': 프레임별 검출)
+    """
+    from detector.tflite import TFLiteWorker
+
+    frames, ds_gts = load_dataset(opts)
+    if not frames:
+        raise RuntimeError("No benchmark frames found")
+    gts = ds_gts if gts is None else gts
+    rss0 = _peak_rss_mb()
+
+    w = TFLiteWorker(path, opts["labels"], None, None,
+                     allowed_class_ids=opts.get("classes"),
+                     use_npu=bool(opts.get("delegate")), delegate_lib=opts.get("delegate") or "",
+                     cpu_threads=opts.get("threads", 1), conf_thr=opts.get("conf", 0.15),
+                     name=f"Bench-{model_name(path)}")
+    in_h, in_w = int(w.inp["shape"][1]), int(w.inp["shape"][2])
+
+    # ---- 워밍업 (NPU delegate는 첫 invoke에서 그래프 컴파일) ----
+    for _ in range(max(1, opts.get("warmup", 3))):
+        w._infer_once(frames[0])
+
+    # ---- invoke 단독 ----
+    x = w._preprocess(frames[0])[0]
+    w.itp.set_tensor(w.inp["index"], x)
+    invoke = []
+    for _ in range(opts.get("repeat", 5)):
+        t0 = time.perf_counter()
+        w.itp.invoke()
+        invoke.append((time.perf_counter() - t0) * 1000.0)
+
+    # ---- _infer_once 전체 (런타임 임계값) ----
+    infer = []
+    for _ in range(opts.get("repeat", 5)):
+        for f in frames[:opts.get("timing_frames", 8)]:
+            t0 = time.perf_counter()
+            w._infer_once(f)
+            infer.append((time.perf_counter() - t0) * 1000.0)
+
+    # ---- 정확도 (낮은 임계값으로 PR 곡선 전체) ----
+    w.conf_thr = float(opts.get("eval_conf", 0.01))
+    preds = [np.array(w._to_detections(*w._infer_once(f)), dtype=np.float64).reshape(-1, 6) for f in frames]
+    acc = evaluate(preds, gts, conf_thr=opts.get("conf", 0.15), classes=opts.get("classes"))
+
+    infer_ms = float(np.median(infer))
+    rss = _peak_rss_mb()
+    return {
+        'model': model_name(path),
+        'path': path,
+        'input': f"{in_w}x{in_h}",
+        'accel': w.accel,
+        'invoke_ms': float(np.median(invoke)),
+        'infer_ms': infer_ms,
+        'fps': 1000.0 / max(infer_ms, 1e-6),
+        'rss_mb': rss,
+        'rss_delta_mb': rss - rss0,
+        **acc,
+        'preds': preds,
+    }
+
+
+def _measure_isolated(path, opts, gts=None, isolate=True):
+    """모델마다 새 프로세스(spawn)에서 측정 → 최대 RSS가 모델별 값이 됨"""
+    if not isolate:
+        return measure_model(path, opts, gts)
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as ex:
+        return ex.submit(measure_model, path, opts, gts).result()
+
+
+def reference_labels(preds, min_conf=0.25):
+    """기준 모델 검출 → 의사 라벨 (K, 5)"""
+    return [p[p[:, 4] >= min_conf][:, [0, 1, 2, 3, 5]] for p in preds]
+
+
+def run_benchmark(models, opts, isolate=True):
+    """
+    모델 목록 측정
+
+    Returns:
+        tuple: (rows, label_source) - label_source는 'labels' 또는 'reference:<모델>'
+    """
+    _, gts = load_dataset(opts)
+    source, ref_gts = "labels", None
+    if all(g is None for g in gts):
+        ref = opts.get("reference") or max(models, key=lambda p: (_input_size(p), model_name(p)))
+        logger.info("No labels found, using %s detections as reference labels", model_name(ref))
+        ref_row = _measure_isolated(ref, {**opts, "repeat": 1, "timing_frames": 1}, None, isolate)
+        ref_gts = reference_labels(ref_row["preds"], opts.get("ref_conf", 0.25))
+        source = f"reference:{model_name(ref)}"
+
+    rows = []
+    for path in models:
+        logger.info("Benchmarking %s", model_name(path))
+        try:
+            row = _measure_isolated(path, opts, ref_gts, isolate)
+        except Exception as e:
+            logger.warning("Skipping %s: %s", model_name(path), e)
+            continue
+        row.pop('preds', None)
+        rows.append(row)
+    mark_pareto(rows)
+    return rows, source
+
+
+def _input_size(path):
+    m = re.search(r"_(\d+)", model_name(path))
+    return int(m.group(1)) if m else 0
+
+
+# ===== 파레토 / 선택 =====
+def mark_pareto(rows):
+    """(infer_ms 낮을수록, ap50 높을수록) 지배되지 않는 행에 'pareto' True"""
+    for r in rows:
+        r['pareto'] = not any(
+            o is not r and o['infer_ms'] <= r['infer_ms'] and o['ap50'] >= r['ap50']
+            and (o['infer_ms'] < r['infer_ms'] or o['ap50'] > r['ap50'])
+            for o in rows
+        )
+    return rows
+
+
+def pick_model(rows, target_fps):
+    """target_fps를 만족하는 모델 중 AP50 최대 (동률이면 더 빠른 것), 없으면 None"""
+    ok = [r for r in rows if r['fps'] >= target_fps]
+    if not ok:
+        return None
+    return max(ok, key=lambda r: (r['ap50'], -r['infer_ms']))
+
+
+def format_table(rows, label_source="labels"):
+    ap = "AP50" if label_source == "labels" else "AP50*"
+    lines = [f"{'model':<12} {'input':>8} {'accel':>5} {'invoke':>9} {'infer':>9} {'FPS':>6} "
+             f"{'RSS MB':>7} {ap:>6} {'P':>5} {'R':>5}  pareto"]
+    for r in sorted(rows, key=lambda r: r['infer_ms']):
+        lines.append(f"{r['model']:<12} {r['input']:>8} {r['accel']:>5} {r['invoke_ms']:7.1f}ms "
+                     f"{r['infer_ms']:7.1f}ms {r['fps']:6.1f} {r['rss_mb']:7.1f} {r['ap50']:6.3f} "
+                     f"{r['precision']:5.2f} {r['recall']:5.2f}  {'*' if r['pareto'] else ''}")
+    if label_source != "labels":
+        lines.append(f"* AP50/P/R measured against {label_source} (agreement, not ground truth)")
+    return "\n".join(lines)
+
+
+def write_model_key(path, model_path):
+    """
+    설정 파일의 MODEL 줄만 교체 (다른 줄의 주석/서식 유지)
+
+    기존 값의 모델 폴더 위치(보드의 절대 경로 등)는 유지하고 변형 폴더/파일 이름만 바꾼다.
+
+    Returns:
+        str: 기록한 MODEL 값
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    m = re.search(r"^MODEL:[ \t]*([^\n#]*?)[ \t]*(#[^\n]*)?$", text, re.MULTILINE)
+    variant, fname = model_name(model_path), os.path.basename(model_path)
+    if m and m.group(1):
+        old = m.group(1).strip().strip("'\"")
+        value = os.path.join(os.path.dirname(os.path.dirname(old)), variant, fname)
+    else:
+        value = model_path
+    line = f"MODEL: {value}" + (f"  {m.group(2)}" if m and m.group(2) else "")
+    text = text[:m.start()] + line + text[m.end():] if m else text.rstrip("\n") + "\n" + line + "\n"
+    yaml.safe_load(text)  # 저장 전 문법 검증
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    return value
+
+
+# ===== CLI =====
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark model/* TFLite variants and pick MODEL")
+    parser.add_argument("--models", nargs="+", help="Model paths (default: model/*/%s)" % MODEL_FILE)
+    parser.add_argument("--model-root", default="model", help="Model zoo directory")
+    parser.add_argument("--labels", default="model/labels.txt", help="Class names file")
+    parser.add_argument("--images", default="sample/*.jpg", help="Image glob (YOLO label txt next to images)")
+    parser.add_argument("--session", help="Capture session directory (det.jsonl used as labels)")
+    parser.add_argument("--stride", type=int, default=1, help="Session frame stride")
+    parser.add_argument("--max-frames", type=int, default=0, help="Session frame limit (0: all)")
+    parser.add_argument("--label-min-conf", type=float, default=0.0, help="Minimum conf of det.jsonl labels")
+    parser.add_argument("--classes", type=int, nargs="+", help="Class ids to detect/evaluate (default: all)")
+    parser.add_argument("--config", default=YAML_PATH, help="Config yaml (DELEGATE/CONF_THR, MODEL output)")
+    parser.add_argument("--delegate", help="Delegate library (default: config DELEGATE)")
+    parser.add_argument("--threads", type=int, default=1, help="CPU threads")
+    parser.add_argument("--conf", type=float, help="Runtime score threshold (default: config CONF_THR or 0.15)")
+    parser.add_argument("--eval-conf", type=float, default=0.01, help="Score threshold for AP")
+    parser.add_argument("--reference", help="Reference model when no labels exist (default: largest input)")
+    parser.add_argument("--ref-conf", type=float, default=0.25, help="Reference detection threshold")
+    parser.add_argument("--warmup", type=int, default=3, help="Warmup inferences")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repeats")
+    parser.add_argument("--no-isolate", action="store_true", help="Run all models in this process")
+    parser.add_argument("--fps", type=float, help="Target FPS for model selection")
+    parser.add_argument("--write", action="store_true", help="Write the selected model into config MODEL (needs --fps)")
+    args = parser.parse_args(argv)
+    if args.write and not args.fps:
+        parser.error("--write needs --fps (the model is selected for a target FPS)")
+    return args
+
+
+def main(argv=None):
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s | %(levelname)s | %(name)s | %(message)s",
+        datefmt="%H:%M:%S",
+    )
+    args = parse_args(argv)
+    cfg = {}
+    if os.path.exists(args.config):
+        with open(args.config, "r", encoding="utf-8") as f:
+            cfg = yaml.safe_load(f) or {}
+
+    models = args.models or find_models(args.model_root)
+    if not models:
+        raise SystemExit(f"No models found under {args.model_root}")
+    delegate = args.delegate if args.delegate is not None else (cfg.get("DELEGATE") or "")
+    opts = {
+        "labels": args.labels,
+        "images": args.images,
+        "session": args.session,
+        "stride": args.stride,
+        "max_frames": args.max_frames,
+        "label_min_conf": args.label_min_conf,
+        "classes": args.classes,
+        "delegate": delegate if delegate and os.path.exists(delegate) else "",
+        "threads": args.threads,
+        "conf": args.conf if args.conf is not None else float(cfg.get("CONF_THR", cfg.get("CONF_THRESHOLD", 0.15))),
+        "eval_conf": args.eval_conf,
+        "reference": args.reference,
+        "ref_conf": args.ref_conf,
+        "warmup": args.warmup,
+        "repeat": args.repeat,
+    }
+
+    rows, source = run_benchmark(models, opts, isolate=not args.no_isolate)
+    print(format_table(rows, source))
+
+    if args.fps:
+        best = pick_model(rows, args.fps)
+        if best is None:
+            logger.warning("No model reaches %.1f FPS (fastest: %s)", args.fps,
+                           min(rows, key=lambda r: r['infer_ms'])['model'] if rows else "-")
+            return rows
+        logger.info("Selected %s for %.1f FPS (%.1f FPS, AP50=%.3f)", best['model'], args.fps, best['fps'], best['ap50'])
+        if args.write:
+            value = write_model_key(args.config, best['path'])
+            logger.info("MODEL written to %s: %s", args.config, value)
+    return rows
+
+
+if __name__ == "__main__":
+    main()
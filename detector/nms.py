@@ -0,0 +1,286 @@
+"""
+NMS 엔진 (백엔드 교체 + top-k 사전 선택 + 클래스별 일괄 NMS)
+
+백엔드:
+- numpy: 기존 탐욕 루프 (남은 후보 배열을 매 반복 새로 만듦, 기준 구현)
+- matrix: IoU 행렬을 한 번에 계산한 뒤 억제 마스크만 갱신 (박스가 적을 때 가장 빠름)
+- cv2: cv2.dnn.NMSBoxes (C++ 구현, 박스가 많을 때 유리, OpenCV dnn 모듈이 있을 때만)
+
+NmsEngine은 점수 상위 PRE_TOPK개만 남긴 뒤, 박스 수에 따라 백엔드를 고릅니다.
+(AUTO: N <= MATRIX_MAX면 matrix, 아니면 cv2, cv2가 없으면 numpy)
+MATRIX_MAX 기본값은 개발 PC 측정 기준으로 cv2가 있으면 0 (모든 크기에서 cv2가 가장 빠름),
+없으면 128 (그 이상은 N^2 행렬보다 numpy 루프가 빠름)입니다.
+CLASS_AWARE면 클래스마다 좌표를 멀리 떨어뜨려(class offset) NMS 한 번으로 클래스별 NMS를 수행합니다.
+
+STATE.NMS 설정:
+- BACKEND: auto | numpy | matrix | cv2
+- CLASS_AWARE: 클래스별 NMS 여부 (false면 기존처럼 클래스 무관)
+- PRE_TOPK: NMS 전에 남길 최대 후보 수 (점수 상위)
+- MATRIX_MAX: auto에서 matrix 백엔드를 쓸 최대 박스 수 (생략하면 위 기본값)
+
+보드에서 가장 빠른 백엔드/MATRIX_MAX는 마이크로 벤치마크로 고릅니다:
+    python -m detector.nms --sizes 16 64 256 1024
+"""
+
+import time
+import logging
+import argparse
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ('numpy', 'matrix', 'cv2')
+HAS_CV2_NMS = hasattr(cv2, 'dnn') and hasattr(cv2.dnn, 'NMSBoxes')
+DEFAULT_MATRIX_MAX = 0 if HAS_CV2_NMS else 128
+
+
+# ===== 백엔드 =====
+def nms_numpy(boxes_xyxy, scores, iou_thr=0.45, top_k=300):
+    if boxes_xyxy.size == 0:
+        return np.empty((0,), dtype=np.int32)
+    x1 = boxes_xyxy[:, 0]
+    y1 = boxes_xyxy[:, 1]
+    x2 = boxes_xyxy[:, 2]
+    y2 = boxes_xyxy[:, 3]
+    areas = (x2 - x1).clip(min=0) * (y2 - y1).clip(min=0)
+    order = np.argsort(-scores, kind='stable')
+    keep = []
+    while order.size > 0 and len(keep) < top_k:
+        i = order[0]
+        keep.append(i)
+        xx1 = np.maximum(x1[i], x1[order[1:]])
+        yy1 = np.maximum(y1[i], y1[order[1:]])
+        xx2 = np.minimum(x2[i], x2[order[1:]])
+        yy2 = np.minimum(y2[i], y2[order[1:]])
+        w = (xx2 - xx1).clip(min=0)
+        h = (yy2 - yy1).clip(min=0)
+        inter = w * h
+        iou = inter / (areas[i] + areas[order[1:]] - inter + 1e-6)
+        inds = np.where(iou <= iou_thr)[0]
+        order = order[inds + 1]
+    return np.array(keep, dtype=np.int32)
+
+
+def iou_matrix(boxes_xyxy):
+    """(N, 4) xyxy → (N, N) IoU (nms_numpy와 같은 식)"""
+    x1, y1, x2, y2 = boxes_xyxy.T
+    areas = (x2 - x1).clip(min=0) * (y2 - y1).clip(min=0)
+    w = (np.minimum(x2[:, None], x2[None, :]) - np.maximum(x1[:, None], x1[None, :])).clip(min=0)
+    h = (np.minimum(y2[:, None], y2[None, :]) - np.maximum(y1[:, None], y1[None, :])).clip(min=0)
+    inter = w * h
+    return inter / (areas[:, None] + areas[None, :] - inter + 1e-6)
+
+
+def nms_matrix(boxes_xyxy, scores, iou_thr=0.45, top_k=300):
+    """
+    IoU 행렬 기반 탐욕 NMS (nms_numpy와 같은 결과)
+
+    IoU는 한 번에 계산하고, 반복마다 억제 마스크 OR만 하므로 배열을 새로 만들지 않는다.
+    행렬이 N^2이라 박스가 적을 때(수십 개)만 쓴다.
+    """
+    if boxes_xyxy.size == 0:
+        return np.empty((0,), dtype=np.int32)
+    order = np.argsort(-scores, kind='stable')
+    over = iou_matrix(boxes_xyxy[order]) > iou_thr
+    suppressed = np.zeros(len(order), dtype=bool)
+    keep = []
+    for i in range(len(order)):
+        if suppressed[i]:
+            continue
+        keep.append(order[i])
+        if len(keep) >= top_k:
+            break
+        suppressed |= over[i]
+    return np.array(keep, dtype=np.int32)
+
+
+def nms_cv2(boxes_xyxy, scores, iou_thr=0.45, top_k=300):
+    """
+    cv2.dnn.NMSBoxes 백엔드 (점수 내림차순 인덱스)
+
+    NMSBoxes의 top_k는 NMS 전 후보 수 제한이라 쓰지 않고 결과를 잘라 nms_numpy와 맞춘다.
+    """
+    if boxes_xyxy.size == 0:
+        return np.empty((0,), dtype=np.int32)
+    xywh = np.empty(boxes_xyxy.shape, dtype=np.float64)
+    xywh[:, :2] = boxes_xyxy[:, :2]
+    xywh[:, 2:] = boxes_xyxy[:, 2:] - boxes_xyxy[:, :2]
+    idx = cv2.dnn.NMSBoxes(xywh, np.asarray(scores, dtype=np.float32), 0.0, float(iou_thr))
+    return np.asarray(idx, dtype=np.int32).reshape(-1)[:top_k]
+
+
+_BACKEND_FNS = {'numpy': nms_numpy, 'matrix': nms_matrix, 'cv2': nms_cv2}
+
+
+# ===== 엔진 =====
+class NmsEngine:
+    """
+    top-k 사전 선택 + (선택) 클래스별 일괄 NMS + 박스 수 기반 백엔드 자동 선택
+
+    검출 스레드 하나에서 쓰며, 호출 결과는 입력 배열 기준 인덱스(점수 내림차순)다.
+    """
+
+    def __init__(self, iou_thr=0.45, max_dets=300, pre_topk=1000, class_aware=False,
+                 backend='auto', matrix_max=None):
+        """
+        Args:
+            iou_thr: IoU 억제 임계값
+            max_dets: NMS 후 최대 검출 수
+            pre_topk: NMS 전에 남길 최대 후보 수 (0이면 제한 없음)
+            class_aware: 클래스별 NMS 여부 (classes 인자가 있을 때만)
+            backend: 'auto' 또는 BACKENDS 중 하나
+            matrix_max: auto에서 matrix 백엔드를 쓸 최대 박스 수 (None이면 DEFAULT_MATRIX_MAX)
+        """
+        backend = str(backend or 'auto').lower()
+        if backend != 'auto' and backend not in BACKENDS:
+            raise ValueError(f"Unknown NMS backend: {backend} (expected auto or one of {BACKENDS})")
+        if backend == 'cv2' and not HAS_CV2_NMS:
+            logger.warning("cv2.dnn.NMSBoxes not available, NMS backend falls back to auto")
+            backend = 'auto'
+        self.iou_thr = float(iou_thr)
+        self.max_dets = int(max_dets)
+        self.pre_topk = max(0, int(pre_topk or 0))
+        self.class_aware = bool(class_aware)
+        self.backend = backend
+        self.matrix_max = DEFAULT_MATRIX_MAX if matrix_max is None else max(0, int(matrix_max))
+
+    @classmethod
+    def from_cfg(cls, cfg, iou_thr=0.45, max_dets=300):
+        """
+        STATE.NMS 설정으로 생성
+
+        cfg 예시: {BACKEND: auto, CLASS_AWARE: false, PRE_TOPK: 1000, MATRIX_MAX: 0}
+        """
+        cfg = cfg or {}
+        return cls(
+            iou_thr=cfg.get('IOU', iou_thr),
+            max_dets=cfg.get('MAX_DETS', max_dets),
+            pre_topk=cfg.get('PRE_TOPK', 1000),
+            class_aware=cfg.get('CLASS_AWARE', False),
+            backend=cfg.get('BACKEND', 'auto'),
+            matrix_max=cfg.get('MATRIX_MAX'),
+        )
+
+    def select(self, n):
+        """박스 n개에 쓸 백엔드 이름"""
+        if self.backend != 'auto':
+            return self.backend
+        if n <= self.matrix_max:
+            return 'matrix'
+        return 'cv2' if HAS_CV2_NMS else 'numpy'
+
+    def __call__(self, boxes_xyxy, scores, classes=None):
+        """
+        Args:
+            boxes_xyxy: (N, 4) float
+            scores: (N,)
+            classes: (N,) 클래스 id (class_aware일 때 사용)
+
+        Returns:
+            np.ndarray: 남길 인덱스 (int32, 점수 내림차순)
+        """
+        n = len(scores)
+        if n == 0:
+            return np.empty((0,), dtype=np.int32)
+
+        # ---- top-k 사전 선택 (argpartition: O(N)) ----
+        sel = None
+        if self.pre_topk and n > self.pre_topk:
+            sel = np.argpartition(-scores, self.pre_topk - 1)[:self.pre_topk]
+            boxes_xyxy, scores = boxes_xyxy[sel], scores[sel]
+            if classes is not None:
+                classes = classes[sel]
+
+        # ---- 클래스별 일괄 NMS: 클래스마다 좌표 이동 → 다른 클래스끼리는 겹치지 않음 ----
+        if self.class_aware and classes is not None and len(classes):
+            span = float(boxes_xyxy.max() - min(0.0, float(boxes_xyxy.min()))) + 1.0
+            boxes_xyxy = boxes_xyxy + (np.asarray(classes, dtype=np.float64) * span)[:, None].astype(boxes_xyxy.dtype)
+
+        keep = _BACKEND_FNS[self.select(len(scores))](boxes_xyxy, scores, self.iou_thr, self.max_dets)
+        return keep if sel is None else sel[keep].astype(np.int32)
+
+
+# ===== 마이크로 벤치마크 =====
+def make_boxes(n, clusters=8, size=(640, 640), seed=0):
+    """
+    벤치마크용 박스: 객체 몇 개 주변에 겹치는 후보가 몰린 YOLO 출력과 비슷한 분포
+
+    Returns:
+        tuple: (boxes_xyxy (n, 4) float32, scores (n,) float32, classes (n,) int32)
+    """
+    rng = np.random.default_rng(seed)
+    w, h = size
+    centers = rng.uniform((0.1 * w, 0.1 * h), (0.9 * w, 0.9 * h), (clusters, 2))
+    dims = rng.uniform(20, 160, (clusters, 2))
+    c = rng.integers(0, clusters, n)
+    xy = centers[c] + rng.normal(0, 8, (n, 2))
+    wh = dims[c] * rng.uniform(0.8, 1.2, (n, 2))
+    boxes = np.concatenate([xy - wh / 2, xy + wh / 2], axis=1).astype(np.float32)
+    scores = rng.uniform(0.15, 1.0, n).astype(np.float32)
+    return boxes, scores, rng.integers(0, 2, n).astype(np.int32)
+
+
+def benchmark(sizes=(16, 64, 256, 1024), backends=None, iou_thr=0.45, repeat=50):
+    """
+    백엔드별 NMS 시간 (ms, 중앙값)
+
+    Returns:
+        list[dict]: [{'n', backend: ms, ..., 'best'}, ...]
+    """
+    backends = [b for b in (backends or BACKENDS) if b != 'cv2' or HAS_CV2_NMS]
+    rows = []
+    for n in sizes:
+        boxes, scores, _ = make_boxes(int(n))
+        row = {'n': int(n)}
+        for name in backends:
+            fn = _BACKEND_FNS[name]
+            times = []
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                fn(boxes, scores, iou_thr)
+                times.append((time.perf_counter() - t0) * 1000.0)
+            row[name] = float(np.median(times))
+        row['best'] = min(backends, key=lambda b: row[b])
+        rows.append(row)
+    return rows
+
+
+def suggest_matrix_max(rows):
+    """matrix가 가장 빠른 최대 박스 수 (AUTO 전환점)"""
+    n = 0
+    for row in rows:
+        if row['best'] == 'matrix':
+            n = row['n']
+    return n
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="NMS backend micro-benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[8, 16, 32, 64, 128, 256, 512, 1024],
+                        help="Box counts to benchmark")
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, help="Backends (default: all available)")
+    parser.add_argument("--iou", type=float, default=0.45, help="IoU threshold")
+    parser.add_argument("--repeat", type=int, default=50, help="Runs per size/backend")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s | %(levelname)s | %(name)s | %(message)s",
+        datefmt="%H:%M:%S",
+    )
+    args = parse_args(argv)
+    rows = benchmark(args.sizes, args.backends, args.iou, args.repeat)
+    names = [b for b in BACKENDS if b in rows[0]] if rows else []
+    print(f"{'N':>6} | " + " | ".join(f"{b:>9}" for b in names) + " | best")
+    for row in rows:
+        print(f"{row['n']:>6} | " + " | ".join(f"{row[b]:7.3f}ms" for b in names) + f" | {row['best']}")
+    logger.info("Suggested STATE.NMS: {BACKEND: auto, MATRIX_MAX: %d}", suggest_matrix_max(rows))
+    return rows
+
+
+if __name__ == "__main__":
+    main()
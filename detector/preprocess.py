@@ -0,0 +1,188 @@
+"""
+TFLite 입력 전처리 엔진 (letterbox + 양자화를 입력 텐서에 직접 기록)
+
+기존 경로(letterbox → copyMakeBorder → cvtColor → int16 임시 배열 → int8 캐스팅)는
+프레임마다 입력 크기 배열을 4~5개 새로 만듭니다. LetterboxPreprocessor는
+
+- 원본(또는 ROI)을 미리 할당된 입력 텐서의 내부 영역 view에 바로 resize
+- 패딩은 프레임 크기(geometry)가 바뀔 때만 한 번 채움 (텐서 버퍼별)
+- BGR→RGB와 양자화(zero-point 이동)는 같은 view에서 제자리 변환 (양자화는 캐시된 256값 LUT)
+
+으로 처리해 uint8/int8 입력 모델에서 프레임당 numpy 배열 할당이 없습니다.
+float 입력 모델은 기존 방식(letterbox + preprocess_letterbox)으로 처리합니다.
+
+참고: 기존 preprocess_letterbox는 int8 1/255 경로에서만 RGB로 바꿨지만,
+이 엔진은 모든 양자화 입력을 RGB로 넣습니다 (YOLOv8 학습 입력과 동일).
+"""
+
+import cv2
+import numpy as np
+
+
+# ===== 기존 전처리 (float 입력 모델 / 참고용) =====
+def letterbox(img, new_shape, color=(114, 114, 114), cached_params=None):
+    """
+    비율 유지 리사이즈 + 패딩. 반환: (resized, (gain_w, gain_h), (pad_w, pad_h))
+    
+    cached_params: (r, new_unpad, top, bottom, left, right) - 캐시된 파라미터
+    """
+    h0, w0 = img.shape[:2]
+    if isinstance(new_shape, int):
+        new_shape = (new_shape, new_shape)
+    nh, nw = new_shape  # (height, width)
+
+    # 캐시된 파라미터 사용 or 새로 계산
+    if cached_params is not None:
+        r, new_unpad, top, bottom, left, right = cached_params
+    else:
+        r = min(nh / h0, nw / w0)
+        new_unpad = (int(round(w0 * r)), int(round(h0 * r)))
+        dw, dh = nw - new_unpad[0], nh - new_unpad[1]
+        dw /= 2
+        dh /= 2
+        top, bottom = int(round(dh - 0.1)), int(round(dh + 0.1))
+        left, right = int(round(dw - 0.1)), int(round(dw + 0.1))
+
+    if (w0, h0) != new_unpad:
+        img = cv2.resize(img, new_unpad, interpolation=cv2.INTER_LINEAR)
+    img = cv2.copyMakeBorder(img, top, bottom, left, right,
+                             cv2.BORDER_CONSTANT, value=color)
+
+    gain_w, gain_h = r, r
+    pad_w, pad_h = left, top
+    
+    # 캐시용 파라미터도 반환
+    cache_params = (r, new_unpad, top, bottom, left, right)
+    return img, (gain_w, gain_h), (pad_w, pad_h), cache_params
+
+
+def preprocess_letterbox(lb_img, inp_dtype, inp_q, out_arr):
+    """letterbox된 BGR 이미지를 TFLite 입력 텐서(out_arr)에 채웁니다."""
+    scale, zp = inp_q
+
+    if inp_dtype == np.int8 and abs(scale - (1.0 / 255.0)) < 1e-6 and zp == -128:
+        rgb = cv2.cvtColor(lb_img, cv2.COLOR_BGR2RGB)
+        tmp = rgb.astype(np.int16)
+        tmp -= 128
+        out_arr[0, ...] = tmp.astype(np.int8)
+        return out_arr
+
+    img = lb_img.astype(np.float32) / 255.0
+    if inp_dtype == np.uint8:
+        out_arr[0, ...] = (img * 255.0 + 0.5).astype(np.uint8)
+    elif inp_dtype == np.int8:
+        if scale and scale > 0:
+            out_arr[0, ...] = np.clip(img / scale + zp, -128, 127).astype(np.int8)
+        else:
+            out_arr[0, ...] = (img * 255.0 - 128).astype(np.int8)
+    else:
+        out_arr[0, ...] = img.astype(inp_dtype)
+    return out_arr
+
+
+# ===== 제자리 전처리 엔진 =====
+class LetterboxPreprocessor:
+    """
+    비율 유지 리사이즈 + 패딩 + 양자화를 입력 텐서 버퍼에 직접 수행
+
+    텐서 버퍼마다 마지막으로 채운 패딩 geometry를 기억하므로
+    파이프라인 워커처럼 입력 버퍼를 번갈아 써도 패딩은 버퍼당 한 번만 채운다.
+    """
+
+    def __init__(self, in_h, in_w, inp_dtype, inp_q=(0.0, 0), color=(114, 114, 114)):
+        """
+        Args:
+            in_h, in_w: 모델 입력 크기
+            inp_dtype: 입력 텐서 dtype (np.uint8 / np.int8 / float)
+            inp_q: 입력 양자화 (scale, zero_point)
+            color: 패딩 색 (BGR, 좌우 대칭 회색이면 RGB 순서와 무관)
+        """
+        self.in_h, self.in_w = int(in_h), int(in_w)
+        self.inp_dtype = np.dtype(inp_dtype)
+        self.inp_q = tuple(inp_q) if inp_q else (0.0, 0)
+        self.color = tuple(int(c) for c in color)
+        self.lut = self._make_lut(self.inp_dtype, self.inp_q)
+        self.in_place = self.lut is not None or self.inp_dtype == np.uint8
+        # 1/255, zp=-128 (YOLOv8 full integer quant): v - 128 == 부호 비트 반전 → LUT 대신 XOR
+        self.sign_flip = self.lut is not None and np.array_equal(
+            self.lut, np.arange(256, dtype=np.uint8) ^ 0x80)
+        self._geom = None       # ((h0, w0), (r, new_unpad, top, left))
+        self._filled = {}       # id(텐서 버퍼) -> 패딩을 채운 geometry
+
+    @staticmethod
+    def _make_lut(inp_dtype, inp_q):
+        """
+        uint8 화소값 → 양자화 입력값(비트 그대로 uint8로 본 값) 변환표
+
+        uint8 입력은 변환이 필요 없으므로 None, float 입력은 제자리 처리 불가라 None.
+        """
+        if inp_dtype != np.int8:
+            return None
+        scale, zp = inp_q
+        if scale and scale > 0 and not (abs(scale - (1.0 / 255.0)) < 1e-6 and zp == -128):
+            v = np.arange(256, dtype=np.float32) / 255.0
+            q = np.clip(v / scale + zp, -128, 127).astype(np.int8)
+        else:
+            q = (np.arange(256) - 128).astype(np.int8)
+        return q.view(np.uint8)
+
+    def geometry(self, h0, w0):
+        """
+        원본 크기별 letterbox 파라미터 (같은 크기면 캐시 사용)
+
+        Returns:
+            tuple: (r, (new_w, new_h), top, left)
+        """
+        if self._geom is not None and self._geom[0] == (h0, w0):
+            return self._geom[1]
+        r = min(self.in_h / h0, self.in_w / w0)
+        new_unpad = (int(round(w0 * r)), int(round(h0 * r)))
+        dw, dh = (self.in_w - new_unpad[0]) / 2, (self.in_h - new_unpad[1]) / 2
+        top, left = int(round(dh - 0.1)), int(round(dw - 0.1))
+        params = (r, new_unpad, top, left)
+        self._geom = ((h0, w0), params)
+        return params
+
+    def __call__(self, frame_bgr, out):
+        """
+        frame_bgr를 letterbox + 양자화해 out(입력 텐서, (1, H, W, C))에 기록
+
+        Args:
+            frame_bgr: BGR uint8 이미지 (ROI view 가능)
+            out: 미리 할당된 입력 텐서 버퍼
+
+        Returns:
+            tuple: (out, (gain_w, gain_h), (pad_w, pad_h))
+        """
+        h0, w0 = frame_bgr.shape[:2]
+        r, (nw, nh), top, left = self.geometry(h0, w0)
+
+        if not self.in_place:
+            lb_img, gain, pad, _ = letterbox(frame_bgr, (self.in_h, self.in_w), self.color)
+            return preprocess_letterbox(lb_img, self.inp_dtype, self.inp_q, out), gain, pad
+
+        img = out.view(np.uint8)[0]
+        key = id(out)
+        if self._filled.get(key) != self._geom[0]:
+            # ===== 패딩: geometry가 바뀔 때만 내부 영역 바깥 띠를 (양자화된 패딩색으로) 채움 =====
+            pad_val = np.array(self.color[::-1], dtype=np.uint8)
+            if self.lut is not None:
+                pad_val = self.lut[pad_val]
+            img[:top] = pad_val
+            img[top + nh:] = pad_val
+            img[top:top + nh, :left] = pad_val
+            img[top:top + nh, left + nw:] = pad_val
+            self._filled[key] = self._geom[0]
+
+        # ===== 내부 영역 view에 바로 리사이즈 → 제자리 BGR→RGB → 제자리 양자화 =====
+        roi = img[top:top + nh, left:left + nw]
+        if (w0, h0) != (nw, nh):
+            cv2.resize(frame_bgr, (nw, nh), dst=roi, interpolation=cv2.INTER_LINEAR)
+        else:
+            np.copyto(roi, frame_bgr)
+        cv2.cvtColor(roi, cv2.COLOR_BGR2RGB, dst=roi)
+        if self.sign_flip:
+            np.bitwise_xor(roi, 0x80, out=roi)
+        elif self.lut is not None:
+            cv2.LUT(roi, self.lut, dst=roi)
+        return out, (r, r), (left, top)
@@ -0,0 +1,182 @@
+"""
+IR hotspot 기반 RGB 관심 영역(ROI) 추론 계획
+
+FireFusion은 IR hotspot이 없으면 EO 검출을 모두 걸러내므로(IR 게이트키퍼),
+검출기도 같은 기준으로 일을 줄일 수 있습니다.
+
+- IR hotspot 있음: hotspot들을 RGB 좌표로 옮긴 영역을 SIZE x SIZE로 잘라 모델에 넣음
+  (기본 SIZE=모델 입력 크기: 전체 프레임을 축소하지 않고 원본 픽셀 그대로 넣으므로 작은 화염 검출에 유리)
+- IR 조용함: QUIET_EVERY 프레임에 한 번만 전체 프레임 추론, 나머지는 건너뜀
+- hotspot이 SIZE 영역에 다 들어가지 않거나 FULL_EVERY 프레임마다: 전체 프레임 추론
+
+STATE.ROI 설정:
+- ENABLED: ROI 모드 사용 여부
+- SIZE: 잘라낼 RGB 정사각 영역 한 변 (픽셀, 0이면 모델 입력 크기, 프레임보다 크면 프레임 짧은 변)
+- MARGIN: hotspot 외곽에 더할 여유 (RGB 픽셀)
+- MAX_AGE: 마지막 IR 프레임 갱신 후 hotspot을 유효로 볼 시간 (초)
+- QUIET_EVERY: IR이 조용할 때 추론 주기 (프레임, 1이면 매 프레임)
+- FULL_EVERY: ROI 모드 중 전체 프레임 추론 주기 (프레임, 0이면 안 함)
+"""
+
+import time
+import logging
+import threading
+
+import numpy as np
+
+from core.calibration import CalibrationService
+
+logger = logging.getLogger(__name__)
+
+PLAN_FULL = 'full'
+PLAN_ROI = 'roi'
+PLAN_SKIP = 'skip'
+
+
+class IrRoiPlanner:
+    """
+    프레임마다 추론 방식(full/roi/skip)과 잘라낼 영역을 정하는 계획기
+
+    IR 버퍼는 peek()으로만 읽으므로 송신 스레드의 IR 프레임 소비에 영향을 주지 않는다.
+    plan()은 검출(파이프라인이면 -pre) 스레드 전용이고, pop_counts()는 다른 스레드(-post
+    하트비트)에서 불러도 되도록 counts를 잠금으로 보호한다.
+    """
+
+    def __init__(self, ir_buf, calibration=None, ir_size=(160, 120), size=0, margin=48,
+                 max_age=0.5, quiet_every=3, full_every=10):
+        """
+        Args:
+            ir_buf: IR DoubleBuffer (항목: (frame, ts, max_temp, hotspots, analysis))
+            calibration: 공유 CalibrationService (없으면 기본 파라미터)
+            ir_size: IR 프레임 크기 (width, height)
+            size: ROI 한 변 (RGB 픽셀, 0이면 검출기가 모델 입력 크기로 설정)
+            margin: hotspot 외곽 여유 (RGB 픽셀)
+            max_age: hotspot 유효 시간 (초)
+            quiet_every: IR이 조용할 때 추론 주기 (프레임)
+            full_every: ROI 모드 중 전체 프레임 추론 주기 (프레임, 0이면 안 함)
+        """
+        self.ir_buf = ir_buf
+        self.calibration = calibration or CalibrationService()
+        self.ir_size = tuple(ir_size)
+        self.size = max(32, int(size)) if size else 0
+        self.margin = float(margin)
+        self.max_age = float(max_age)
+        self.quiet_every = max(1, int(quiet_every))
+        self.full_every = max(0, int(full_every))
+
+        self._view = None
+        self._ir_ts = None
+        self._hotspots = None
+        self._seen = 0.0
+        self._quiet = 0            # 연속 조용한 프레임 수
+        self._since_full = 0       # 마지막 전체 프레임 추론 이후 ROI 프레임 수
+        self.counts = {PLAN_FULL: 0, PLAN_ROI: 0, PLAN_SKIP: 0}
+        self._counts_lock = threading.Lock()
+
+    @classmethod
+    def from_cfg(cls, cfg, ir_buf, calibration=None, ir_size=(160, 120)):
+        """
+        STATE.ROI 설정으로 생성 (ENABLED가 거짓이면 None)
+
+        cfg 예시: {ENABLED: true, SIZE: 0, MARGIN: 48, MAX_AGE: 0.5, QUIET_EVERY: 3, FULL_EVERY: 10}
+        """
+        cfg = cfg or {}
+        if not cfg.get('ENABLED', False) or ir_buf is None:
+            return None
+        return cls(
+            ir_buf,
+            calibration=calibration,
+            ir_size=ir_size,
+            size=cfg.get('SIZE', 0),
+            margin=cfg.get('MARGIN', 48),
+            max_age=cfg.get('MAX_AGE', 0.5),
+            quiet_every=cfg.get('QUIET_EVERY', 3),
+            full_every=cfg.get('FULL_EVERY', 10),
+        )
+
+    def _poll_ir(self, now):
+        """IR 버퍼의 최신 hotspot 갱신 (새 IR 프레임일 때만)"""
+        item = self.ir_buf.peek()
+        if not item or len(item) < 4:
+            return
+        ts = item[1]
+        if ts != self._ir_ts:
+            self._ir_ts = ts
+            self._hotspots = item[3]
+            self._seen = now
+
+    def active_hotspots(self, now=None):
+        """유효한 hotspot 배열 (없거나 오래됐으면 None)"""
+        now = time.monotonic() if now is None else now
+        self._poll_ir(now)
+        hs = self._hotspots
+        if hs is None or len(hs) == 0 or now - self._seen > self.max_age:
+            return None
+        return hs
+
+    def _mapper(self, frame_w, frame_h):
+        if self._view is None:
+            self._view = self.calibration.view(self.ir_size, (frame_w, frame_h))
+        else:
+            self._view.resize(self.ir_size, (frame_w, frame_h))
+        return self._view.mapper
+
+    def roi_rect(self, hotspots, frame_w, frame_h):
+        """
+        hotspot들을 덮는 SIZE x SIZE 영역 (x0, y0, x1, y1) - 다 들어가지 않으면 None
+
+        영역 크기가 고정이라 검출기의 letterbox 파라미터 캐시를 그대로 쓸 수 있다.
+        """
+        side = min(self.size or min(frame_w, frame_h), frame_w, frame_h)
+        if side >= frame_w and side >= frame_h:
+            return None   # 프레임 전체와 같음
+        xs, ys = self._mapper(frame_w, frame_h).ir_to_rgb_array(hotspots['x'], hotspots['y'])
+        bx0, bx1 = float(np.min(xs)) - self.margin, float(np.max(xs)) + self.margin
+        by0, by1 = float(np.min(ys)) - self.margin, float(np.max(ys)) + self.margin
+        if bx1 - bx0 > side or by1 - by0 > side:
+            return None
+        if bx1 < 0 or by1 < 0 or bx0 >= frame_w or by0 >= frame_h:
+            return None   # 캘리브레이션상 RGB 화면 밖
+        cx, cy = (bx0 + bx1) / 2.0, (by0 + by1) / 2.0
+        x0 = int(round(min(max(cx - side / 2.0, 0), frame_w - side)))
+        y0 = int(round(min(max(cy - side / 2.0, 0), frame_h - side)))
+        return (x0, y0, x0 + side, y0 + side)
+
+    def plan(self, frame_shape, now=None):
+        """
+        이번 RGB 프레임의 추론 계획
+
+        Args:
+            frame_shape: RGB 프레임 shape (h, w[, c])
+            now: 단조 시각 (초, 없으면 time.monotonic())
+
+        Returns:
+            tuple: (mode, rect) - mode는 'full' | 'roi' | 'skip', rect는 roi일 때만 (x0, y0, x1, y1)
+        """
+        h, w = frame_shape[:2]
+        hotspots = self.active_hotspots(now)
+
+        if hotspots is None:
+            # ===== IR 조용함: 낮은 주기로 전체 프레임 =====
+            run = self._quiet % self.quiet_every == 0
+            self._quiet += 1
+            mode, rect = (PLAN_FULL, None) if run else (PLAN_SKIP, None)
+        else:
+            # ===== IR hotspot 있음: ROI (주기적으로 전체 프레임) =====
+            self._quiet = 0
+            rect = None
+            if not (self.full_every and self._since_full >= self.full_every):
+                rect = self.roi_rect(hotspots, w, h)
+            mode = PLAN_ROI if rect is not None else PLAN_FULL
+
+        self._since_full = self._since_full + 1 if mode == PLAN_ROI else 0
+        with self._counts_lock:
+            self.counts[mode] += 1
+        return mode, rect
+
+    def pop_counts(self):
+        """모드별 누적 횟수를 돌려주고 초기화 (하트비트 로그용)"""
+        with self._counts_lock:
+            counts = self.counts
+            self.counts = {PLAN_FULL: 0, PLAN_ROI: 0, PLAN_SKIP: 0}
+        return counts
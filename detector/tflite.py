@@ -5,9 +5,16 @@ import os
 import cv2
 import time
 import threading
+import queue
 import numpy as np
 import tflite_runtime.interpreter as tflite
 import logging
+from functools import lru_cache
+
+from core.overlay import get_renderer
+from detector.preprocess import LetterboxPreprocessor, letterbox, preprocess_letterbox  # letterbox 등은 기존 import 경로 호환
+from detector.nms import NmsEngine, nms_numpy  # nms_numpy는 기존 import 경로 호환
+from detector.roi import PLAN_FULL, PLAN_ROI, PLAN_SKIP
 
 # ===== 로그 유틸 =====
 LOG_EVERY_SEC = float(os.getenv("DET_LOG_EVERY", "2.0"))  # 0이면 하트비트 비활성
@@ -23,91 +30,6 @@ MAX_DETS       = 300
 
 
 # ===== 공통 유틸 (YOLOv8 배치 스크립트에서 가져온 로직) =====
-def letterbox(img, new_shape, color=(114, 114, 114), cached_params=None):
-    """
-    비율 유지 리사이즈 + 패딩. 반환: (resized, (gain_w, gain_h), (pad_w, pad_h))
-    
-    cached_params: (r, new_unpad, top, bottom, left, right) - 캐시된 파라미터
-    """
-    h0, w0 = img.shape[:2]
-    if isinstance(new_shape, int):
-        new_shape = (new_shape, new_shape)
-    nh, nw = new_shape  # (height, width)
-
-    # 캐시된 파라미터 사용 or 새로 계산
-    if cached_params is not None:
-        r, new_unpad, top, bottom, left, right = cached_params
-    else:
-        r = min(nh / h0, nw / w0)
-        new_unpad = (int(round(w0 * r)), int(round(h0 * r)))
-        dw, dh = nw - new_unpad[0], nh - new_unpad[1]
-        dw /= 2
-        dh /= 2
-        top, bottom = int(round(dh - 0.1)), int(round(dh + 0.1))
-        left, right = int(round(dw - 0.1)), int(round(dw + 0.1))
-
-    if (w0, h0) != new_unpad:
-        img = cv2.resize(img, new_unpad, interpolation=cv2.INTER_LINEAR)
-    img = cv2.copyMakeBorder(img, top, bottom, left, right,
-                             cv2.BORDER_CONSTANT, value=color)
-
-    gain_w, gain_h = r, r
-    pad_w, pad_h = left, top
-    
-    # 캐시용 파라미터도 반환
-    cache_params = (r, new_unpad, top, bottom, left, right)
-    return img, (gain_w, gain_h), (pad_w, pad_h), cache_params
-
-
-def nms_numpy(boxes_xyxy, scores, iou_thr=0.45, top_k=300):
-    if boxes_xyxy.size == 0:
-        return np.empty((0,), dtype=np.int32)
-    x1 = boxes_xyxy[:, 0]
-    y1 = boxes_xyxy[:, 1]
-    x2 = boxes_xyxy[:, 2]
-    y2 = boxes_xyxy[:, 3]
-    areas = (x2 - x1).clip(min=0) * (y2 - y1).clip(min=0)
-    order = scores.argsort()[::-1]
-    keep = []
-    while order.size > 0 and len(keep) < top_k:
-        i = order[0]
-        keep.append(i)
-        xx1 = np.maximum(x1[i], x1[order[1:]])
-        yy1 = np.maximum(y1[i], y1[order[1:]])
-        xx2 = np.minimum(x2[i], x2[order[1:]])
-        yy2 = np.minimum(y2[i], y2[order[1:]])
-        w = (xx2 - xx1).clip(min=0)
-        h = (yy2 - yy1).clip(min=0)
-        inter = w * h
-        iou = inter / (areas[i] + areas[order[1:]] - inter + 1e-6)
-        inds = np.where(iou <= iou_thr)[0]
-        order = order[inds + 1]
-    return np.array(keep, dtype=np.int32)
-
-
-def preprocess_letterbox(lb_img, inp_dtype, inp_q, out_arr):
-    """letterbox된 BGR 이미지를 TFLite 입력 텐서(out_arr)에 채웁니다."""
-    scale, zp = inp_q
-
-    if inp_dtype == np.int8 and abs(scale - (1.0 / 255.0)) < 1e-6 and zp == -128:
-        rgb = cv2.cvtColor(lb_img, cv2.COLOR_BGR2RGB)
-        tmp = rgb.astype(np.int16)
-        tmp -= 128
-        out_arr[0, ...] = tmp.astype(np.int8)
-        return out_arr
-
-    img = lb_img.astype(np.float32) / 255.0
-    if inp_dtype == np.uint8:
-        out_arr[0, ...] = (img * 255.0 + 0.5).astype(np.uint8)
-    elif inp_dtype == np.int8:
-        if scale and scale > 0:
-            out_arr[0, ...] = np.clip(img / scale + zp, -128, 127).astype(np.int8)
-        else:
-            out_arr[0, ...] = (img * 255.0 - 128).astype(np.int8)
-    else:
-        out_arr[0, ...] = img.astype(inp_dtype)
-    return out_arr
-
 def dequant(arr, q):
     if not np.issubdtype(arr.dtype, np.integer):
         return arr.astype(np.float32)
@@ -117,6 +39,91 @@ def dequant(arr, q):
     return arr.astype(np.float32)
 
 
+def _channels_first(shape, num_classes):
+    """(A, B) 출력에서 채널 축이 앞(C, N)이면 True, 뒤(N, C)면 False"""
+    a, b = shape
+    c1, c2 = 4 + num_classes, 5 + num_classes
+    if a in (c1, c2) and b not in (c1, c2):
+        return True
+    if b in (c1, c2) and a not in (c1, c2):
+        return False
+    raise RuntimeError(
+        f"Cannot determine channel dim. shape={shape}, "
+        f"expected one dim in {{4+nc={c1}, 5+nc={c2}}} with nc={num_classes}"
+    )
+
+
+@lru_cache(maxsize=32)
+def quantized_threshold(scale, zero_point, conf_thr, dtype=np.int8):
+    """
+    float 점수 임계값 → 양자화 정수 임계값 (q >= 반환값 ⇔ (q - zp) * scale >= conf_thr)
+
+    역양자화와 같은 float32 계산으로 판정하므로 float 경로와 경계값까지 같다.
+    (같은 인자는 캐시되어 한 번만 계산)
+    """
+    info = np.iinfo(dtype)
+    q = np.arange(info.min, info.max + 1, dtype=np.int32)
+    vals = (q.astype(np.float32) - zero_point) * np.float32(scale)
+    hit = np.flatnonzero(vals >= np.float32(conf_thr))
+    return int(q[hit[0]]) if hit.size else info.max + 1
+
+
+def decode_yolov8_quantized(raw, quant, in_w, in_h, conf_thr, num_classes):
+    """
+    양자화(int8/uint8) YOLOv8 출력 디코드 - decode_yolov8_output과 같은 결과
+
+    클래스 점수 최댓값을 정수 영역에서 먼저 임계값과 비교하고,
+    통과한 anchor 열만 역양자화/좌표 변환한다. (전체 anchor float 변환/전치 없음)
+
+    Args:
+        raw: 정수 출력 텐서 (1,N,C) 또는 (1,C,N) - interpreter.tensor() view 가능 (읽기만 함)
+        quant: 출력 양자화 (scale, zero_point)
+    """
+    if raw.ndim != 3:
+        raise RuntimeError(f"Unexpected output shape: {raw.shape}")
+    out = raw[0] if raw.shape[0] == 1 else raw
+    nc = num_classes
+    first = _channels_first(out.shape, nc)
+    C = out.shape[0] if first else out.shape[1]
+    has_obj = C == 5 + nc
+    scale, zp = float(quant[0]), int(quant[1])
+
+    # ---- 1) 정수 영역 조기 필터 ----
+    # obj 채널이 있으면 obj * cls >= thr ⇒ cls, obj >= thr / (표현 가능한 최댓값) 로 느슨하게 거르고 2)에서 정확히 판정
+    thr = float(conf_thr)
+    if has_obj:
+        vmax = (np.iinfo(raw.dtype).max - zp) * scale
+        thr = thr / vmax * (1.0 - 1e-6) if vmax > 0 else np.inf
+    q_thr = quantized_threshold(scale, zp, thr, raw.dtype.type)
+    c0 = 5 if has_obj else 4
+    cls_q = out[c0:] if first else out[:, c0:]
+    keep = cls_q.max(axis=0 if first else 1) >= q_thr
+    if has_obj:
+        keep &= (out[4] if first else out[:, 4]) >= q_thr
+    idx = np.flatnonzero(keep)
+    if idx.size == 0:
+        return np.zeros((0, 4), np.float32), np.zeros((0,), np.float32), np.zeros((0,), np.int32)
+
+    # ---- 2) 통과한 anchor만 역양자화 ----
+    sub = out[:, idx].T if first else out[idx]
+    sub = (sub.astype(np.float32) - zp) * np.float32(scale)
+    cls = sub[:, c0:]
+    cls_id = cls.argmax(axis=1)
+    conf = cls.max(axis=1)
+    if has_obj:
+        conf = sub[:, 4] * conf
+        m = conf >= conf_thr
+        sub, conf, cls_id = sub[m], conf[m], cls_id[m]
+
+    # ---- 3) 좌표 변환 (정규화 여부는 표현 가능한 최댓값으로 판정) ----
+    xywh = sub[:, :4]
+    if (np.iinfo(raw.dtype).max - zp) * scale <= 2.0:
+        xywh = xywh * np.array([in_w, in_h, in_w, in_h], dtype=np.float32)
+    half = xywh[:, 2:4] / 2.0
+    boxes_xyxy = np.concatenate([xywh[:, :2] - half, xywh[:, :2] + half], axis=1).astype(np.float32)
+    return boxes_xyxy, conf.astype(np.float32), cls_id.astype(np.int32)
+
+
 def decode_yolov8_output(y, in_w, in_h, conf_thr, num_classes):
     """
     YOLOv8 TFLite 출력 디코드
@@ -134,23 +141,14 @@ def decode_yolov8_output(y, in_w, in_h, conf_thr, num_classes):
     if out.shape[0] == 1:
         out = out[0]
 
-    a, b = out.shape
     nc = num_classes
     c1 = 4 + nc
     c2 = 5 + nc
 
     # 어느 축이 채널 축인지 자동 판별
-    if a in (c1, c2) and b not in (c1, c2):
+    if _channels_first(out.shape, nc):
         # (C, N) -> (N, C)
         out = out.transpose(1, 0)
-    elif b in (c1, c2) and a not in (c1, c2):
-        # 이미 (N, C)
-        pass
-    else:
-        raise RuntimeError(
-            f"Cannot determine channel dim. shape={out.shape}, "
-            f"expected one dim in {{4+nc={c1}, 5+nc={c2}}} with nc={nc}"
-        )
 
     N, C = out.shape
     if C not in (c1, c2):
@@ -203,34 +201,29 @@ def unletterbox_xyxy(boxes_xyxy, gain, pad):
 
 
 def _draw_boxes(frame_bgr, boxes_xyxy, classes, scores, labels, thr=SCORE_THRESH):
-    """원본 프레임 좌표 기준 boxes_xyxy를 그대로 그림"""
+    """원본 프레임 좌표 기준 boxes_xyxy를 그대로 그림 (core.overlay 공용 렌더러)"""
     H, W = frame_bgr.shape[:2]
     base = min(H, W)
     thickness = max(1, int(round(base / 240)))   # 240 기준
     font_scale = max(0.4, base / 640.0)          # 640 기준
-
-    for i in range(len(scores)):
-        if scores[i] < thr:
-            continue
-        x0, y0, x1, y1 = boxes_xyxy[i]
-        x0 = int(max(0, min(W - 1, x0)))
-        y0 = int(max(0, min(H - 1, y0)))
-        x1 = int(max(0, min(W - 1, x1)))
-        y1 = int(max(0, min(H - 1, y1)))
-
+    renderer = get_renderer()
+
+    keep = np.flatnonzero(np.asarray(scores) >= thr)
+    if keep.size == 0:
+        return frame_bgr
+    b = np.asarray(boxes_xyxy, dtype=np.float64)[keep]
+    b[:, [0, 2]] = np.clip(b[:, [0, 2]], 0, W - 1)
+    b[:, [1, 3]] = np.clip(b[:, [1, 3]], 0, H - 1)
+    b = np.trunc(b)
+    renderer.draw_boxes(frame_bgr, np.c_[b[:, :2], b[:, 2:] - b[:, :2]], (0, 255, 255), thickness)
+
+    for i, (x0, y0) in zip(keep, b[:, :2].astype(int)):
         cls_id = int(classes[i])
         name = labels[cls_id] if 0 <= cls_id < len(labels) else f"id:{cls_id}"
-
-        cv2.rectangle(frame_bgr, (x0, y0), (x1, y1), (0, 255, 255), thickness)
         tag = f"{name} {scores[i]:.2f}"
-
-        # 가독성 있는 두겹 텍스트
-        cv2.putText(frame_bgr, tag, (x0, max(0, y0 - 7)),
-                    cv2.FONT_HERSHEY_SIMPLEX, font_scale, (0, 0, 0),
-                    thickness + 1, cv2.LINE_AA)
-        cv2.putText(frame_bgr, tag, (x0, max(0, y0 - 7)),
-                    cv2.FONT_HERSHEY_SIMPLEX, font_scale, (255, 255, 0),
-                    1, cv2.LINE_AA)
+        # 가독성 있는 두겹 텍스트 (캐시된 라벨 비트맵)
+        renderer.draw_label(frame_bgr, tag, (x0, max(0, y0 - 7)), font_scale,
+                            (255, 255, 0), 1, thickness + 1)
     return frame_bgr
 
 
@@ -240,6 +233,9 @@ class TFLiteWorker(threading.Thread):
     - input_buf: (frame_bgr, ts) 입력
     - output_buf: (vis_frame_bgr, ts, detections) 출력
     - 내부에서 전처리(letterbox)→추론→NMS→원본 좌표 복원까지 수행
+    - roi_planner(detector.roi.IrRoiPlanner)가 있으면 IR hotspot 주변만 잘라 추론하고,
+      IR이 조용할 때는 일부 프레임 추론을 건너뜀 (직전 검출 결과 유지)
+    - nms(detector.nms.NmsEngine)로 NMS 백엔드/클래스별 NMS/top-k를 설정 (없으면 기본 엔진)
     """
     def __init__(self,
                  model_path: str,
@@ -255,7 +251,9 @@ class TFLiteWorker(threading.Thread):
                  target_fps: float = 0,
                  target_res: tuple = (960, 540),
                  name: str = "DetWorker",
-                 conf_thr: float = SCORE_THRESH):
+                 conf_thr: float = SCORE_THRESH,
+                 roi_planner=None,
+                 nms=None):
         super().__init__(daemon=True, name=name)
         self.model_path = model_path
         self.labels = self._load_labels(labels_path)
@@ -272,6 +270,9 @@ class TFLiteWorker(threading.Thread):
         # 리스트/튜플 -> numpy array for fast isin checks (dtype int32)
         self.allowed_class_ids = None if allowed_class_ids is None else np.asarray(allowed_class_ids, dtype=np.int32)
         self.conf_thr = float(conf_thr)
+        self.roi_planner = roi_planner
+        self.nms = nms or NmsEngine(NMS_IOU_THRESH, MAX_DETS)
+        self._last_detections = []
         
         cv2.setNumThreads(4)
         
@@ -279,13 +280,11 @@ class TFLiteWorker(threading.Thread):
         self._ema_alpha = 0.3
         self._ema_total_ms = None
         self._ema_invoke_ms = None
+        self._ema_pre_ms = None
+        self._ema_post_ms = None
         self._win_start_ts = time.time()
         self._win_frames = 0
 
-        # === Letterbox 캐싱 (카메라 해상도 고정 시) ===
-        self._lb_params_cache = None  # (r, new_unpad, top, bottom, left, right, expected_shape)
-        self._lb_gain_pad_cache = None  # (gw, gh, pw, ph)
-
         self.itp, self.inp, self.outs, self.accel = self._make_interpreter()
         _p(self.name, f"init accel={self.accel}, threads={self.cpu_threads}, target_fps={(1.0/self.target_period) if self.target_period>0 else 0}")
 
@@ -294,6 +293,14 @@ class TFLiteWorker(threading.Thread):
         in_dtype = self.inp["dtype"]                  # 보통 np.int8
         self._input_buf = np.empty(in_shape, dtype=in_dtype)
 
+        # === letterbox + 양자화 전처리 엔진 (geometry/패딩/양자화 LUT 캐시) ===
+        self._prep = LetterboxPreprocessor(in_shape[1], in_shape[2], in_dtype,
+                                           self.inp.get("quantization", (0.0, 0)))
+
+        # ROI 크기 미지정 시 모델 입력 크기 (원본 픽셀 1:1, 업샘플링 없음)
+        if self.roi_planner is not None and not self.roi_planner.size:
+            self.roi_planner.size = int(max(in_shape[1], in_shape[2]))
+
     def _load_labels(self, path):
         # 기존처럼 한 줄당 한 클래스 이름이 있는 txt 파일을 사용
         with open(path, "r", encoding="utf-8") as f:
@@ -319,10 +326,20 @@ class TFLiteWorker(threading.Thread):
         _p(self.name, f"TFLite accel={accel}, threads={self.cpu_threads}")
         return itp, inp, outs, accel
 
-    def _get_outputs_float(self):
+    def _read_outputs(self, copy=True):
+        """
+        invoke 직후 출력 텐서 (양자화 값 그대로 - 역양자화는 후처리 단계)
+
+        copy=False면 interpreter 내부 버퍼 view (복사 없음). view가 살아 있으면 다음 invoke가
+        실패하므로 같은 스레드에서 다음 invoke 전에 후처리를 끝낼 때만 사용한다.
+        """
+        if copy:
+            return [self.itp.get_tensor(od["index"]) for od in self.outs]
+        return [self.itp.tensor(od["index"])() for od in self.outs]
+
+    def _outputs_float(self, raw_outs):
         outs = []
-        for od in self.outs:
-            arr = self.itp.get_tensor(od["index"])
+        for od, arr in zip(self.outs, raw_outs):
             if np.issubdtype(arr.dtype, np.integer):
                 scale, zp = od["quantization"]
                 arr = (arr.astype(np.float32) - zp) * (scale if scale != 0 else 1.0)
@@ -331,102 +348,153 @@ class TFLiteWorker(threading.Thread):
             outs.append(arr)
         return outs
 
-    def _infer_once(self, frame_bgr):
-        """
-        한 프레임 처리:
-        1) letterbox + 전처리
-        2) TFLite invoke
-        3) YOLOv8 디코드 + NMS + 원본 좌표 복원
-        """
-        t0 = time.perf_counter()
+    def _get_outputs_float(self):
+        return self._outputs_float(self._read_outputs())
 
-        # --- 입력 shape / quant 정보 ---
-        in_shape = self.inp["shape"]  # (1,H,W,C)
-        in_h, in_w = int(in_shape[1]), int(in_shape[2])
-        inp_dtype = self.inp["dtype"]
-        inp_q     = self.inp.get("quantization", (0.0, 0))
+    def _preprocess(self, frame_bgr, roi=None, out=None):
+        """
+        1단계: (ROI 자르기) + letterbox + 양자화 전처리
 
-        # --- letterbox + 양자화 전처리 (캐싱 적용) ---
-        h0, w0 = frame_bgr.shape[:2]
-        
-        # 캐시 확인: 프레임 크기가 같으면 letterbox 파라미터 재사용
-        if self._lb_params_cache and self._lb_params_cache[6] == (h0, w0):
-            # 캐시 히트: 계산 스킵
-            cached_params = self._lb_params_cache[:6]
-            lb_img, (gw, gh), (pw, ph), _ = letterbox(frame_bgr, (in_h, in_w), cached_params=cached_params)
-        else:
-            # 캐시 미스: 새로 계산하고 저장
-            lb_img, (gw, gh), (pw, ph), cache_params = letterbox(frame_bgr, (in_h, in_w))
-            self._lb_params_cache = cache_params + ((h0, w0),)
-        
-        x = preprocess_letterbox(lb_img, inp_dtype, inp_q, self._input_buf)
-        t_pre = time.perf_counter()
+        Args:
+            frame_bgr: 원본 BGR 프레임
+            roi: (x0, y0, x1, y1)이면 해당 영역만 사용
+            out: 채울 입력 텐서 버퍼 (없으면 self._input_buf)
 
-        # ---- 핵심 추론 ----
-        t_inv0 = time.perf_counter()
+        Returns:
+            tuple: (입력 텐서, (gain_w, gain_h), (pad_w, pad_h), (offset_x, offset_y))
+        """
+        offset = (0, 0)
+        if roi is not None:
+            rx0, ry0, rx1, ry1 = roi
+            frame_bgr = frame_bgr[ry0:ry1, rx0:rx1]
+            offset = (rx0, ry0)
+
+        # --- letterbox + 양자화를 입력 텐서에 직접 기록 (프레임당 배열 할당 없음) ---
+        x, gain, pad = self._prep(frame_bgr, self._input_buf if out is None else out)
+        return x, gain, pad, offset
+
+    def _invoke(self, x, copy=True):
+        """2단계: TFLite invoke → 출력 텐서 (copy=False면 내부 버퍼 view)"""
         self.itp.set_tensor(self.inp["index"], x)
         self.itp.invoke()
-        outs = self._get_outputs_float()
-        t_inv1 = time.perf_counter()
+        return self._read_outputs(copy)
+
+    def _postprocess(self, raw_outs, gain, pad, offset=(0, 0)):
+        """
+        3단계: YOLOv8 디코드 + 클래스 필터 + NMS + 원본 좌표 복원
+
+        Returns:
+            tuple: (scores, boxes_xyxy, classes, raw_count)
+        """
+        in_shape = self.inp["shape"]
+        in_h, in_w = int(in_shape[1]), int(in_shape[2])
 
-        # ---- 후처리(락 밖) ----
         # YOLOv8은 보통 출력 하나만 사용 (det)
-        y = outs[0]
-        # (B,N,C)/(B,C,N) → 박스/점수/클래스
-        boxes_in, scores, classes = decode_yolov8_output(
-            y, in_w, in_h, self.conf_thr, num_classes=len(self.labels)
-        )
+        raw = raw_outs[0]
+        scale, zp = self.outs[0]["quantization"]
+        if np.issubdtype(raw.dtype, np.integer) and scale > 0:
+            # 정수 영역 조기 필터 → 통과한 anchor만 역양자화
+            boxes_in, scores, classes = decode_yolov8_quantized(
+                raw, (scale, zp), in_w, in_h, self.conf_thr, num_classes=len(self.labels)
+            )
+        else:
+            y = self._outputs_float(raw_outs[:1])[0]
+            # (B,N,C)/(B,C,N) → 박스/점수/클래스
+            boxes_in, scores, classes = decode_yolov8_output(
+                y, in_w, in_h, self.conf_thr, num_classes=len(self.labels)
+            )
         # Optional: restrict to allowed classes before NMS to avoid cross-class suppression
         if self.allowed_class_ids is not None and classes.size > 0:
             mask = np.isin(classes, self.allowed_class_ids)
-            if not mask.any():
-                # nothing left
-                return np.zeros((0,), np.float32), np.zeros((0,4), np.float32), np.zeros((0,), np.int32)
             boxes_in = boxes_in[mask]
             scores = scores[mask]
             classes = classes[mask]
+        raw_count = len(scores)
 
-        # NMS
-        keep = nms_numpy(boxes_in, scores, NMS_IOU_THRESH, MAX_DETS)
+        # NMS (top-k 사전 선택 + 박스 수별 백엔드, detector.nms)
+        keep = self.nms(boxes_in, scores, classes)
         boxes_in = boxes_in[keep]
         scores   = scores[keep]
         classes  = classes[keep]
         # letterbox 역변환 → 원본 프레임 좌표
-        boxes_xyxy = unletterbox_xyxy(boxes_in, (gw, gh), (pw, ph))
+        boxes_xyxy = unletterbox_xyxy(boxes_in, gain, pad)
+        if offset != (0, 0):
+            boxes_xyxy[:, [0, 2]] += offset[0]
+            boxes_xyxy[:, [1, 3]] += offset[1]
+        return scores, boxes_xyxy, classes, raw_count
 
-        t_post = time.perf_counter()
+    def _infer_once(self, frame_bgr, roi=None):
+        """
+        한 프레임 처리:
+        1) letterbox + 전처리
+        2) TFLite invoke
+        3) YOLOv8 디코드 + NMS + 원본 좌표 복원
 
-        # 상세 타이밍(ms)
-        invoke_ms = (t_inv1 - t_inv0) * 1000.0
-        pre_ms  = (t_pre - t0) * 1000.0
-        post_ms = (t_post - t_inv1) * 1000.0
-        total_ms= (t_post - t0) * 1000.0
+        roi: (x0, y0, x1, y1)이면 해당 영역만 잘라 추론하고 박스를 원본 프레임 좌표로 되돌림
+        """
+        t0 = time.perf_counter()
+        x, gain, pad, offset = self._preprocess(frame_bgr, roi)
+        t_pre = time.perf_counter()
 
-        # 통계 업데이트 (탐지 건수 포함)
-        self._update_stats(invoke_ms, total_ms, det_count=len(boxes_xyxy), raw_count=len(scores))
+        # ---- 핵심 추론 (출력은 복사 없이 내부 버퍼 view로 바로 후처리) ----
+        raw_outs = self._invoke(x, copy=False)
+        t_inv = time.perf_counter()
 
-        # 디버깅이 필요하면 아래 주석 해제해서 세부 타이밍 로그 가능
-        # _p(self.name, f"pre={pre_ms:5.1f} | invoke={invoke_ms:6.1f} | "
-        #               f"post={post_ms:5.1f} | total={total_ms:6.1f} ms")
+        # ---- 후처리 ----
+        scores, boxes_xyxy, classes, raw_count = self._postprocess(raw_outs, gain, pad, offset)
+        del raw_outs   # 내부 버퍼 view 해제 (남아 있으면 다음 invoke 실패)
+        t_post = time.perf_counter()
 
+        # 통계 업데이트 (단계별 타이밍 + 탐지 건수)
+        self._update_stats((t_inv - t_pre) * 1000.0, (t_post - t0) * 1000.0,
+                           det_count=len(boxes_xyxy), raw_count=raw_count,
+                           pre_ms=(t_pre - t0) * 1000.0, post_ms=(t_post - t_inv) * 1000.0)
         return scores, boxes_xyxy, classes
 
+    @staticmethod
+    def _to_detections(scores, boxes_xyxy, classes):
+        """검출 결과 → bbox 리스트 [(x, y, w, h, confidence, class_id), ...]"""
+        detections = []
+        for i, box in enumerate(boxes_xyxy):
+            x1, y1, x2, y2 = box
+            w, h = x2 - x1, y2 - y1
+            conf = scores[i] if i < len(scores) else 0.0
+            cls = classes[i] if i < len(classes) else 0
+            detections.append((float(x1), float(y1), float(w), float(h), float(conf), int(cls)))
+        return detections
+
+    def _idle(self):
+        """프레임 없음 → 스트림별 백오프(time.sleep) 적용"""
+        if self.target_period > 0:
+            idle = max(0.001, min(0.25 * self.target_period, 0.010))
+            time.sleep(idle)
+        else:
+            time.sleep(0.005)
+
+    def _pace(self):
+        """타깃 FPS 페이싱: 루프 주기가 target_period보다 빠르면 남은 시간만큼 쉼"""
+        if self.target_period > 0:
+            now = time.perf_counter()
+            elapsed = now - self._last_tick
+            if elapsed < self.target_period:
+                time.sleep(self.target_period - elapsed)
+            self._last_tick = time.perf_counter()
+
     def run(self):
         while not self.stop_evt.is_set():
             item = self.input_buf.read()
 
-            # === 프레임 없음 → 스트림별 백오프(time.sleep) 적용 ===
             if not item:
-                if self.target_period > 0:
-                    idle = max(0.001, min(0.25 * self.target_period, 0.010))
-                    time.sleep(idle)
-                else:
-                    time.sleep(0.005)
+                self._idle()
                 self._heartbeat()
                 continue
 
             frame, ts = item
-            scores, boxes_xyxy, classes = self._infer_once(frame)
+
+            # 0) 추론 계획 (IR 기반 ROI / 듀티 사이클)
+            mode, roi = PLAN_FULL, None
+            if self.roi_planner is not None:
+                mode, roi = self.roi_planner.plan(frame.shape)
 
             # 1) 원본 프레임 복사 (GUI/송신 단계에서 오버레이 처리)
             vis = frame.copy()
@@ -435,26 +503,18 @@ class TFLiteWorker(threading.Thread):
             # vis = cv2.resize(vis, self.target_res, interpolation=cv2.INTER_AREA)
 
             # 3) 검출 결과를 bbox 리스트로 변환 (x, y, w, h, confidence)
-            detections = []
-            if len(boxes_xyxy) > 0:
-                for i, box in enumerate(boxes_xyxy):
-                    x1, y1, x2, y2 = box
-                    w, h = x2 - x1, y2 - y1
-                    conf = scores[i] if i < len(scores) else 0.0
-                    cls = classes[i] if i < len(classes) else 0
-                    detections.append((float(x1), float(y1), float(w), float(h), float(conf), int(cls)))
+            if mode == PLAN_SKIP:
+                # IR이 조용한 프레임: 추론 생략, 직전 검출 결과 유지
+                detections = self._last_detections
+            else:
+                scores, boxes_xyxy, classes = self._infer_once(frame, roi=roi)
+                detections = self._to_detections(scores, boxes_xyxy, classes)
+                self._last_detections = detections
 
             # 출력 버퍼로 전송 (vis, ts, detections)
             self.output_buf.write((vis, ts, detections))
             self._heartbeat()
-
-            # === 타깃 FPS 페이싱: 루프 주기가 target_period보다 빠르면 남은 시간만큼 쉼 ===
-            if self.target_period > 0:
-                now = time.perf_counter()
-                elapsed = now - self._last_tick
-                if elapsed < self.target_period:
-                    time.sleep(self.target_period - elapsed)
-                self._last_tick = time.perf_counter()
+            self._pace()
 
     def _heartbeat(self):
         if LOG_EVERY_SEC <= 0:
@@ -470,17 +530,23 @@ class TFLiteWorker(threading.Thread):
             # EMA 값들
             et = self._ema_total_ms if self._ema_total_ms is not None else 0.0
             ei = self._ema_invoke_ms if self._ema_invoke_ms is not None else 0.0
+            ep = self._ema_pre_ms if self._ema_pre_ms is not None else 0.0
+            eq = self._ema_post_ms if self._ema_post_ms is not None else 0.0
 
             tgt = (1.0/self.target_period) if self.target_period>0 else 0
             det = getattr(self, "_win_det", 0)
             det_raw = getattr(self, "_win_det_raw", 0)
+            plan = ""
+            if self.roi_planner is not None:
+                c = self.roi_planner.pop_counts()
+                plan = f" | roi={c[PLAN_ROI]} full={c[PLAN_FULL]} skip={c[PLAN_SKIP]}"
             _p(self.name, f"{self.accel} | FPS={fps:5.2f} (target={tgt}) | "
-                          f"total={et:6.1f} ms | invoke={ei:6.1f} ms | det={det} raw={det_raw}")
+                          f"total={et:6.1f} ms | pre={ep:5.1f} invoke={ei:6.1f} post={eq:5.1f} ms | det={det} raw={det_raw}{plan}")
             self._last_beat = now
             self._win_det = 0
             self._win_det_raw = 0
 
-    def _update_stats(self, invoke_ms, total_ms, det_count=0, raw_count=0):
+    def _update_stats(self, invoke_ms, total_ms, det_count=0, raw_count=0, pre_ms=None, post_ms=None):
         # 윈도우 프레임 카운트
         self._win_frames += 1
         # EMA 업데이트
@@ -489,8 +555,145 @@ class TFLiteWorker(threading.Thread):
             return x if prev is None else (a * x + (1.0 - a) * prev)
         self._ema_total_ms = ema(self._ema_total_ms, total_ms)
         self._ema_invoke_ms = ema(self._ema_invoke_ms, invoke_ms)
+        if pre_ms is not None:
+            self._ema_pre_ms = ema(self._ema_pre_ms, pre_ms)
+        if post_ms is not None:
+            self._ema_post_ms = ema(self._ema_post_ms, post_ms)
         self._win_det = getattr(self, "_win_det", 0) + det_count
         self._win_det_raw = getattr(self, "_win_det_raw", 0) + raw_count
 
     def stop(self):
         self.stop_evt.set()
+
+
+class _FrameJob:
+    """파이프라인 단계 사이를 오가는 프레임 한 장의 작업 정보"""
+
+    __slots__ = ('frame', 'ts', 'mode', 'slot', 'gain', 'pad', 'offset', 'raw', 't0', 'pre_ms', 'invoke_ms')
+
+    def __init__(self, frame, ts, mode):
+        self.frame, self.ts, self.mode = frame, ts, mode
+        self.slot = None
+        self.gain = self.pad = self.offset = self.raw = None
+        self.t0 = time.perf_counter()
+        self.pre_ms = self.invoke_ms = 0.0
+
+
+class PipelinedTFLiteWorker(TFLiteWorker):
+    """
+    3단계 파이프라인 TFLite 추론 스레드
+
+    TFLiteWorker와 입출력/검출 결과는 같고, 한 프레임의 전처리→invoke→후처리를 세 스레드로 나눠
+    프레임 N을 invoke하는 동안 N+1 전처리와 N-1 후처리를 함께 진행한다.
+    (NPU invoke 시간 동안 놀던 CPU 코어에서 letterbox/NMS를 처리)
+
+    - 전처리 스레드: 입력 버퍼 읽기 + ROI 계획 + letterbox/양자화 (입력 텐서 슬롯 2개를 번갈아 사용)
+    - invoke 스레드(run): set_tensor 직후 슬롯 반납 → invoke → 출력 텐서 복사
+    - 후처리 스레드: 디코드/NMS + 출력 버퍼 쓰기 + 통계
+    - 단계 사이 큐는 크기 제한(queue_size)이 있어 느린 단계가 있으면 앞 단계가 기다림 (메모리/지연 상한)
+    - ROI 계획상 건너뛰는 프레임도 같은 큐를 지나가므로 출력 순서는 입력 순서와 같다
+    """
+
+    def __init__(self, *args, queue_size=1, **kwargs):
+        """
+        Args:
+            *args, **kwargs: TFLiteWorker와 동일
+            queue_size: 단계 사이 큐 크기 (프레임)
+        """
+        super().__init__(*args, **kwargs)
+        # 미리 할당한 입력 텐서 2개 (하나를 invoke에 넘기는 동안 다른 하나를 채움)
+        self._slots = [self._input_buf, np.empty_like(self._input_buf)]
+        self._free_slots = queue.Queue()
+        for i in range(len(self._slots)):
+            self._free_slots.put(i)
+        self._q_invoke = queue.Queue(maxsize=max(1, int(queue_size)))
+        self._q_post = queue.Queue(maxsize=max(1, int(queue_size)))
+        self._pre_thread = threading.Thread(target=self._pre_loop, daemon=True, name=f"{self.name}-pre")
+        self._post_thread = threading.Thread(target=self._post_loop, daemon=True, name=f"{self.name}-post")
+
+    # ===== 큐 유틸 (정지 이벤트를 주기적으로 확인) =====
+    def _put(self, q, item):
+        while not self.stop_evt.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q):
+        while not self.stop_evt.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return None
+
+    # ===== 1. 전처리 =====
+    def _pre_loop(self):
+        while not self.stop_evt.is_set():
+            item = self.input_buf.read()
+            if not item:
+                self._idle()
+                continue
+
+            frame, ts = item
+            mode, roi = PLAN_FULL, None
+            if self.roi_planner is not None:
+                mode, roi = self.roi_planner.plan(frame.shape)
+
+            job = _FrameJob(frame, ts, mode)
+            if mode != PLAN_SKIP:
+                job.slot = self._get(self._free_slots)
+                if job.slot is None:
+                    break
+                _, job.gain, job.pad, job.offset = self._preprocess(frame, roi, out=self._slots[job.slot])
+                job.pre_ms = (time.perf_counter() - job.t0) * 1000.0
+
+            if not self._put(self._q_invoke, job):
+                break
+            self._pace()
+
+    # ===== 2. invoke =====
+    def run(self):
+        self._pre_thread.start()
+        self._post_thread.start()
+        while True:
+            job = self._get(self._q_invoke)
+            if job is None:
+                break
+            if job.mode != PLAN_SKIP:
+                t0 = time.perf_counter()
+                self.itp.set_tensor(self.inp["index"], self._slots[job.slot])
+                self._free_slots.put(job.slot)   # set_tensor가 복사하므로 바로 반납
+                self.itp.invoke()
+                job.raw = self._read_outputs()
+                job.invoke_ms = (time.perf_counter() - t0) * 1000.0
+            if not self._put(self._q_post, job):
+                break
+        self._pre_thread.join(timeout=1.0)
+        self._post_thread.join(timeout=1.0)
+
+    # ===== 3. 후처리 =====
+    def _post_loop(self):
+        while True:
+            job = self._get(self._q_post)
+            if job is None:
+                break
+
+            if job.mode == PLAN_SKIP:
+                # IR이 조용한 프레임: 추론 생략, 직전 검출 결과 유지
+                detections = self._last_detections
+            else:
+                t0 = time.perf_counter()
+                scores, boxes_xyxy, classes, raw_count = self._postprocess(job.raw, job.gain, job.pad, job.offset)
+                detections = self._to_detections(scores, boxes_xyxy, classes)
+                self._last_detections = detections
+                t_end = time.perf_counter()
+                # total은 큐 대기 포함 프레임 지연 (전처리 시작 → 후처리 끝)
+                self._update_stats(job.invoke_ms, (t_end - job.t0) * 1000.0,
+                                   det_count=len(detections), raw_count=raw_count,
+                                   pre_ms=job.pre_ms, post_ms=(t_end - t0) * 1000.0)
+
+            self.output_buf.write((job.frame.copy(), job.ts, detections))
+            self._heartbeat()
@@ -35,7 +35,8 @@ from PyQt6.QtGui import QImage, QPixmap
 import numpy as np
 import cv2
 
-from core.coord_mapper import CoordMapper
+from core.calibration import CalibrationService
+from core.overlay import get_renderer
 from core.fire_fusion import FireFusion, apply_vis_mode
 
 logger = logging.getLogger(__name__)
@@ -86,14 +87,18 @@ def _overlay_text(frame, lines, margin=6, line_height=None, color=(255, 255, 255
     scale = font_scale if font_scale is not None else max(0.25, min(0.9, (min_dim / base_dim) * base_scale))
     lh = line_height if line_height is not None else max(12, int(18 * (scale / base_scale)))
     y = margin + lh
+    renderer = get_renderer()
     for line in lines:
-        cv2.putText(out, line, (margin, y), cv2.FONT_HERSHEY_SIMPLEX, scale, (0, 0, 0), 2, cv2.LINE_AA)
-        cv2.putText(out, line, (margin, y), cv2.FONT_HERSHEY_SIMPLEX, scale, color, 1, cv2.LINE_AA)
+        renderer.draw_label(out, line, (margin, y), scale, color, 1, 2)
         y += lh
     return out
 
 
-def build_overlay(rgb_frame, ir_frame, params):
+# calibration 없이 호출될 때 쓰는 기본 캘리브레이션 (COORD 기본값)
+_DEFAULT_CALIBRATION = CalibrationService()
+
+
+def build_overlay(rgb_frame, ir_frame, calibration=None):
     if rgb_frame is None or ir_frame is None:
         return None
     if rgb_frame.size == 0 or ir_frame.size == 0:
@@ -110,38 +115,21 @@ def build_overlay(rgb_frame, ir_frame, params):
 
     rgb_h, rgb_w = rgb_frame.shape[:2]
     ir_h, ir_w = ir_frame.shape[:2]
-    mapper = CoordMapper(
-        ir_size=(ir_w, ir_h),
-        rgb_size=(rgb_w, rgb_h),
-        offset_x=params.get('offset_x', 0.0),
-        offset_y=params.get('offset_y', 0.0),
-        scale=params.get('scale'),
-    )
-    scale = mapper.scale
-    target_w = max(1, int(ir_w * scale))
-    target_h = max(1, int(ir_h * scale))
-    ir_resized = cv2.resize(ir_frame, (target_w, target_h), interpolation=cv2.INTER_LINEAR)
+    # 같은 캘리브레이션 버전이면 매퍼/remap 맵을 재사용 (프레임마다 remap 한 번 + ROI 블렌딩)
+    mapper = (calibration or _DEFAULT_CALIBRATION).mapper((ir_w, ir_h), (rgb_w, rgb_h))
     overlay = rgb_frame.copy()
-    x = int(mapper.base_offset_x + mapper.offset_x)
-    y = int(mapper.base_offset_y + mapper.offset_y)
-
-    x0 = max(0, x)
-    y0 = max(0, y)
-    x1 = min(rgb_w, x + target_w)
-    y1 = min(rgb_h, y + target_h)
-
-    if x0 >= x1 or y0 >= y1:
+    warped = mapper.warp_ir(ir_frame)
+    if warped is None:
         return overlay
-
-    ir_x0 = x0 - x
-    ir_y0 = y0 - y
-    ir_x1 = ir_x0 + (x1 - x0)
-    ir_y1 = ir_y0 + (y1 - y0)
+    (x0, y0, x1, y1), roi_ir, mask = warped
 
     alpha = 0.4
     roi_rgb = overlay[y0:y1, x0:x1]
-    roi_ir = ir_resized[ir_y0:ir_y1, ir_x0:ir_x1]
-    cv2.addWeighted(roi_ir, alpha, roi_rgb, 1 - alpha, 0, dst=roi_rgb)
+    if mask is None:
+        cv2.addWeighted(roi_ir, alpha, roi_rgb, 1 - alpha, 0, dst=roi_rgb)
+    else:
+        blended = cv2.addWeighted(roi_ir, alpha, roi_rgb, 1 - alpha, 0)
+        cv2.copyTo(blended, mask, roi_rgb)
     return overlay
 
 
@@ -239,12 +227,16 @@ class MainWindow(QMainWindow):
         self._coord_auto_set = False
         coord_params = self.controller.get_coord_cfg() if self.controller else {'offset_x': 0.0, 'offset_y': 0.0, 'scale': 1.0}
         target_res = getattr(self.config, "TARGET_RES", (960, 540))
+        # 컨트롤러의 공유 캘리브레이션 버전이 바뀔 때만 융합 매퍼 교체
+        self.calib_view = self.controller.calibration.view((160, 120), tuple(target_res)) if self.controller else None
+        self._overlay_info_version = None  # overlay_info에 표시한 캘리브레이션 버전
         self.fire_fusion = FireFusion(
             ir_size=(160, 120),
             rgb_size=tuple(target_res),
             offset_x=0,
             offset_y=0,
             scale=None,
+            coord_mapper=self.calib_view.mapper if self.calib_view else None,
         )
 
         rgb_input_cfg, ir_input_cfg = (self.controller.get_input_cfg() if self.controller else ({}, {}))
@@ -1059,31 +1051,27 @@ class MainWindow(QMainWindow):
             self.ir_plot.update_value(ir_fps)
 
         base_rgb_for_overlay = rgb_frame
-        overlay_frame = build_overlay(base_rgb_for_overlay, ir_frame, self.controller.get_coord_cfg() if self.controller else {})
+        calibration = self.controller.calibration if self.controller else _DEFAULT_CALIBRATION
+        overlay_frame = build_overlay(base_rgb_for_overlay, ir_frame, calibration=calibration)
         if overlay_frame is not None:
             pix = _cv_to_qpixmap(overlay_frame)
             if pix:
                 self.overlay_label.setPixmap(pix.scaled(
                     self.overlay_label.size(), Qt.AspectRatioMode.KeepAspectRatio,
                     Qt.TransformationMode.SmoothTransformation))
-            coord = self.controller.get_coord_cfg() if self.controller else {}
-            self.overlay_info.setText(
-                f"Overlay offset=({coord.get('offset_x',0):.1f},{coord.get('offset_y',0):.1f}) scale={coord.get('scale','auto')}"
-            )
+            # 오버레이와 같은 CalibrationService에서 읽고, 버전이 바뀔 때만 갱신
+            if calibration.version != self._overlay_info_version:
+                coord, self._overlay_info_version = calibration.get()
+                self.overlay_info.setText(
+                    f"Overlay mode={coord.get('mode') or 'scale'} offset=({coord.get('offset_x') or 0:.1f},{coord.get('offset_y') or 0:.1f}) scale={coord.get('scale') or 'auto'}"
+                )
 
         # Fusion (IR + EO) overlay with color-coded boxes on det frame
         fusion_info = "-"
         if det_meta and annotated_det is not None:
-            if self.controller:
-                params = self.controller.get_coord_cfg()
-                self.fire_fusion.coord_mapper = CoordMapper(
-                    ir_size=(160, 120),
-                    rgb_size=tuple(getattr(self.config, "TARGET_RES", (960, 540))),
-                    offset_x=params.get('offset_x', 0.0),
-                    offset_y=params.get('offset_y', 0.0),
-                    scale=params.get('scale'),
-                )
-            if not isinstance(ir_hotspots, list):
+            if self.calib_view is not None and self.calib_view.changed:
+                self.fire_fusion.coord_mapper = self.calib_view.mapper
+            if not isinstance(ir_hotspots, (list, np.ndarray)):
                 ir_hotspots = []
             eo_bboxes = [d for d in det_meta if len(d) >= 6]
             fusion = self.fire_fusion.fuse(ir_hotspots, eo_bboxes)
@@ -1092,20 +1080,15 @@ class MainWindow(QMainWindow):
             logger.debug("[GUI] vis_mode=%s anns_in=%d anns_out=%d ir_hotspot=%d", vis_mode, len(anns_in), len(anns_out), len(ir_hotspots))
             fusion['eo_annotations'] = anns_out
             fusion_info = f"{fusion['status']} | conf={fusion['confidence']:.2f} | ir_hotspot={len(ir_hotspots)} | eo={len(eo_bboxes)}"
-            for ann in fusion.get('eo_annotations', []):
-                bbox = ann.get('bbox', [])
-                if len(bbox) < 4:
-                    continue
-                x, y, w, h = bbox
-                color = ann.get('color', (0, 0, 255))
-                x0, y0 = int(x), int(y)
-                x1, y1 = int(x + w), int(y + h)
-                cv2.rectangle(annotated_det, (x0, y0), (x1, y1), color, 3)
+            anns = [a for a in fusion.get('eo_annotations', []) if len(a.get('bbox', [])) >= 4]
+            renderer = get_renderer()
+            renderer.draw_boxes(annotated_det, [a['bbox'] for a in anns],
+                                [a.get('color', (0, 0, 255)) for a in anns], 3)
+            for ann in anns:
                 label = ann.get('label', "")
                 if label:
-                    text_y = max(0, y0 - 6)
-                    cv2.putText(annotated_det, label, (x0, text_y), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 0), 3, cv2.LINE_AA)
-                    cv2.putText(annotated_det, label, (x0, text_y), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 1, cv2.LINE_AA)
+                    x0, y0 = int(ann['bbox'][0]), int(ann['bbox'][1])
+                    renderer.draw_label(annotated_det, label, (x0, max(0, y0 - 6)), 0.8, (255, 255, 255), 1, 3)
 
         # Det view 업데이트는 vis_mode 적용 후 그린 annotated_det을 사용
         if annotated_det is not None:
@@ -9,6 +9,8 @@ import zlib
 import cv2
 import numpy as np
 
+from core.overlay import get_renderer
+
 REQUIRED_IMAGES = {
     "rgb_det": ("data_b64", "shape", "dtype"),
     "ir": ("data_b64", "shape", "dtype"),
@@ -101,15 +103,8 @@ def _draw_max_temp_text(frame, ir_entry):
     x = max(2, w - tw - 4)
     y = max(th + 2, h - 4)
 
-    # 배경 박스로 가독성 확보
-    cv2.rectangle(
-        frame,
-        (x - 2, y - th - baseline - 2),
-        (x + tw + 2, y + baseline + 2),
-        (0, 0, 0),
-        -1,
-    )
-    cv2.putText(frame, text, (x, y), font, scale, (0, 255, 255), thickness, cv2.LINE_AA)
+    # 배경 박스 + 텍스트를 캐시된 라벨 비트맵 한 번으로 합성
+    get_renderer().draw_label(frame, text, (x, y), scale, (0, 255, 255), thickness, 0, background=(0, 0, 0))
     return frame
 
 
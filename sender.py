@@ -13,6 +13,9 @@ import os
 from datetime import datetime
 
 from core.fire_fusion import FireFusion, draw_fire_annotations, apply_vis_mode
+from core.calibration import CalibrationService
+from core.fire_state import FireStateTracker
+from core.fire_tracker import FireTracker
 from core.state import (
     LabelScaleState,
     DEFAULT_LABEL_SCALE,
@@ -201,7 +204,8 @@ def _ts_to_epoch_ms(ts):
 
 def send_images(d_rgb, d_ir, d16_ir, d_rgb_det, host='localhost', port=5000,
                 jpeg_quality=70, resize_factor=1, sync_cfg=None, stop_event=None,
-                coord_state=None, label_state=None):
+                calibration=None, label_state=None, fire_state=None,
+                fire_tracker=None):
     """
     이미지 버퍼를 읽어서 TCP 소켓으로 전송 (JSON+zlib+base64)
     - 최신 프레임만 전송하여 적체를 방지
@@ -216,7 +220,12 @@ def send_images(d_rgb, d_ir, d16_ir, d_rgb_det, host='localhost', port=5000,
         port: 서버 포트
         jpeg_quality: JPEG 압축 품질 (0-100, 낮을수록 빠름)
         resize_factor: 전송 전 리사이즈 비율 (2=1/2, 3=1/3, 1=원본)
+        calibration: 공유 캘리브레이션 (CalibrationService, 없으면 기본 COORD)
+        fire_state: 화재 상태 추적기 (FireStateTracker, 없으면 기본 설정으로 생성)
+        fire_tracker: 다중 화점 추적기 (FireTracker, 없으면 기본 설정으로 생성)
     """
+    fire_state = fire_state or FireStateTracker()
+    fire_tracker = fire_tracker or FireTracker()
     label_state = label_state or LabelScaleState(DEFAULT_LABEL_SCALE)
     sender = ImageSender(host, port, label_state=label_state)
     
@@ -235,21 +244,11 @@ def send_images(d_rgb, d_ir, d16_ir, d_rgb_det, host='localhost', port=5000,
         return
     
     # Fire Fusion 초기화 (IR 160x120 → RGB 960x540)
-    def build_fusion(params):
-        return FireFusion(
-            ir_size=(160, 120),
-            rgb_size=(960, 540),
-            offset_x=params.get('offset_x', 0.0),
-            offset_y=params.get('offset_y', 0.0),
-            scale=params.get('scale'),
-        )
-
-    coord_params = {'offset_x': 0.0, 'offset_y': 0.0, 'scale': None}
-    coord_version = -1
-    if coord_state:
-        coord_params, coord_version = coord_state.get()
-
-    fire_fusion = build_fusion(coord_params)
+    # 매퍼는 캘리브레이션 버전이 바뀔 때만 교체 (FireFusion은 한 번만 생성)
+    calibration = calibration or CalibrationService()
+    calib_view = calibration.view(ir_size=(160, 120), rgb_size=(960, 540))
+    fire_fusion = FireFusion(ir_size=(160, 120), rgb_size=(960, 540), coord_mapper=calib_view.mapper,
+                             score_model=fire_tracker.score_model)
     
     frame_count = 0
     ir_frame_count = 0
@@ -316,13 +315,9 @@ def send_images(d_rgb, d_ir, d16_ir, d_rgb_det, host='localhost', port=5000,
             # Receiver로부터 제어 명령 확인
             sender.check_control_command()
 
-            if coord_state:
-                params, version = coord_state.get()
-                if version != coord_version:
-                    coord_version = version
-                    coord_params = params
-                    fire_fusion = build_fusion(coord_params)
-                    logger.info("FireFusion calibration updated: %s", coord_params)
+            if calib_view.changed:
+                fire_fusion.coord_mapper = calib_view.mapper
+                logger.info("FireFusion calibration updated: %s", fire_fusion.coord_mapper)
             
             timestamp = time.time()
             vis_mode = os.getenv("FUSION_VIS_MODE", vis_mode).lower()
@@ -407,8 +402,17 @@ def send_images(d_rgb, d_ir, d16_ir, d_rgb_det, host='localhost', port=5000,
             
             # ===== RGB Detection 프레임 (항상 최신 프레임 포함) =====
             fusion_result = None
+            fire_event = None
+            track_delta = None
             if rgb_det_item and rgb_det_item[0] is not None:
-                rgb_det_frame = rgb_det_item[0].copy()  # 복사본 사용
+                # 전송 해상도로 먼저 축소한 복사본에 그림 (전체 해상도 복사/그리기 생략)
+                rgb_det_frame = rgb_det_item[0]
+                if resize_factor > 1:
+                    h, w = rgb_det_frame.shape[:2]
+                    rgb_det_frame = cv2.resize(rgb_det_frame, (w//resize_factor, h//resize_factor),
+                                               interpolation=cv2.INTER_LINEAR)
+                else:
+                    rgb_det_frame = rgb_det_frame.copy()
                 
                 # detection 결과 추출 (rgb_det_item[2]에 저장됨)
                 eo_detections = []
@@ -420,6 +424,13 @@ def send_images(d_rgb, d_ir, d16_ir, d_rgb_det, host='localhost', port=5000,
                 
                 # ===== Fire Fusion (IR 게이트키퍼) =====
                 fusion_result = fire_fusion.fuse(last_ir_hotspots, eo_detections)
+                # 새 검출 프레임만 추적기/상태 머신에 반영 (같은 프레임 재전송은 제외)
+                # 추적기 누적 점수(지속성 포함)를 결과의 score로 넘겨 하위 판단이 한 값을 보게 함
+                if rgb_det_updated:
+                    track_delta = fire_tracker.update(fusion_result)
+                fusion_result.score = fire_tracker.score
+                if rgb_det_updated:
+                    fire_event = fire_state.update(fusion_result)
                 
                 # 융합 결과에 따라 bbox 다시 그리기 (색상 구분)
                 if fusion_result and fusion_result.get('eo_annotations'):
@@ -435,18 +446,15 @@ def send_images(d_rgb, d_ir, d16_ir, d_rgb_det, host='localhost', port=5000,
                         else:
                             current_label_scale = sender.get_label_scale()
                         thickness_scale = current_label_scale / DEFAULT_LABEL_SCALE if DEFAULT_LABEL_SCALE else 1.0
+                        # 축소된 프레임 기준으로 좌표/라벨 크기를 같이 줄여 기존 표시 크기 유지
+                        draw_scale = 1.0 / resize_factor if resize_factor > 1 else 1.0
                         rgb_det_frame = draw_fire_annotations(
                             rgb_det_frame,
                             anns,
-                            font_scale=current_label_scale,
-                            thickness_scale=thickness_scale,
+                            font_scale=current_label_scale * draw_scale,
+                            thickness_scale=thickness_scale * draw_scale,
+                            scale=draw_scale,
                         )
-                
-                # 리사이즈
-                if resize_factor > 1:
-                    h, w = rgb_det_frame.shape[:2]
-                    rgb_det_frame = cv2.resize(rgb_det_frame, (w//resize_factor, h//resize_factor),
-                                               interpolation=cv2.INTER_LINEAR)
 
                 # JPEG 압축
                 _, encoded = cv2.imencode('.jpg', rgb_det_frame, encode_param)
@@ -479,26 +487,17 @@ def send_images(d_rgb, d_ir, d16_ir, d_rgb_det, host='localhost', port=5000,
 
             # ===== Fusion 결과를 패킷에 추가 =====
             if fusion_result:
-                anns = fusion_result.get('eo_annotations') or []
-                # JSON 직렬화 안전하게 색상 튜플을 리스트로 변환
-                anns_json = []
-                for ann in anns:
-                    ann_copy = dict(ann)
-                    color = ann_copy.get('color')
-                    if color is not None:
-                        ann_copy['color'] = list(color)
-                    anns_json.append(ann_copy)
+                # 직렬화 dict는 결과 객체에 캐시됨 (색상/bbox 리스트 변환, 라벨 포맷 1회)
                 packet['fire_fusion'] = {
-                    'fire_detected': fusion_result.get('fire_detected', False),
-                    'confidence': fusion_result.get('confidence', 0.0),
-                    'status': fusion_result.get('status', 'NO_FIRE'),
-                    'confirmed_count': fusion_result.get('confirmed_count', 0),
-                    'ir_only_count': fusion_result.get('ir_only_count', 0),
-                    'eo_annotations': anns_json,
+                    **fusion_result.to_json_dict(),
+                    'state': fire_state.snapshot(),
+                    'event': fire_event,  # ALARM/CLEAR 전이가 있던 프레임에만 존재
+                    'tracks': track_delta,  # 새 검출 프레임의 트랙 변경분 {'new', 'updated', 'lost'}
                 }
                 
-                # RGB 원본 (저장 모드일 때만)
-                if is_saving and rgb_item and rgb_item[0] is not None:
+                # RGB 원본 (저장 모드 + 점수가 FULLRES_MIN 이상일 때만, 저신뢰 프레임은 인코딩 생략)
+                if (is_saving and rgb_item and rgb_item[0] is not None
+                        and fusion_result.score >= fire_tracker.score_model.fullres_min):
                     rgb_frame = rgb_item[0]
                     if resize_factor > 1:
                         h, w = rgb_frame.shape[:2]
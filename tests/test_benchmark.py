@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+import yaml
+
+from detector.benchmark import (evaluate, load_yolo_labels, mark_pareto, parse_args, pick_model,
+                                write_model_key)
+
+
+def test_evaluate_ap_and_pr_at_runtime_threshold():
+    gts = [np.array([[10, 10, 50, 50, 1], [100, 100, 40, 40, 1]], float), None]
+    preds = [
+        np.array([[12, 11, 48, 50, 0.9, 1],        # TP
+                  [300, 300, 20, 20, 0.8, 1],      # FP
+                  [101, 99, 40, 41, 0.1, 1]], float),  # TP (런타임 임계값 아래)
+        np.array([[0, 0, 10, 10, 0.9, 1]], float),    # 라벨 없는 프레임 → 평가 제외
+    ]
+    res = evaluate(preds, gts, conf_thr=0.5)
+    assert res['n_gt'] == 2
+    assert np.isclose(res['ap50'], 0.5 + 0.5 * (2 / 3))
+    assert (res['precision'], res['recall']) == (0.5, 0.5)
+
+
+def test_yolo_labels_to_pixels(tmp_path):
+    p = tmp_path / "a.txt"
+    p.write_text("1 0.5 0.5 0.2 0.4\n")
+    np.testing.assert_allclose(load_yolo_labels(str(p), 100, 50), [[40, 15, 20, 20, 1]])
+
+
+def test_pareto_and_target_fps_selection():
+    rows = mark_pareto([
+        {'model': 'a', 'infer_ms': 20.0, 'fps': 50.0, 'ap50': 0.50},
+        {'model': 'b', 'infer_ms': 40.0, 'fps': 25.0, 'ap50': 0.70},
+        {'model': 'c', 'infer_ms': 45.0, 'fps': 22.0, 'ap50': 0.60},   # b에 지배됨
+        {'model': 'd', 'infer_ms': 90.0, 'fps': 11.0, 'ap50': 0.80},
+    ])
+    assert [r['model'] for r in rows if r['pareto']] == ['a', 'b', 'd']
+    assert pick_model(rows, 20)['model'] == 'b'
+    assert pick_model(rows, 10)['model'] == 'd'
+    assert pick_model(rows, 100) is None
+
+
+def test_write_model_key_keeps_board_path_and_comments(tmp_path):
+    cfg = tmp_path / "config.yaml"
+    cfg.write_text("TARGET_RES: [960, 540]\n"
+                   "MODEL: /root/lk_fire/model/8n_640_v2/best_full_integer_quant.tflite  # 모델\n"
+                   "LABEL: /root/lk_fire/model/labels.txt\n")
+    value = write_model_key(str(cfg), "model/8n_416_v3/best_full_integer_quant.tflite")
+    assert value == "/root/lk_fire/model/8n_416_v3/best_full_integer_quant.tflite"
+    text = cfg.read_text()
+    assert "# 모델" in text
+    data = yaml.safe_load(text)
+    assert data['MODEL'] == value and data['LABEL'].endswith("labels.txt")
+
+
+def test_write_requires_target_fps():
+    with pytest.raises(SystemExit):
+        parse_args(["--write"])
+    assert parse_args(["--write", "--fps", "10"]).fps == 10.0
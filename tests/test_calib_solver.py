@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+import yaml
+
+from core.coord_mapper import CoordMapper
+from utils.calib_solver import ransac, to_coord_params, write_coord_section
+
+H_TRUE = {
+    'scale': np.array([[5.0, 0.0, 95.0], [0.0, 5.0, -30.0], [0.0, 0.0, 1.0]]),
+    'affine': np.array([[5.2, 0.3, 60.0], [-0.2, 4.8, 12.0], [0.0, 0.0, 1.0]]),
+    'homography': np.array([[5.3, 0.2, 70.0], [-0.15, 5.1, -20.0], [0.0003, -0.0002, 1.0]]),
+}
+
+
+def _pairs(H, n=600, outliers=200, seed=0):
+    rng = np.random.default_rng(seed)
+    src = rng.uniform([0, 0], [160, 120], size=(n + outliers, 2))
+    p = np.c_[src, np.ones(len(src))] @ H.T
+    dst = p[:, :2] / p[:, 2:] + rng.normal(0, 1.0, size=(len(src), 2))
+    dst[n:] = rng.uniform([0, 0], [960, 540], size=(outliers, 2))  # 잘못 짝지어진 쌍
+    return src, dst
+
+
+@pytest.mark.parametrize("model", ["scale", "affine", "homography"])
+def test_ransac_recovers_transform_with_outliers(model):
+    src, dst = _pairs(H_TRUE[model])
+    H, inliers, rms = ransac(src, dst, model, thr=8.0, iters=500)
+    assert inliers[:600].mean() > 0.98 and inliers[600:].mean() < 0.1
+    assert rms < 2.0
+    grid = np.c_[np.mgrid[0:160:20, 0:120:20].reshape(2, -1).T, np.ones(48)]
+    p, q = grid @ H.T, grid @ H_TRUE[model].T
+    assert np.abs(p[:, :2] / p[:, 2:] - q[:, :2] / q[:, 2:]).max() < 2.0
+
+
+def test_scale_result_maps_like_coord_mapper():
+    H, _, _ = ransac(*_pairs(H_TRUE['scale']), 'scale', thr=8.0, iters=300)
+    coord = to_coord_params('scale', H, (160, 120), (960, 540))
+    m = CoordMapper((160, 120), (960, 540), coord['OFFSET_X'], coord['OFFSET_Y'], coord['SCALE'])
+    np.testing.assert_allclose(m.ir_to_rgb(100, 50), (595.0, 220.0), atol=1.0)
+
+
+def test_write_coord_section_keeps_rest_of_file(tmp_path):
+    path = tmp_path / "config.yaml"
+    path.write_text(
+        "TARGET_RES: [960, 540]   # 표시 해상도\n"
+        "COORD:\n  OFFSET_X: 0.0\n  OFFSET_Y: 0.0\n  SCALE: null\n\n"
+        "SERVER:\n  PORT: 9999\n"
+    )
+    write_coord_section(path, to_coord_params('homography', H_TRUE['homography'], (160, 120), (960, 540)))
+    text = path.read_text()
+    assert text.startswith("TARGET_RES: [960, 540]   # 표시 해상도\nCOORD:\n")
+    assert "\n\nSERVER:\n  PORT: 9999\n" in text
+    cfg = yaml.safe_load(text)
+    assert cfg['COORD']['MODE'] == 'homography'
+    np.testing.assert_allclose(cfg['COORD']['MATRIX'], H_TRUE['homography'])
+    m = CoordMapper(mode=cfg['COORD']['MODE'], matrix=cfg['COORD']['MATRIX'])
+    np.testing.assert_allclose(m.H, H_TRUE['homography'])
@@ -0,0 +1,84 @@
+import cv2
+import numpy as np
+
+from core.calibration import CalibrationService
+from core.coord_mapper import CoordMapper
+
+
+def test_scale_mode_lut_matches_affine_formula():
+    m = CoordMapper((160, 120), (960, 540), offset_x=3.5, offset_y=-2.0)
+    xs = np.array([0, 17, 159], dtype=np.int16)
+    ys = np.array([0, 64, 119], dtype=np.int16)
+    rgb_xs, rgb_ys = m.ir_to_rgb_array(xs, ys)
+    np.testing.assert_allclose(rgb_xs, xs * m.scale + m.base_offset_x + 3.5)
+    np.testing.assert_allclose(rgb_ys, ys * m.scale + m.base_offset_y - 2.0)
+    assert m.ir_to_rgb(17, 64) == (rgb_xs[1], rgb_ys[1])
+    np.testing.assert_allclose(m.ir_to_rgb(10.5, 2.25), (10.5 * m.scale + m.base_offset_x + 3.5,
+                                                         2.25 * m.scale + m.base_offset_y - 2.0))
+    assert m.ir_bbox_to_rgb((10, 20, 4, 2)) == (*m.ir_to_rgb(10, 20), 4 * m.scale, 2 * m.scale)
+
+
+def test_homography_mode_round_trip_and_bbox():
+    H = [[5.2, 0.3, 60.0], [-0.1, 4.9, 10.0], [0.0004, 0.0002, 1.0]]
+    m = CoordMapper((160, 120), (960, 540), mode='homography', matrix=H)
+    rgb = m.ir_to_rgb(80, 60)
+    expected = np.array(H) @ np.array([80, 60, 1.0])
+    np.testing.assert_allclose(rgb, expected[:2] / expected[2])
+    np.testing.assert_allclose(m.rgb_to_ir(*rgb), (80, 60), atol=1e-9)
+
+    x, y, w, h = m.ir_bbox_to_rgb((10, 10, 20, 20))
+    for cx, cy in [(10, 10), (30, 10), (10, 30), (30, 30)]:
+        px, py = m.ir_to_rgb(cx, cy)
+        assert x - 1e-9 <= px <= x + w + 1e-9 and y - 1e-9 <= py <= y + h + 1e-9
+
+
+def test_warp_ir_matches_resize_in_scale_mode():
+    rng = np.random.default_rng(0)
+    ir = rng.integers(0, 255, size=(120, 160, 3), dtype=np.uint8)
+    calibration = CalibrationService()
+    m = calibration.mapper((160, 120), (960, 540))
+    assert calibration.mapper((160, 120), (960, 540)) is m
+    (x0, y0, x1, y1), warped, mask = m.warp_ir(ir)
+    assert (x0, y0, x1, y1) == (120, 0, 840, 540) and mask is None
+    expected = cv2.resize(ir, (720, 540), interpolation=cv2.INTER_LINEAR)
+    np.testing.assert_array_equal(warped, expected)
+
+    # 같은 변환을 remap 맵으로 만들면 고정소수점(1/32 픽셀) 보간 오차만 생긴다
+    roi, map1, map2, mask = m.remap_maps()
+    assert roi == (120, 0, 840, 540) and mask is None
+    diff = np.abs(cv2.remap(ir, map1, map2, cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE).astype(int) - expected)
+    assert diff.max() <= 8 and diff.mean() < 1.0
+
+
+def test_affine_mode_partial_overlap_mask():
+    m = CoordMapper((160, 120), (960, 540), mode='affine', matrix=[[4.0, 0, 800], [0, 4.0, 300]])
+    (x0, y0, x1, y1), map1, _, mask = m.remap_maps()
+    assert (x0, y0, x1, y1) == (800, 300, 960, 540)
+    assert mask is None and map1.shape[:2] == (240, 160)
+    assert m.remap_maps()[1] is map1  # 한 번만 생성
+
+    rot = CoordMapper((160, 120), (960, 540), mode='affine', matrix=[[3.0, 1.0, 300], [-1.0, 3.0, 200]])
+    (x0, y0, x1, y1), warped, mask = rot.warp_ir(np.full((120, 160), 200, np.uint8))
+    assert warped.shape == mask.shape == (y1 - y0, x1 - x0)
+    assert 0 < mask.mean() < 1 and (warped[mask > 0] == 200).all()
+
+
+def test_calibration_service_caches_mapper_per_version():
+    from core.calibration import CalibrationService
+    from core.fire_fusion import FireFusion
+
+    service = CalibrationService.from_cfg({'OFFSET_X': 4.0, 'OFFSET_Y': 0.0, 'SCALE': None})
+    view = service.view((160, 120), (960, 540))
+    m1 = view.mapper
+    assert view.mapper is m1 and service.mapper((160, 120), (960, 540)) is m1
+    assert not view.changed
+
+    service.update(offset_x=10.0)
+    assert view.changed
+    m2 = view.mapper
+    assert m2 is not m1 and m2.offset_x == 10.0 and not view.changed
+
+    # 공유 매퍼를 쓰는 FireFusion의 수동 조정은 서비스 매퍼를 바꾸지 않는다
+    fusion = FireFusion(coord_mapper=m2)
+    fusion.adjust_offset(5.0, 0.0)
+    assert fusion.coord_mapper.offset_x == 15.0 and m2.offset_x == 10.0
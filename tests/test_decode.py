@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("tflite_runtime")
+
+from detector.tflite import decode_yolov8_output, decode_yolov8_quantized, quantized_threshold
+
+QUANT = (0.004174018278717995, -117)
+
+
+@pytest.mark.parametrize("shape", [(1, 12, 2100), (1, 2100, 12), (1, 13, 2100)])
+@pytest.mark.parametrize("thr", [0.05, 0.5, 0.95])
+def test_quantized_decode_matches_float_decode(shape, thr):
+    rng = np.random.default_rng(0)
+    raw = rng.integers(-128, 128, shape).astype(np.int8)
+    y = (raw.astype(np.float32) - QUANT[1]) * QUANT[0]
+
+    expected = decode_yolov8_output(y, 320, 320, thr, num_classes=8)
+    got = decode_yolov8_quantized(raw, QUANT, 320, 320, thr, num_classes=8)
+    for a, b in zip(expected, got):
+        np.testing.assert_array_equal(a, b)
+
+
+def test_quantized_threshold_is_exact_at_boundary():
+    scale, zp = QUANT
+    q = quantized_threshold(scale, zp, 0.15)
+    assert (np.float32(q) - zp) * np.float32(scale) >= np.float32(0.15)
+    assert (np.float32(q - 1) - zp) * np.float32(scale) < np.float32(0.15)
+    assert quantized_threshold(scale, zp, 2.0) == 128   # 표현 범위 밖 → 아무것도 통과 못 함
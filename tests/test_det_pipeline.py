@@ -0,0 +1,72 @@
+import queue
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+
+pytest.importorskip("tflite_runtime")
+
+from detector.tflite import TFLiteWorker, PipelinedTFLiteWorker
+
+ROOT = Path(__file__).resolve().parents[1]
+MODEL = ROOT / "model" / "8n_320" / "best_full_integer_quant.tflite"
+LABELS = ROOT / "model" / "labels.txt"
+
+
+class _FrameQueue:
+    """read()가 비면 None을 돌려주는 입력 버퍼 (프레임을 한 번씩만 전달)"""
+
+    def __init__(self, items):
+        self.q = queue.Queue()
+        for item in items:
+            self.q.put(item)
+
+    def read(self):
+        try:
+            return self.q.get_nowait()
+        except queue.Empty:
+            return None
+
+
+class _Collector:
+    def __init__(self):
+        self.items = []
+
+    def write(self, item):
+        self.items.append(item)
+
+
+def _frames():
+    frames = [cv2.imread(str(p)) for p in sorted((ROOT / "sample").glob("*.jpg"))[:3]]
+    frames = [f for f in frames if f is not None]
+    frames.append(np.full((360, 640, 3), 40, np.uint8))
+    return frames
+
+
+@pytest.mark.skipif(not MODEL.exists(), reason="model not found")
+def test_pipelined_worker_matches_sequential_results_in_order():
+    frames = _frames()
+    items = [(f, f"ts{i}") for i, f in enumerate(frames)]
+    kwargs = dict(model_path=str(MODEL), labels_path=str(LABELS), allowed_class_ids=None, use_npu=False)
+
+    seq = TFLiteWorker(input_buf=_FrameQueue([]), output_buf=_Collector(), **kwargs)
+    expected = [seq._to_detections(*seq._infer_once(f)) for f in frames]
+
+    out = _Collector()
+    worker = PipelinedTFLiteWorker(input_buf=_FrameQueue(items), output_buf=out, **kwargs)
+    worker.start()
+    deadline = time.time() + 60
+    while len(out.items) < len(items) and time.time() < deadline:
+        time.sleep(0.05)
+    worker.stop()
+    worker.join(timeout=5)
+
+    assert [ts for _, ts, _ in out.items] == [ts for _, ts in items]
+    for (vis, _, dets), frame, exp in zip(out.items, frames, expected):
+        assert vis.shape == frame.shape
+        assert len(dets) == len(exp)
+        if dets:
+            np.testing.assert_allclose(np.array(dets), np.array(exp), rtol=1e-5, atol=1e-3)
+    assert worker._ema_pre_ms is not None and worker._ema_post_ms is not None
@@ -6,6 +6,7 @@ from core.fire_fusion import (
     FIRE_IR_ONLY,
     NO_FIRE,
 )
+from core.hotspot import as_tuples, make_hotspots
 
 
 def test_fire_fusion_requires_ir_hotspot():
@@ -51,3 +52,25 @@ def test_fire_fusion_matches_ir_with_eo_bbox():
     assert res["status"] == FIRE_CONFIRMED
     assert res["confirmed_count"] == 1
     assert res["ir_only_count"] == 0
+
+
+def test_fire_fusion_accepts_hotspot_records():
+    fusion = FireFusion(ir_size=(160, 120), rgb_size=(960, 540))
+    records = make_hotspots([10, 80], [10, 60], [100.0, 120.0], [98.0, 118.0])
+    assert as_tuples(records) == [(10, 10, 100.0, 98.0), (80, 60, 120.0, 118.0)]
+
+    res = fusion.fuse(records, [(0, 0, 50, 50, 0.8)])
+    assert res["status"] == FIRE_CONFIRMED
+    assert res["details"][0]["temp"] == 120.0  # fallback은 가장 뜨거운 hotspot 사용
+
+
+def test_fire_fusion_labels_box_with_hottest_matched_hotspot():
+    fusion = FireFusion(ir_size=(160, 120), rgb_size=(960, 540))
+    records = make_hotspots([80, 81, 10], [60, 61, 10], [120.0, 250.0, 300.0], [0.0, 0.0, 0.0])
+    rgb_x, rgb_y = fusion.coord_mapper.ir_to_rgb(80, 60)
+    boxes = [(rgb_x - 20, rgb_y - 20, 40, 40, 0.9), (0, 0, 10, 10, 0.5)]
+
+    res = fusion.fuse(records, boxes)
+    assert (res["confirmed_count"], res["ir_only_count"]) == (2, 1)
+    assert [a["status"] for a in res["eo_annotations"]] == [FIRE_CONFIRMED, "FILTERED"]
+    assert res["eo_annotations"][0]["label"] == "FIRE (250C, 90%)"
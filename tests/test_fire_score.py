@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+from core.fire_fusion import FireFusion
+from core.fire_score import ConfidenceModel, TrackScore
+from core.fire_state import FireStateTracker
+from core.fire_tracker import FireTracker
+from core.hotspot import make_hotspots
+
+
+def test_components_are_normalized_and_clipped():
+    model = ConfidenceModel(temp_min=80, temp_span=100, area_full=20)
+    comp = model.components([0.9, 0.0], [130.0, 400.0], [10, 0])
+    assert np.allclose(comp, [[0.9, 0.5, 0.5], [0.0, 1.0, 0.0]])
+    # 프레임 점수는 지속성을 뺀 세 요소 가중 평균 (0.3:0.3:0.2)
+    assert model.frame_scores([1.0], [180.0], [20])[0] == pytest.approx(1.0)
+    assert model.frame_scores([0.0], [80.0], [0])[0] == 0.0
+
+
+def test_weights_must_not_all_be_zero():
+    with pytest.raises(ValueError):
+        ConfidenceModel(0, 0, 0, 0)
+
+
+def test_track_score_grows_with_persistence_and_decays_on_miss():
+    model = ConfidenceModel(persist_frames=10, alpha=0.5)
+    comp = np.array([0.8, 0.6, 0.5])
+    score = TrackScore(model, comp)
+    first = score.value
+    for _ in range(9):
+        score.observe(model, comp)
+    assert score.value == pytest.approx(comp @ model.weights + model.w_persist)
+    assert score.value > first
+
+    score.miss(model)
+    assert score.streak == 0
+    assert score.value < score.peak
+
+
+def test_fusion_confidence_is_continuous():
+    fusion = FireFusion(ir_size=(160, 120), rgb_size=(960, 540))
+    rgb_x, rgb_y = fusion.coord_mapper.ir_to_rgb(80, 60)
+    box = (rgb_x - 20, rgb_y - 20, 40, 40, 0.9)
+    hot = fusion.fuse(make_hotspots([80], [60], [180.0], [0.0], area=[20]), [box])
+    warm = fusion.fuse(make_hotspots([80], [60], [100.0], [0.0], area=[4]), [box])
+    ir_only = fusion.fuse(make_hotspots([80], [60], [180.0], [0.0], area=[20]), [])
+
+    assert hot["confidence"] == pytest.approx((0.3 * 0.9 + 0.3 + 0.2) / 0.8)
+    assert hot["confidence"] > warm["confidence"] > 0
+    assert hot["confidence"] > ir_only["confidence"]
+    assert hot["details"][0]["area"] == 20
+
+
+def test_tracker_score_drives_state_positive():
+    fusion = FireFusion(ir_size=(160, 120), rgb_size=(960, 540))
+    tracker = FireTracker(min_hits=1)
+    state = FireStateTracker(window=10, threshold=50, confidence=0.2, active_dur=0.0, score_min=0.2)
+    hotspots = make_hotspots([80], [60], [90.0], [0.0], area=[2])
+
+    scores = []
+    for i in range(30):
+        res = fusion.fuse(hotspots, [])
+        tracker.update(res, now=i * 0.1)
+        res.score = tracker.score
+        scores.append(res["score"])
+        state.update(res, now=i * 0.1)
+    # 약한 IR 전용 화점: 프레임 점수는 낮지만 지속될수록 트랙 점수가 오른다
+    assert scores[0] < 0.2 <= scores[-1]
+    assert res.to_json_dict()["score"] == scores[-1]
+    assert state.snapshot()["positives"] > 0
+    assert 0 < state.snapshot()["positives"] < 10
+
+
+def _alarm_time(state, hotspots, dt=0.1, frames=200):
+    fusion = FireFusion(ir_size=(160, 120), rgb_size=(960, 540))
+    tracker = FireTracker()
+    for i in range(frames):
+        res = fusion.fuse(hotspots, [])
+        tracker.update(res, now=i * dt)
+        res.score = tracker.score
+        if state.update(res, now=i * dt):
+            return round(i * dt, 3)
+    return None
+
+
+def test_ir_only_alarm_latency_matches_status_confidence():
+    # PC 설정: CONFIDENCE 0.2, ALARM_MIN 기본 0 → 약한 IR 전용 화점(100C, 5px)도 첫 프레임부터 양성
+    cfg = {'WINDOW': 50, 'THRESHOLD': 60, 'CONFIDENCE': 0.2, 'MIN_DUR': 10.0,
+           'ACTIVE_DUR': 2.0, 'INACTIVE_DUR': 10.0}
+    hotspots = make_hotspots([80], [60], [100.0], [0.0], area=[5])
+    # 30번째 양성 프레임(t=2.9)에 60% 도달 + ACTIVE_DUR 2초
+    assert _alarm_time(FireStateTracker.from_cfg(cfg), hotspots) == 4.9
+    # ALARM_MIN을 올리면 트랙 점수가 쌓일 때까지 늦어짐
+    late = _alarm_time(FireStateTracker.from_cfg(cfg, {'ALARM_MIN': 0.2}), hotspots)
+    assert late is not None and late > 4.9
@@ -0,0 +1,54 @@
+from core.fire_state import FireStateTracker, STATE_ALARM, STATE_IDLE, EVENT_ALARM, EVENT_CLEAR
+
+FIRE = {'fire_detected': True, 'confidence': 0.95, 'status': 'CONFIRMED'}
+NONE = {'fire_detected': False, 'confidence': 0.0, 'status': 'NO_FIRE'}
+
+
+def _run(tracker, results, t0=0.0, dt=0.1):
+    events = []
+    for i, r in enumerate(results):
+        ev = tracker.update(r, now=t0 + i * dt)
+        if ev:
+            events.append((round(t0 + i * dt, 3), ev['event']))
+    return events
+
+
+def test_alarm_is_debounced_and_ignores_isolated_frames():
+    tracker = FireStateTracker(window=10, threshold=60, confidence=0.2,
+                               min_dur=1.0, active_dur=0.5, inactive_dur=1.0)
+    # 양성/음성이 번갈아 나오면 비율 50% → ALARM 없음
+    assert _run(tracker, [FIRE, NONE] * 20) == []
+    assert tracker.state == STATE_IDLE
+
+    tracker.reset()
+    # 6번째 프레임(t=0.5)에 60% 도달, 0.5초 유지 후 t=1.0에 ALARM
+    events = _run(tracker, [FIRE] * 30)
+    assert events == [(1.0, EVENT_ALARM)]
+    assert tracker.state == STATE_ALARM
+
+    # 짧은 음성 구간은 ALARM 유지, 비율이 떨어지고 1초 지나면 CLEAR
+    events = _run(tracker, [NONE] * 3 + [FIRE] * 3 + [NONE] * 30, t0=3.0)
+    assert [e for _, e in events] == [EVENT_CLEAR]
+    assert events[0][0] == 4.7  # t=3.7에 60% 미만 (5/10) → 1초 후
+    assert tracker.state == STATE_IDLE
+
+
+def test_low_confidence_frames_and_min_duration():
+    tracker = FireStateTracker(window=4, threshold=50, confidence=0.8,
+                               min_dur=5.0, active_dur=0.0, inactive_dur=0.0)
+    weak = {'fire_detected': True, 'confidence': 0.7, 'status': 'IR_ONLY'}
+    assert _run(tracker, [weak] * 10) == []
+
+    events = _run(tracker, [FIRE, FIRE] + [NONE] * 60, t0=10.0)
+    # ALARM 직후 비율이 떨어져도 MIN_DUR(5초) 동안은 유지
+    assert events == [(10.1, EVENT_ALARM), (15.1, EVENT_CLEAR)]
+    snap = tracker.snapshot(now=16.0)
+    assert snap['state'] == STATE_IDLE and snap['positives'] == 0
+    assert snap['last_event']['event'] == EVENT_CLEAR
+
+
+def test_from_cfg_reads_state_fire_section():
+    tracker = FireStateTracker.from_cfg({'WINDOW': 50, 'THRESHOLD': 60, 'CONFIDENCE': 0.01,
+                                         'MIN_DUR': 10.0, 'ACTIVE_DUR': 2.0, 'INACTIVE_DUR': 10.0})
+    assert tracker.window == 50 and tracker.min_positive == 30
+    assert tracker.active_dur == 2.0 and tracker.confidence == 0.01
@@ -0,0 +1,108 @@
+import numpy as np
+
+from core.coord_mapper import bbox_iou, bbox_iou_matrix
+from core.fire_fusion import FireFusion
+from core.fire_tracker import FireTracker, observations_from_fusion
+from core.fusion_result import FIRE_CONFIRMED, FIRE_IR_ONLY, STATUS_CODES, FusionResult
+from core.hotspot import make_hotspots
+
+
+def test_bbox_iou_matrix_matches_bbox_iou():
+    rng = np.random.default_rng(0)
+    a = rng.uniform(0, 100, size=(7, 4))
+    b = rng.uniform(0, 100, size=(5, 4))
+    b[0] = (0, 0, 0, 0)  # 면적 0
+    m = bbox_iou_matrix(a, b)
+    expected = [[bbox_iou(tuple(x), tuple(y)) for y in b] for x in a]
+    np.testing.assert_allclose(m, expected)
+
+
+def _frame(fusion, fires):
+    """fires: [(ir_x, ir_y, temp)] - 각 화점을 감싸는 EO bbox와 함께 융합"""
+    hotspots = make_hotspots([f[0] for f in fires], [f[1] for f in fires],
+                             [f[2] for f in fires], [f[2] for f in fires])
+    boxes = []
+    for x, y, _ in fires:
+        rx, ry = fusion.coord_mapper.ir_to_rgb(x, y)
+        boxes.append((rx - 20, ry - 20, 40, 40, 0.8))
+    return fusion.fuse(hotspots, boxes)
+
+
+def test_tracker_keeps_ids_for_moving_fires():
+    fusion = FireFusion()
+    tracker = FireTracker(min_hits=2, max_misses=2)
+    ids = set()
+    for i in range(10):
+        # 화점 2개가 반대 방향으로 이동 (프레임당 IR 2픽셀 = RGB 9픽셀)
+        res = _frame(fusion, [(20 + 2 * i, 60, 150.0), (140 - 2 * i, 30, 120.0)])
+        delta = tracker.update(res, now=i * 0.1)
+        ids.update(t['id'] for t in delta['new'])
+        if i == 1:
+            assert sorted(t['id'] for t in delta['new']) == [1, 2]
+        elif i > 1:
+            assert delta['new'] == [] and len(delta['updated']) == 2
+    assert ids == {1, 2}
+
+    tracks = {t['id']: t for t in tracker.active_tracks()}
+    assert tracks[1]['ir_pos'] == [38, 60] and tracks[1]['temp'] == 150.0
+    assert tracks[1]['velocity'][0] > 0 > tracks[2]['velocity'][0]
+
+    # 관측이 끊기면 max_misses 이후 lost 보고
+    lost = []
+    for i in range(10, 14):
+        lost += tracker.update(fusion.fuse([], []), now=i * 0.1)['lost']
+    assert sorted(lost) == [1, 2] and tracker.tracks == []
+
+
+def test_tracker_groups_ir_only_hotspots_into_one_observation():
+    fusion = FireFusion()
+    tracker = FireTracker(min_hits=1)
+    hotspots = make_hotspots([50, 52, 120], [40, 41, 90], [200.0, 190.0, 150.0], [200.0, 190.0, 150.0])
+    delta = tracker.update(fusion.fuse(hotspots, []), now=0.0)
+    assert [(t['id'], t['ir_pos'], t['status']) for t in delta['new']] == [
+        (1, [50, 40], 'IR_ONLY'), (2, [120, 90], 'IR_ONLY'),
+    ]
+
+
+def _observations_from_details(result, marker_size=30.0):
+    """hotspot별 details dict로 묶는 기존 방식 (비교 기준)"""
+    by_box, ir_only = {}, []
+    for d in result['details']:
+        if d['status'] == FIRE_CONFIRMED:
+            key = tuple(d['eo_bbox'])
+            if key not in by_box or d['temp'] > by_box[key]['temp']:
+                by_box[key] = d
+        elif d['status'] == FIRE_IR_ONLY:
+            ir_only.append(d)
+    obs = [(bbox, tuple(d['ir_pos']), d['temp'], FIRE_CONFIRMED) for bbox, d in by_box.items()]
+    kept = []
+    for d in sorted(ir_only, key=lambda d: -d['temp']):
+        rx, ry = d['rgb_pos']
+        if any(abs(rx - kx) < marker_size and abs(ry - ky) < marker_size for kx, ky in kept):
+            continue
+        kept.append((rx, ry))
+        obs.append(((rx - 15, ry - 15, 30.0, 30.0), tuple(d['ir_pos']), d['temp'], FIRE_IR_ONLY))
+    return obs
+
+
+def test_observations_from_arrays_match_details_and_stay_lazy():
+    rng = np.random.default_rng(0)
+    m, n = 60, 6
+    n_conf = 30
+    boxes = rng.uniform(0, 500, size=(n, 4))
+    det_status = np.full(m, STATUS_CODES[FIRE_IR_ONLY], dtype=np.uint8)
+    det_status[:n_conf] = STATUS_CODES[FIRE_CONFIRMED]
+    det_box = np.full(m, -1)
+    det_box[:n_conf] = rng.integers(0, n, n_conf)
+    temps = rng.integers(80, 90, m).astype(float)   # 동점 포함
+    kwargs = dict(boxes=boxes, box_conf=rng.uniform(size=n), ir_xy=rng.integers(0, 160, (m, 2)),
+                  rgb_xy=rng.uniform(0, 200, (m, 2)), temps=temps, areas=rng.integers(1, 9, m),
+                  det_box=det_box, det_status=det_status, det_conf=rng.uniform(size=m))
+
+    res = FusionResult(FIRE_CONFIRMED, 0.9, **kwargs)
+    obs = observations_from_fusion(res)
+    assert res._details is None   # details 뷰를 만들지 않음
+
+    got = [(o['bbox'], o['ir_pos'], o['temp'], o['status']) for o in obs]
+    assert got == _observations_from_details(FusionResult(FIRE_CONFIRMED, 0.9, **kwargs))
+    assert observations_from_fusion(FusionResult()) == []
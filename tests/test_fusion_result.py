@@ -0,0 +1,65 @@
+import json
+
+import numpy as np
+
+from core.fire_fusion import FireFusion, apply_vis_mode, COLOR_FILTERED
+from core.fusion_result import FusionResult, Annotation, FIRE_CONFIRMED, FIRE_FILTERED
+from core.hotspot import make_hotspots
+
+
+def _result():
+    fusion = FireFusion(ir_size=(160, 120), rgb_size=(960, 540))
+    records = make_hotspots([80, 10], [60, 10], [250.0, 300.0], [0.0, 0.0])
+    rgb_x, rgb_y = fusion.coord_mapper.ir_to_rgb(80, 60)
+    boxes = [(rgb_x - 20, rgb_y - 20, 40, 40, 0.9), (0, 0, 10, 10, 0.5)]
+    return fusion.fuse(records, boxes)
+
+
+def test_result_keeps_arrays_and_builds_views_lazily():
+    res = _result()
+    assert isinstance(res, FusionResult)
+    assert res.boxes.shape == (2, 4)
+    assert res._annotations is None and res._details is None
+
+    details = res["details"]
+    assert res.get("details") is details  # 메모이즈
+    assert [d["status"] for d in details] == [FIRE_CONFIRMED, "IR_ONLY"]
+    assert details[0]["eo_conf"] == 0.9 and "eo_bbox" not in details[1]
+
+    ann = res["eo_annotations"][0]
+    assert ann._label is None
+    assert ann["label"] == "FIRE (250C, 90%)"
+    assert ann._label == "FIRE (250C, 90%)"
+
+
+def test_json_dict_is_memoized_and_invalidated_on_replace():
+    res = _result()
+    payload = res.to_json_dict()
+    assert res.to_json_dict() is payload
+    json.dumps(payload)
+    assert payload["eo_annotations"][0]["color"] == [0, 0, 255]
+
+    res["eo_annotations"] = apply_vis_mode(res["eo_annotations"], "temp")
+    payload = res.to_json_dict()
+    assert [a["status"] for a in payload["eo_annotations"]] == [FIRE_CONFIRMED]
+    assert payload["eo_annotations"][0]["color"] == list(COLOR_FILTERED)
+
+
+def test_apply_vis_mode_does_not_mutate_source_annotations():
+    res = _result()
+    src = res["eo_annotations"]
+    out = apply_vis_mode(src, "temp")
+    assert isinstance(out[0], Annotation)
+    assert src[0]["color"] != out[0]["color"]
+
+
+def test_bytes_round_trip():
+    res = _result()
+    blob = res.to_bytes()
+    assert res.to_bytes() is blob
+
+    back = FusionResult.from_bytes(blob)
+    assert (back.status, back.confirmed_count, back.ir_only_count) == (FIRE_CONFIRMED, 1, 1)
+    assert np.allclose(back.boxes, res.boxes, atol=1e-3)
+    assert [a["status"] for a in back["eo_annotations"]] == [FIRE_CONFIRMED, FIRE_FILTERED]
+    assert back["eo_annotations"][0]["label"] == "FIRE (250C, 90%)"
@@ -0,0 +1,292 @@
+import cv2
+import numpy as np
+import pytest
+
+from camera.ircam import (
+    detect_fire, detect_fire_raw, compile_fire_thresholds, block_stats, _window_origins,
+    ThermalFrameAnalysis, IRCamera, grow_regions, sliding_block_stats, AdaptiveIRThresholds,
+)
+from camera.ir_colormap import IRColormap, celsius_to_raw
+from core.buffer import Deferred, DoubleBuffer
+from core.hotspot import as_tuples
+
+
+def _legacy_scan(data, min_val, tau=0.95, thr=20, raw_thr=5, window_size=10):
+    """기존 detect_fire 3단계(이중 루프) 그대로의 참조 구현"""
+    h, w = data.shape
+    T_scene_K = data / 100
+    T_corrected_K = (T_scene_K - 295.15) / tau + 295.15
+    temper_raw = T_scene_K - 273.15
+    temper = T_corrected_K - 273.15
+    hotspots = []
+    for y in range(0, h - window_size, window_size):
+        for x in range(0, w - window_size, window_size):
+            window_raw = temper_raw[y:y + window_size, x:x + window_size]
+            window = temper[y:y + window_size, x:x + window_size]
+            max_temp = np.max(window)
+            mean_temp = np.mean(window)
+            max_temp_raw = np.max(window_raw)
+            mean_temp_raw = np.mean(window_raw)
+            if (max_temp_raw >= mean_temp_raw + raw_thr and
+                    max_temp >= mean_temp + thr and
+                    max_temp >= min_val):
+                max_idx = np.unravel_index(np.argmax(window), window.shape)
+                hotspots.append((x + max_idx[1], y + max_idx[0], max_temp, max_temp_raw))
+    return hotspots
+
+
+def _scene(seed, n_fires=6):
+    rng = np.random.default_rng(seed)
+    data = rng.integers(29000, 30500, size=(120, 160)).astype(np.uint16)
+    for _ in range(n_fires):
+        y, x = rng.integers(0, 118), rng.integers(0, 158)
+        data[y:y + 2, x:x + 2] = rng.integers(36000, 45000)
+    return data
+
+
+def test_block_stats_matches_per_window_reductions():
+    rng = np.random.default_rng(1)
+    arr = rng.normal(30.0, 5.0, size=(120, 160))
+    ys = _window_origins(120, 10)
+    xs = _window_origins(160, 10)
+    mx, mean, arg = block_stats(arr, 10, ys, xs, with_argmax=True)
+    for i, y in enumerate(ys):
+        for j, x in enumerate(xs):
+            win = arr[y:y + 10, x:x + 10]
+            assert mx[i, j] == np.max(win)
+            assert mean[i, j] == np.mean(win)
+            assert arg[i, j] == np.argmax(win)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_detect_fire_hotspots_match_legacy_scan(seed):
+    data = _scene(seed)
+    expected = _legacy_scan(data, 80, tau=0.5)
+    _, _, hotspots = detect_fire(data, 80, tau=0.5)
+    assert as_tuples(hotspots) == expected
+
+
+def test_detect_fire_include_edges_covers_border_strip():
+    data = np.full((120, 160), 29500, dtype=np.uint16)
+    data[115, 155] = 42000  # 기존 스캔이 건너뛰는 오른쪽/아래쪽 블록
+    detected, _, _ = detect_fire(data, 80, tau=0.5)
+    assert detected is False
+
+    detected, bboxes, hotspots = detect_fire(data, 80, tau=0.5, include_edges=True)
+    assert detected is True
+    assert [(int(h[0]), int(h[1])) for h in hotspots] == [(155, 115)]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_detect_fire_raw_matches_float_path(seed):
+    data = _scene(seed)
+    expected = detect_fire(data, 80, tau=0.5)
+    result = detect_fire_raw(data, compile_fire_thresholds(80, tau=0.5))
+    assert result[0] == expected[0]
+    assert result[1] == expected[1]
+    assert [(h[0], h[1]) for h in result[2]] == [(h[0], h[1]) for h in expected[2]]
+    np.testing.assert_allclose(result[2]['temp_corrected'], expected[2]['temp_corrected'])
+    np.testing.assert_allclose(result[2]['temp_raw'], expected[2]['temp_raw'])
+
+
+def test_compile_fire_thresholds_min_raw_is_float_boundary():
+    th = compile_fire_thresholds(80, tau=0.95)
+    to_c = lambda d: (d / 100 - 295.15) / 0.95 + 295.15 - 273.15
+    assert to_c(th.min_raw) >= 80
+    assert to_c(th.min_raw - 1) < 80
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_thermal_frame_analysis_matches_separate_passes(seed):
+    data = _scene(seed)
+    analysis = ThermalFrameAnalysis(data, 0.5)
+
+    # 기존 _get_max_temp_info: 전체 배열을 float32로 변환한 뒤 argmax/argmin
+    temp = (data.astype(np.float32) / 100 - 295.15) / 0.5 + 295.15 - 273.15
+    y, x = np.unravel_index(np.argmax(temp), temp.shape)
+    info = analysis.max_temp_info
+    assert (info['x'], info['y']) == (x, y)
+    assert info['temp_corrected'] == round(float(temp[y, x]), 2)
+    assert info['min_temp'] == round(float(temp.min()), 2)
+
+    assert detect_fire(data, 80, tau=0.5, analysis=analysis)[1] == detect_fire(data, 80, tau=0.5)[1]
+
+
+def test_colormap_auto_matches_normalize_and_apply_colormap():
+    data = _scene(0)
+    expected = cv2.applyColorMap(
+        (cv2.normalize(data, None, 0, 65535, cv2.NORM_MINMAX) >> 8).astype(np.uint8),
+        cv2.COLORMAP_PLASMA,
+    )
+    np.testing.assert_array_equal(IRColormap(key_step=0).apply(data), expected)
+
+
+def test_colormap_fixed_range_is_frame_independent():
+    cmap = IRColormap(mode='fixed', temp_range=(0, 150))
+    data = np.full((4, 4), celsius_to_raw(75), dtype=np.uint16)
+    data[0, 0] = celsius_to_raw(-20)   # 범위 아래 → 첫 색
+    data[0, 1] = celsius_to_raw(400)   # 범위 위 → 마지막 색
+    frame = cmap.apply(data)
+    hotter = data.copy()
+    hotter[3, 3] = celsius_to_raw(140)
+    np.testing.assert_array_equal(cmap.apply(hotter)[1:3, 1:3], frame[1:3, 1:3])
+    np.testing.assert_array_equal(frame[0, 0], cmap.palette[0])
+    np.testing.assert_array_equal(frame[0, 1], cmap.palette[255])
+
+
+def test_colormap_agc_smooths_range_changes():
+    cmap = IRColormap(mode='agc', agc_alpha=0.5, key_step=0)
+    data = _scene(1)
+    cmap.apply(data, (29000, 31000))
+    cmap.apply(data, (29000, 45000))
+    assert cmap._lut_key == (29000, 38000)
+
+
+@pytest.mark.parametrize("mode", ['auto', 'agc'])
+def test_colormap_lut_reused_while_range_jitters(mode):
+    cmap = IRColormap(mode=mode, key_step=64)
+    lo, hi = 29032, 31032                # 격자(64) 중간
+    data = np.clip(_scene(1), lo + 8, hi - 8).astype(np.uint16)
+    frame = cmap.apply(data, (lo, hi))
+    lut = cmap._lut
+    for d in (-3, 5, -7, 2):   # 센서 노이즈 수준의 최소/최대 흔들림
+        cmap.apply(data, (lo + d, hi - d))
+    assert cmap._lut is lut
+    assert frame.shape == data.shape + (3,)
+    key_lo, key_hi = cmap._lut_key
+    assert key_lo % 64 == 0 and key_hi % 64 == 0
+
+
+class _StaticThermal:
+    def __init__(self, data):
+        self.data = data
+
+    def capture(self):
+        return self.data.copy()
+
+    def cleanup(self):
+        pass
+
+
+def test_lazy_vis_renders_on_read_only():
+    data = _scene(2)
+    cfg = {'FPS': 9, 'RES': [160, 120], 'SLEEP': 0.1, 'TAU': 0.5}
+    eager = IRCamera(cfg, DoubleBuffer(), DoubleBuffer(), cam_impl=_StaticThermal(data)).capture()
+
+    d_buffer = DoubleBuffer()
+    lazy = IRCamera(dict(cfg, LAZY_VIS=True), d_buffer, DoubleBuffer(), cam_impl=_StaticThermal(data))
+    raw16, frame, ts, info, hotspots, analysis = lazy.capture()
+    assert isinstance(frame, Deferred) and not frame.resolved
+
+    d_buffer.write((frame, ts, info, hotspots, analysis))
+    item = d_buffer.read()
+    np.testing.assert_array_equal(item[0], eager[1])
+    assert d_buffer.read()[0] is item[0]  # 같은 프레임은 한 번만 렌더링
+
+
+def test_grow_regions_merges_seeds_of_one_blob():
+    values = np.full((40, 40), 20.0)
+    values[10:14, 10:16] = 200.0
+    values[30, 30] = 150.0
+    seeds = [(10, 10, 200.0), (15, 13, 200.0), (30, 30, 150.0)]
+    regions = grow_regions(values, seeds, 10)
+    assert [r['bbox'] for r in regions] == [(10, 10, 6, 4), (30, 30, 1, 1)]
+    assert regions[0]['seeds'] == [0, 1] and regions[0]['area'] == 24
+    assert regions[0]['peak'] == 200.0
+    assert regions[0]['centroid'] == (12.5, 11.5)
+
+    detected, bboxes, hotspots, found = detect_fire(_scene(0), 80, tau=0.5, with_regions=True)
+    assert detected and bboxes == [r['bbox'] for r in found]
+    assert sorted(i for r in found for i in r['seeds']) == list(range(len(hotspots)))
+
+
+def test_sliding_block_stats_matches_per_window_reductions():
+    data = _scene(3)
+    ys = _window_origins(120, 10, include_edges=True, stride=3)
+    xs = _window_origins(160, 10, include_edges=True, stride=3)
+    mx, total = sliding_block_stats(data, 10, ys, xs)
+    for i, y in enumerate(ys):
+        for j, x in enumerate(xs):
+            win = data[y:y + 10, x:x + 10]
+            assert mx[i, j] == win.max()
+            assert total[i, j] == win.sum()
+
+
+def test_overlapping_windows_find_fire_filling_a_grid_block():
+    data = np.full((120, 160), 29500, dtype=np.uint16)
+    data[10:20, 10:20] = 42000  # 격자 블록 하나를 꽉 채우면 (최고 - 평균) = 0
+    assert detect_fire(data, 80, tau=0.5)[0] is False
+
+    detected, bboxes, _ = detect_fire(data, 80, tau=0.5, stride=5)
+    assert detected and bboxes == [(10, 10, 10, 10)]
+    assert detect_fire(data, 80, tau=0.5, scales=[10, 20])[0] is True
+
+
+def test_background_model_suppresses_static_heater_only():
+    data = np.full((120, 160), 29500, dtype=np.uint16)
+    data[30:32, 30:32] = 42000  # 정적 히터
+    source = _StaticThermal(data)
+    cfg = {'FPS': 9, 'RES': [160, 120], 'SLEEP': 0.1, 'TAU': 0.5,
+           'BACKGROUND': {'ENABLED': True, 'WARMUP': 5}}
+    cam = IRCamera(cfg, DoubleBuffer(), DoubleBuffer(), cam_impl=source)
+    for _ in range(5):
+        assert len(cam.capture()[4]) == 1  # 학습 중에는 모두 통과
+    assert len(cam.capture()[4]) == 0
+
+    source.data = data.copy()
+    source.data[80:82, 100:102] = 42000  # 새로 나타난 화점
+    hotspots = cam.capture()[4]
+    assert [(int(h[0]), int(h[1])) for h in hotspots] == [(100, 80)]
+    assert [r['bbox'] for r in cam.regions] == [(100, 80, 2, 2)]
+    assert hotspots['region_id'].tolist() == [0] and hotspots['area'].tolist() == [4]
+
+
+def test_background_absorbs_static_heat_after_freeze_limit():
+    data = np.full((120, 160), 29500, dtype=np.uint16)
+    source = _StaticThermal(data)
+    cfg = {'FPS': 9, 'RES': [160, 120], 'SLEEP': 0.1, 'TAU': 0.5,
+           'BACKGROUND': {'ENABLED': True, 'WARMUP': 5, 'FREEZE_FRAMES': 10}}
+    cam = IRCamera(cfg, DoubleBuffer(), DoubleBuffer(), cam_impl=source)
+    for _ in range(5):
+        cam.capture()
+
+    source.data = data.copy()
+    source.data[30:32, 30:32] = 42000  # 학습 후에 켜진 히터
+    reported = [len(cam.capture()[4]) for _ in range(20)]
+    # 고정 10프레임 동안은 화점, 이후 배경에 흡수되어 더 이상 보고되지 않음
+    assert reported == [1] * 11 + [0] * 9
+
+
+def test_adaptive_thresholds_follow_scene_statistics():
+    adaptive = AdaptiveIRThresholds(80, 20, 5, decay=0.0)
+    cool = np.full((120, 160), 29800, dtype=np.uint16)  # 24.85C, tau=1
+    active = adaptive.update(cool, 1.0)
+    assert (active['min_temp'], active['thr'], active['raw_thr']) == (80.0, 20.0, 5.0)
+
+    hot = np.full((120, 160), 32000, dtype=np.uint16)  # 배경 약 46.9C
+    hot[:, 120:] = 35000                                # 넓은 고온 영역 (P95 - P50 = 30C)
+    active = adaptive.update(hot, 1.0)
+    assert active['min_temp'] == 86.0
+    assert active['thr'] == active['raw_thr'] == 60.0
+
+    cam = IRCamera({'FPS': 9, 'RES': [160, 120], 'SLEEP': 0.1, 'TAU': 1.0,
+                    'ADAPTIVE': {'ENABLED': True, 'DECAY': 0.0}},
+                   DoubleBuffer(), DoubleBuffer(), cam_impl=_StaticThermal(hot))
+    assert cam.capture()[3]['thresholds']['min_temp'] == 86.0
+
+
+def test_adaptive_thresholds_ignore_large_fire_pixels():
+    scene = np.full((120, 160), 29815, dtype=np.uint16)   # 25C (tau=1)
+    fire = scene.copy()
+    fire[40:74, 60:94] = 57315                              # 300C, 약 6% 면적
+    source = _StaticThermal(scene)
+    cam = IRCamera({'FPS': 9, 'RES': [160, 120], 'SLEEP': 0.1, 'TAU': 1.0,
+                    'ADAPTIVE': {'ENABLED': True, 'DECAY': 0.95}},
+                   DoubleBuffer(), DoubleBuffer(), cam_impl=source)
+    for _ in range(5):
+        cam.capture()
+    source.data = fire
+    for _ in range(30):
+        info = cam.capture()[3]
+        assert cam.cur_det
+        assert info['thresholds']['thr'] == 20.0
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from detector.nms import BACKENDS, HAS_CV2_NMS, NmsEngine, make_boxes, nms_numpy, benchmark
+
+
+@pytest.mark.parametrize("backend", [b for b in BACKENDS if b != 'cv2' or HAS_CV2_NMS])
+@pytest.mark.parametrize("n", [1, 40, 600])
+def test_backends_match_reference(backend, n):
+    boxes, scores, _ = make_boxes(n, seed=n)
+    expected = nms_numpy(boxes, scores, 0.45, 300)
+    keep = NmsEngine(backend=backend, pre_topk=0)(boxes, scores)
+    np.testing.assert_array_equal(keep, expected)
+
+
+@pytest.mark.parametrize("backend", [b for b in BACKENDS if b != 'cv2' or HAS_CV2_NMS])
+def test_tied_scores_keep_index_order_on_every_backend(backend):
+    # int8 디코더 출력처럼 점수가 몇 단계로만 양자화되어 동점이 많은 경우
+    boxes, scores, _ = make_boxes(400, seed=7)
+    scores = (np.round(scores * 8) / 8).astype(np.float32)
+    expected = nms_numpy(boxes, scores, 0.45, 300)
+    keep = NmsEngine(backend=backend, pre_topk=0)(boxes, scores)
+    np.testing.assert_array_equal(keep, expected)
+    for s in np.unique(scores[expected]):
+        same = expected[scores[expected] == s]
+        assert np.all(np.diff(same) > 0)   # 동점은 입력 순서대로
+
+
+def test_class_aware_equals_per_class_nms():
+    boxes, scores, classes = make_boxes(300, seed=3)
+    keep = NmsEngine(class_aware=True, pre_topk=0)(boxes, scores, classes)
+
+    expected = []
+    for c in np.unique(classes):
+        idx = np.flatnonzero(classes == c)
+        expected.extend(idx[nms_numpy(boxes[idx], scores[idx])])
+    assert sorted(keep.tolist()) == sorted(expected)
+    # 클래스 무관 NMS는 겹치는 다른 클래스 박스도 억제하므로 더 적게 남김
+    assert len(NmsEngine(pre_topk=0)(boxes, scores, classes)) < len(keep)
+
+
+def test_pre_topk_returns_indices_into_original_arrays():
+    boxes, scores, _ = make_boxes(2000, seed=5)
+    engine = NmsEngine(pre_topk=100)
+    keep = engine(boxes, scores)
+    top = np.argsort(-scores)[:100]
+    np.testing.assert_array_equal(keep, top[nms_numpy(boxes[top], scores[top])])
+    assert engine.select(10) in BACKENDS
+
+
+def test_auto_selection_and_benchmark_rows():
+    engine = NmsEngine(matrix_max=32)
+    assert engine.select(32) == 'matrix'
+    assert engine.select(33) == ('cv2' if HAS_CV2_NMS else 'numpy')
+    rows = benchmark(sizes=(8,), repeat=2)
+    assert rows[0]['n'] == 8 and rows[0]['best'] in BACKENDS
+    with pytest.raises(ValueError):
+        NmsEngine(backend='gpu')
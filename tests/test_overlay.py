@@ -0,0 +1,56 @@
+import cv2
+import numpy as np
+
+from core.overlay import OverlayRenderer
+
+
+def _frame():
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 256, (120, 200, 3), dtype=np.uint8)
+
+
+def test_label_matches_double_puttext():
+    base = _frame()
+    ref = base.copy()
+    cv2.putText(ref, "FIRE 0.87", (20, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 0), 3, cv2.LINE_AA)
+    cv2.putText(ref, "FIRE 0.87", (20, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 1, cv2.LINE_AA)
+
+    out = OverlayRenderer().draw_label(base.copy(), "FIRE 0.87", (20, 60), 0.8, (255, 255, 255), 1, 3)
+
+    diff = np.abs(out.astype(np.int16) - ref.astype(np.int16))
+    assert diff.max() <= 8
+    assert (diff > 2).mean() < 0.01
+
+
+def test_label_clipped_at_border():
+    out = OverlayRenderer().draw_label(_frame(), "edge", (-10, 5), 0.8)
+    assert out.shape == (120, 200, 3)
+
+
+def test_boxes_match_rectangle():
+    base = _frame()
+    ref = base.copy()
+    cv2.rectangle(ref, (10, 20), (60, 80), (0, 0, 255), 3)
+    cv2.rectangle(ref, (100, 30), (150, 70), (0, 165, 255), 2)
+
+    out = OverlayRenderer.draw_boxes(base.copy(), [(10, 20, 50, 60), (100, 30, 50, 40)],
+                                     [(0, 0, 255), (0, 165, 255)], [3, 2])
+    assert np.array_equal(out, ref)
+
+
+def test_scaled_boxes_on_downscaled_frame():
+    ref = np.zeros((60, 100, 3), np.uint8)
+    cv2.rectangle(ref, (5, 10), (30, 40), (0, 255, 0), 1)
+
+    out = OverlayRenderer.draw_boxes(np.zeros((60, 100, 3), np.uint8), [(10, 20, 50, 60)], (0, 255, 0), 1, scale=0.5)
+    assert np.array_equal(out, ref)
+
+
+def test_glyph_cache_reuse_and_eviction():
+    r = OverlayRenderer(cache_size=2)
+    g = r.glyph("a")
+    assert r.glyph("a") is g
+    r.glyph("b")
+    r.glyph("c")
+    assert len(r._glyphs) == 2
+    assert r.glyph("a") is not g
@@ -0,0 +1,56 @@
+import tracemalloc
+
+import numpy as np
+
+from detector.preprocess import LetterboxPreprocessor, letterbox, preprocess_letterbox
+
+YOLO_Q = (1.0 / 255.0, -128)
+
+
+def _reference(frame, size=640):
+    lb, gain, pad, _ = letterbox(frame, (size, size))
+    out = np.empty((1, size, size, 3), np.int8)
+    return preprocess_letterbox(lb, np.dtype(np.int8), YOLO_Q, out), gain, pad
+
+
+def test_matches_letterbox_path_for_int8_model():
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, 256, (540, 960, 3), dtype=np.uint8)
+    prep = LetterboxPreprocessor(640, 640, np.int8, YOLO_Q)
+    out = np.empty((1, 640, 640, 3), np.int8)
+
+    x, gain, pad = prep(frame, out)
+    ref, ref_gain, ref_pad = _reference(frame)
+    assert x is out
+    assert (gain, pad) == (ref_gain, ref_pad)
+    np.testing.assert_array_equal(x, ref)
+
+
+def test_padding_refilled_per_buffer_when_geometry_changes():
+    rng = np.random.default_rng(1)
+    wide = rng.integers(0, 256, (360, 640, 3), dtype=np.uint8)
+    square = np.ascontiguousarray(wide[:, :360])
+    prep = LetterboxPreprocessor(320, 320, np.int8, YOLO_Q)
+    bufs = [np.empty((1, 320, 320, 3), np.int8) for _ in range(2)]
+
+    # 두 버퍼를 번갈아 쓰며 geometry(정사각 ROI ↔ 와이드 전체 프레임)를 바꿈
+    for frame in (square, wide, square, wide):
+        for buf in bufs:
+            x, _, _ = prep(frame, buf)
+            np.testing.assert_array_equal(x, _reference(frame, 320)[0])
+
+
+def test_steady_state_has_no_frame_sized_allocations():
+    frame = np.zeros((1080, 1920, 3), np.uint8)
+    prep = LetterboxPreprocessor(640, 640, np.int8, YOLO_Q)
+    out = np.empty((1, 640, 640, 3), np.int8)
+    prep(frame, out)
+
+    tracemalloc.start()
+    try:
+        for _ in range(5):
+            prep(frame, out)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert peak < 64 * 1024   # 입력 텐서(640x640x3 = 1.2MB)보다 훨씬 작음
@@ -0,0 +1,91 @@
+import threading
+
+from core.buffer import DoubleBuffer
+from core.calibration import CalibrationService
+from core.hotspot import make_hotspots
+from detector.roi import IrRoiPlanner, PLAN_FULL, PLAN_ROI, PLAN_SKIP
+
+RGB_SHAPE = (540, 960, 3)
+
+
+def _ir_item(ts, xs=(), ys=()):
+    hs = make_hotspots(list(xs), list(ys), [150.0] * len(xs), [0.0] * len(xs))
+    return (None, ts, None, hs, None)
+
+
+def test_peek_does_not_consume_items():
+    buf = DoubleBuffer()
+    buf.write(_ir_item("t1", [80], [60]))
+    assert buf.peek()[1] == "t1"
+    assert buf.read()[1] == "t1"  # 주 소비자는 그대로 새 항목을 받음
+    assert buf.peek()[1] == "t1"
+
+
+def test_quiet_ir_runs_detector_at_reduced_duty_cycle():
+    buf = DoubleBuffer()
+    buf.write(_ir_item("t1"))
+    planner = IrRoiPlanner(buf, quiet_every=3)
+    modes = [planner.plan(RGB_SHAPE, now=i * 0.1)[0] for i in range(6)]
+    assert modes == [PLAN_FULL, PLAN_SKIP, PLAN_SKIP, PLAN_FULL, PLAN_SKIP, PLAN_SKIP]
+
+
+def test_hotspot_crops_fixed_size_roi_around_mapped_position():
+    buf = DoubleBuffer()
+    buf.write(_ir_item("t1", [150], [60]))
+    calib = CalibrationService()
+    planner = IrRoiPlanner(buf, calib, size=320, margin=16, full_every=0)
+
+    mode, rect = planner.plan(RGB_SHAPE, now=0.0)
+    rx, ry = calib.mapper((160, 120), (960, 540)).ir_to_rgb(150, 60)
+    assert mode == PLAN_ROI
+    x0, y0, x1, y1 = rect
+    assert (x1 - x0, y1 - y0) == (320, 320)
+    assert x0 <= rx < x1 and y0 <= ry < y1
+    assert x1 <= 960 and y0 >= 0   # 프레임 안으로 밀어 넣음
+
+
+def test_spread_hotspots_and_periodic_full_frame():
+    buf = DoubleBuffer()
+    buf.write(_ir_item("t1", [5, 155], [5, 115]))
+    planner = IrRoiPlanner(buf, size=320, full_every=2)
+    assert planner.plan(RGB_SHAPE, now=0.0) == (PLAN_FULL, None)  # 한 영역에 안 들어감
+
+    buf.write(_ir_item("t2", [80], [60]))
+    modes = [planner.plan(RGB_SHAPE, now=0.1 * i)[0] for i in range(5)]
+    assert modes == [PLAN_ROI, PLAN_ROI, PLAN_FULL, PLAN_ROI, PLAN_ROI]
+
+
+def test_stale_hotspots_fall_back_to_quiet_mode():
+    buf = DoubleBuffer()
+    buf.write(_ir_item("t1", [80], [60]))
+    planner = IrRoiPlanner(buf, max_age=0.5, quiet_every=2)
+    assert planner.plan(RGB_SHAPE, now=0.0)[0] == PLAN_ROI
+    # IR 프레임이 더 오지 않으면 hotspot을 버리고 조용한 모드로
+    assert [planner.plan(RGB_SHAPE, now=t)[0] for t in (1.0, 1.1)] == [PLAN_FULL, PLAN_SKIP]
+
+
+def test_disabled_config_returns_none():
+    assert IrRoiPlanner.from_cfg({'ENABLED': False}, DoubleBuffer()) is None
+    assert IrRoiPlanner.from_cfg({'ENABLED': True, 'SIZE': 256}, DoubleBuffer()).size == 256
+
+
+def test_pop_counts_from_another_thread_loses_no_plans():
+    buf = DoubleBuffer()
+    buf.write(_ir_item("t1"))
+    planner = IrRoiPlanner(buf, quiet_every=2)
+    n = 20000
+    popped = []
+    done = threading.Event()
+
+    def heartbeat():
+        while not done.is_set():
+            popped.append(planner.pop_counts())
+
+    t = threading.Thread(target=heartbeat)
+    t.start()
+    for i in range(n):
+        planner.plan(RGB_SHAPE, now=0.0)
+    done.set()
+    t.join()
+    popped.append(planner.pop_counts())
+    assert sum(sum(c.values()) for c in popped) == n
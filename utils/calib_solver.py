@@ -0,0 +1,359 @@
+"""
+IR-RGB 자동 캘리브레이션 (오프라인)
+
+capture.py --save-det 로 저장한 세션에서 프레임마다 IR 화점 영역 중심과
+EO 화염 bbox 중심을 짝지어 모은 뒤, RANSAC으로 좌표 변환을 추정해 COORD 설정으로 저장합니다.
+
+모델:
+- scale: 균일 스케일 + 이동 (기존 offset_x/offset_y/scale)
+- affine: 2x3 affine
+- homography: 3x3 homography
+
+RANSAC은 가설 수백 개를 한 번에 만들고 (최소 표본 일괄 풀이) 모든 대응점 잔차를
+(가설 x 점) 행렬 연산으로 평가한다. 프레임 루프는 RAW16 로드 + detect_fire 한 번뿐이며,
+EO 화염 검출이 있는 프레임의 RAW16만 읽는다.
+
+사용 예:
+    python -m utils.calib_solver ./capture_session --model homography
+    python -m utils.calib_solver ./capture_session --model scale --write
+"""
+
+import re
+import time
+import logging
+import argparse
+
+import numpy as np
+import yaml
+
+from camera.ircam import detect_fire
+from configs.config import YAML_PATH
+from utils.capture_loader import CaptureLoader
+
+logger = logging.getLogger(__name__)
+
+MODELS = ('scale', 'affine', 'homography')
+MIN_SAMPLES = {'scale': 2, 'affine': 3, 'homography': 4}
+
+
+# ===== 대응점 수집 =====
+
+def collect_pairs(loader, ir_params, fire_class=1, min_conf=0.3, max_per_frame=3):
+    """
+    세션에서 (IR 화점 중심, EO bbox 중심) 후보 쌍 수집
+
+    한 프레임의 IR 영역/EO bbox가 여러 개면 모든 조합을 후보로 넣고 RANSAC이 골라낸다.
+    조합이 폭증하지 않도록 프레임당 IR 영역(최고온도 순)/EO bbox(신뢰도 순)를 max_per_frame개로 제한한다.
+
+    Args:
+        loader: CaptureLoader
+        ir_params: detect_fire 인자 {'min_temp', 'tau', 'thr', 'raw_thr'}
+        fire_class: EO 화염 클래스 id
+        min_conf: EO 최소 신뢰도
+        max_per_frame: 프레임당 사용할 최대 IR 영역 / EO bbox 수
+
+    Returns:
+        tuple: (src (N, 2) IR 좌표, dst (N, 2) RGB 좌표, frame_ids (N,))
+    """
+    dets = loader.load_detections()
+    eo = {}
+    for idx, rows in dets.items():
+        boxes = sorted((d for d in rows if d[5] == fire_class and d[4] >= min_conf),
+                       key=lambda d: -d[4])[:max_per_frame]
+        if boxes:
+            eo[idx] = np.array([(d[0] + d[2] / 2.0, d[1] + d[3] / 2.0) for d in boxes])
+
+    src, dst, frames = [], [], []
+    for idx, _, raw in loader.iter_raw(indices=set(eo)):
+        _, _, _, regions = detect_fire(
+            raw, ir_params['min_temp'], tau=ir_params['tau'], thr=ir_params['thr'],
+            raw_thr=ir_params['raw_thr'], include_edges=True, with_regions=True,
+        )
+        if not regions:
+            continue
+        regions = sorted(regions, key=lambda r: -r['peak'])[:max_per_frame]
+        ir_pts = np.array([r['centroid'] for r in regions], dtype=np.float64)
+        eo_pts = eo[idx]
+        # 모든 조합 (IR i, EO j)
+        src.append(np.repeat(ir_pts, len(eo_pts), axis=0))
+        dst.append(np.tile(eo_pts, (len(ir_pts), 1)))
+        frames.append(np.full(len(ir_pts) * len(eo_pts), idx))
+
+    if not src:
+        return np.zeros((0, 2)), np.zeros((0, 2)), np.zeros(0, dtype=np.int64)
+    return np.concatenate(src), np.concatenate(dst), np.concatenate(frames)
+
+
+# ===== 모델 추정 (일괄) =====
+
+def _normalizer(pts):
+    """Hartley 정규화 행렬 (중심 0, 평균 거리 sqrt(2)) - 등방 스케일이라 모델 형태를 유지"""
+    c = pts.mean(axis=0)
+    d = np.sqrt(((pts - c) ** 2).sum(axis=1)).mean()
+    s = np.sqrt(2.0) / d if d > 0 else 1.0
+    return np.array([[s, 0.0, -s * c[0]], [0.0, s, -s * c[1]], [0.0, 0.0, 1.0]])
+
+
+def _fit_batch(model, src, dst):
+    """
+    표본 묶음별 모델 추정
+
+    Args:
+        src, dst: (K, n, 2) 정규화된 좌표
+    Returns:
+        np.ndarray: (K, 3, 3) 행렬
+    """
+    K = src.shape[0]
+    H = np.zeros((K, 3, 3))
+    H[:, 2, 2] = 1.0
+    if model == 'scale':
+        # dst = s * src + t (최소제곱 닫힌 해)
+        sc = src - src.mean(axis=1, keepdims=True)
+        dc = dst - dst.mean(axis=1, keepdims=True)
+        den = (sc ** 2).sum(axis=(1, 2))
+        s = np.divide((sc * dc).sum(axis=(1, 2)), den, out=np.zeros(K), where=den > 0)
+        t = dst.mean(axis=1) - s[:, None] * src.mean(axis=1)
+        H[:, 0, 0] = H[:, 1, 1] = s
+        H[:, :2, 2] = t
+    elif model == 'affine':
+        X = np.concatenate([src, np.ones(src.shape[:2] + (1,))], axis=2)   # (K, n, 3)
+        A = np.linalg.pinv(X) @ dst                                       # (K, 3, 2)
+        H[:, :2, :] = A.transpose(0, 2, 1)
+    else:
+        # DLT: 점마다 두 행, 가장 작은 특이값의 우특이벡터
+        n = src.shape[1]
+        x, y = src[..., 0], src[..., 1]
+        u, v = dst[..., 0], dst[..., 1]
+        zeros, ones = np.zeros_like(x), np.ones_like(x)
+        r1 = np.stack([-x, -y, -ones, zeros, zeros, zeros, u * x, u * y, u], axis=2)
+        r2 = np.stack([zeros, zeros, zeros, -x, -y, -ones, v * x, v * y, v], axis=2)
+        A = np.concatenate([r1, r2], axis=1).reshape(K, 2 * n, 9)
+        _, _, vh = np.linalg.svd(A)
+        H = vh[:, -1, :].reshape(K, 3, 3)
+        scale = H[:, 2:3, 2:3]
+        H = np.divide(H, scale, out=np.full_like(H, np.nan), where=np.abs(scale) > 1e-12)
+    return H
+
+
+def _residuals(H, src, dst):
+    """(K, 3, 3) 가설 x (N, 2) 점 재투영 오차 (K, N), 투영 불가는 inf"""
+    P = H[:, :, :2] @ src.T + H[:, :, 2:3]                    # (K, 3, N)
+    w = P[:, 2]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ex = P[:, 0] / w - dst[:, 0]
+        ey = P[:, 1] / w - dst[:, 1]
+        r = np.hypot(ex, ey)
+    r[~np.isfinite(r) | (w <= 0)] = np.inf
+    return r
+
+
+def fit_model(model, src, dst):
+    """전체 점 최소제곱 추정 (원래 좌표계 3x3 행렬)"""
+    Ts, Td = _normalizer(src), _normalizer(dst)
+    sn = src @ Ts[:2, :2].T + Ts[:2, 2]
+    dn = dst @ Td[:2, :2].T + Td[:2, 2]
+    Hn = _fit_batch(model, sn[None], dn[None])[0]
+    H = np.linalg.inv(Td) @ Hn @ Ts
+    return H / H[2, 2]
+
+
+def ransac(src, dst, model='scale', thr=20.0, iters=2000, batch=256, refine=3, seed=0):
+    """
+    일괄 RANSAC (MSAC 비용) + 인라이어 재추정
+
+    Args:
+        src, dst: (N, 2) IR / RGB 대응점
+        model: 'scale' | 'affine' | 'homography'
+        thr: 인라이어 재투영 오차 임계값 (RGB 픽셀)
+        iters: 가설 수
+        batch: 한 번에 평가할 가설 수 (메모리: batch x N)
+        refine: 인라이어 재추정 반복 횟수
+        seed: 난수 시드
+
+    Returns:
+        tuple: (H (3, 3), inliers (N,) bool, rms 인라이어 오차)
+    """
+    if model not in MODELS:
+        raise ValueError(f"Unsupported model: {model}")
+    src = np.asarray(src, dtype=np.float64)
+    dst = np.asarray(dst, dtype=np.float64)
+    n = MIN_SAMPLES[model]
+    N = len(src)
+    if N < n:
+        raise ValueError(f"Need at least {n} point pairs for {model}, got {N}")
+
+    rng = np.random.default_rng(seed)
+    Ts, Td = _normalizer(src), _normalizer(dst)
+    Td_inv = np.linalg.inv(Td)
+    sn = src @ Ts[:2, :2].T + Ts[:2, 2]
+    dn = dst @ Td[:2, :2].T + Td[:2, 2]
+
+    best_cost, best_H = np.inf, None
+    thr2 = thr * thr
+    for start in range(0, iters, batch):
+        k = min(batch, iters - start)
+        # 최소 표본 k개를 한 번에 추출, 같은 점이 중복된 표본은 버린다
+        idx = rng.integers(0, N, size=(k, n))
+        srt = np.sort(idx, axis=1)
+        valid = (np.diff(srt, axis=1) > 0).all(axis=1)
+        Hn = _fit_batch(model, sn[idx], dn[idx])
+        H = Td_inv @ Hn @ Ts
+        r = _residuals(H, src, dst)
+        cost = np.minimum(r * r, thr2).sum(axis=1)          # MSAC
+        cost[~valid | ~np.isfinite(H).all(axis=(1, 2))] = np.inf
+        j = int(np.argmin(cost))
+        if cost[j] < best_cost:
+            best_cost, best_H = cost[j], H[j]
+
+    if best_H is None:
+        raise ValueError(f"RANSAC found no valid {model} hypothesis")
+    H = best_H / best_H[2, 2]
+    inliers = _residuals(H[None], src, dst)[0] <= thr
+    for _ in range(refine):
+        if inliers.sum() < n:
+            break
+        H = fit_model(model, src[inliers], dst[inliers])
+        new = _residuals(H[None], src, dst)[0] <= thr
+        if np.array_equal(new, inliers):
+            break
+        inliers = new
+    r = _residuals(H[None], src[inliers], dst[inliers])[0]
+    rms = float(np.sqrt(np.mean(r ** 2))) if r.size else float('nan')
+    return H, inliers, rms
+
+
+# ===== COORD 설정 변환/저장 =====
+
+def to_coord_params(model, H, ir_size, rgb_size):
+    """
+    추정 행렬 → COORD 설정 dict (CoordMapper와 같은 의미)
+
+    scale 모델은 기존 OFFSET_X/OFFSET_Y/SCALE로, 나머지는 MODE/MATRIX로 표현한다.
+    """
+    if model == 'scale':
+        s = float(H[0, 0])
+        base_x = (rgb_size[0] - ir_size[0] * s) / 2
+        base_y = (rgb_size[1] - ir_size[1] * s) / 2
+        return {
+            'OFFSET_X': round(float(H[0, 2]) - base_x, 3),
+            'OFFSET_Y': round(float(H[1, 2]) - base_y, 3),
+            'SCALE': round(s, 6),
+            'MODE': 'scale',
+            'MATRIX': None,
+        }
+    rows = 2 if model == 'affine' else 3
+    return {
+        'OFFSET_X': 0.0,
+        'OFFSET_Y': 0.0,
+        'SCALE': None,
+        'MODE': model,
+        'MATRIX': [[round(float(v), 8) for v in row] for row in H[:rows]],
+    }
+
+
+def _yaml_value(v):
+    if v is None:
+        return 'null'
+    if isinstance(v, list):
+        return '[' + ', '.join(_yaml_value(x) for x in v) + ']'
+    return str(v)
+
+
+def write_coord_section(path, coord):
+    """
+    설정 파일의 COORD 블록만 교체 (다른 섹션의 주석/서식은 유지)
+
+    Args:
+        path: config yaml 경로
+        coord: to_coord_params() 결과
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    block = (
+        "COORD:\n"
+        f"  OFFSET_X: {_yaml_value(coord['OFFSET_X'])}\n"
+        f"  OFFSET_Y: {_yaml_value(coord['OFFSET_Y'])}\n"
+        f"  SCALE: {_yaml_value(coord['SCALE'])}\n"
+        f"  MODE: {coord['MODE']}      # scale | affine | homography\n"
+        f"  MATRIX: {_yaml_value(coord['MATRIX'])}     # affine: 2x3, homography: 3x3 (IR 픽셀 -> RGB 픽셀)\n"
+    )
+    # COORD: 줄부터 다음 최상위 키 전까지 (들여쓰기/빈 줄/주석 줄 포함)
+    pattern = re.compile(r'^COORD:[^\n]*\n(?:(?:[ \t]+[^\n]*|[ \t]*)\n)*', re.MULTILINE)
+    m = pattern.search(text)
+    if m:
+        body = m.group(0)
+        trailing = body[len(body.rstrip('\n')) + 1:]  # 블록 뒤 빈 줄 유지
+        text = text[:m.start()] + block + trailing + text[m.end():]
+    else:
+        text = text.rstrip('\n') + '\n' + block
+    yaml.safe_load(text)  # 저장 전 문법 검증
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+
+def _ir_params(cfg):
+    ir = ((cfg or {}).get('CAMERA') or {}).get('IR') or {}
+    return {
+        'min_temp': float(ir.get('FIRE_MIN_TEMP', 80)),
+        'tau': float(ir.get('TAU', 0.95)),
+        'thr': float(ir.get('FIRE_THR', 20)),
+        'raw_thr': float(ir.get('FIRE_RAW_THR', 5)),
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Solve IR-RGB calibration (COORD) from a capture session")
+    parser.add_argument("session", help="Capture session directory (metadata.csv, ir16/, det.jsonl)")
+    parser.add_argument("--model", choices=MODELS, default='scale', help="Transform model")
+    parser.add_argument("--config", default=YAML_PATH, help="Config yaml (IR fire thresholds, COORD output)")
+    parser.add_argument("--det", help="Detector JSONL path (default: session/det.jsonl)")
+    parser.add_argument("--fire-class", type=int, default=1, help="EO fire class id")
+    parser.add_argument("--min-conf", type=float, default=0.3, help="Minimum EO confidence")
+    parser.add_argument("--threshold", type=float, default=20.0, help="RANSAC inlier threshold (RGB px)")
+    parser.add_argument("--iters", type=int, default=2000, help="RANSAC hypotheses")
+    parser.add_argument("--ir-size", type=int, nargs=2, metavar=("W", "H"), help="IR frame size override")
+    parser.add_argument("--rgb-size", type=int, nargs=2, metavar=("W", "H"), help="RGB frame size override")
+    parser.add_argument("--write", action="store_true", help="Write the result into the config COORD section")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s | %(levelname)s | %(name)s | %(message)s",
+        datefmt="%H:%M:%S",
+    )
+    args = parse_args(argv)
+    with open(args.config, 'r', encoding='utf-8') as f:
+        cfg = yaml.safe_load(f) or {}
+
+    t0 = time.perf_counter()
+    loader = CaptureLoader(args.session)
+    try:
+        if args.det:
+            loader.det_path = args.det
+        rgb_size, ir_size = loader.frame_sizes()
+        rgb_size = tuple(args.rgb_size or rgb_size or cfg.get('TARGET_RES') or (960, 540))
+        ir_size = tuple(args.ir_size or ir_size or (160, 120))
+        src, dst, frames = collect_pairs(loader, _ir_params(cfg), args.fire_class, args.min_conf)
+    finally:
+        loader.release()
+    t1 = time.perf_counter()
+    logger.info("Collected %d candidate pairs from %d frames (%.2fs)",
+                len(src), len(np.unique(frames)), t1 - t0)
+
+    H, inliers, rms = ransac(src, dst, args.model, thr=args.threshold, iters=args.iters)
+    t2 = time.perf_counter()
+    logger.info("RANSAC %s: %d/%d inliers, rms=%.2f px (%.2fs)",
+                args.model, int(inliers.sum()), len(src), rms, t2 - t1)
+
+    coord = to_coord_params(args.model, H, ir_size, rgb_size)
+    print(yaml.safe_dump({'COORD': coord}, default_flow_style=None, sort_keys=False))
+    if args.write:
+        write_coord_section(args.config, coord)
+        logger.info("COORD written to %s", args.config)
+    return coord
+
+
+if __name__ == "__main__":
+    main()
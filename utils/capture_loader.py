@@ -1,5 +1,6 @@
 import os
 import csv
+import json
 import cv2
 import numpy as np
 
@@ -17,6 +18,7 @@ class CaptureLoader:
         self.rgb_path = os.path.join(root_dir, "rgb.mp4")
         self.ir_path = os.path.join(root_dir, "ir_vis.mp4")
         self.ir16_dir = os.path.join(root_dir, "ir16")
+        self.det_path = os.path.join(root_dir, "det.jsonl")
         self.meta_rows = self._load_meta(self.meta_path)
         self.rgb_cap = cv2.VideoCapture(self.rgb_path)
         self.ir_cap = cv2.VideoCapture(self.ir_path)
@@ -55,6 +57,57 @@ class CaptureLoader:
                 "ir_raw": ir_raw,
             }
 
+    def frame_sizes(self):
+        """비디오 헤더의 (rgb_size, ir_size) - 각각 (width, height), 디코딩하지 않음"""
+        def _size(cap):
+            if cap is None or not cap.isOpened():
+                return None
+            return (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+        return _size(self.rgb_cap), _size(self.ir_cap)
+
+    def iter_raw(self, indices=None):
+        """
+        RAW16만 순서대로 반환 (비디오 디코딩 없이 npy만 로드)
+
+        Args:
+            indices: 읽을 프레임 index 집합 (None이면 전체)
+
+        yield: (index, ir_ts, ir_raw)
+        """
+        for row in self.meta_rows:
+            idx = int(row["index"])
+            if indices is not None and idx not in indices:
+                continue
+            raw_path = row.get("ir_raw", "")
+            if not raw_path:
+                continue
+            np_path = os.path.join(self.root_dir, raw_path)
+            if os.path.exists(np_path):
+                yield idx, row["ir_ts"], np.load(np_path)
+
+    def load_detections(self, path=None):
+        """
+        capture.py --save-det 결과(det.jsonl) 로드
+
+        Returns:
+            dict: {index: [(x, y, w, h, conf, cls), ...]} (파일이 없으면 빈 dict)
+        """
+        path = path or self.det_path
+        out = {}
+        if not os.path.exists(path):
+            return out
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                row = json.loads(line)
+                out[int(row["index"])] = [
+                    (d["x"], d["y"], d["w"], d["h"], d["conf"], int(d["cls"]))
+                    for d in row.get("detections", [])
+                ]
+        return out
+
     def release(self):
         if self.rgb_cap:
             self.rgb_cap.release()